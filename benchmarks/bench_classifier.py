@@ -0,0 +1,66 @@
+# benchmarks/bench_classifier.py
+"""
+Clasificador segment/subtype de turismo: autómata compilado (tourism.classify_entity) frente a la
+versión anterior (re.search por patrón y campo, sin compilar), sobre las tarjetas del listado del corpus.
+"""
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from conftest import PAGE_URLS
+from crewai_html_extractor.scraper.document import ParsedPage
+from crewai_html_extractor.scraper.extractors.tourism import KW, _kw_matcher, classify_entity
+
+pytestmark = pytest.mark.benchmark(group="classifier")
+
+PAGE = "drupal_listing.html"
+
+
+def _legacy_classify(url: str, name: str, description: str, full_text: str):
+    tok = lambda s: re.sub(r"\s+", " ", (s or "")).strip().lower()
+    match = lambda rx, texto: bool(re.search(rx, texto, re.I)) if rx else False
+    u, n, d, t = tok(url), tok(name), tok(description), tok(full_text)
+    hay = lambda rx: match(rx, n) or match(rx, d) or match(rx, u) or match(rx, t)
+    for seg_key, submap in KW.items():
+        for sub_key, rx in submap.items():
+            if hay(rx):
+                return seg_key, sub_key, "keywords", 65 if match(rx, u) or match(rx, n) else 60
+    if re.search(r"/(hotel|aloj|apart|hostal|camping)/", u):
+        return "accommodation", None, "url", 55
+    if re.search(r"/(experien|actividad|agenda|evento|ruta|tour)/", u):
+        return "experience", None, "url", 50
+    if re.search(r"/(restaur|bar|agencia|servici|empresa|info)/", u):
+        return "business", None, "url", 50
+    return None, None, "fallback", 40
+
+
+@pytest.fixture(scope="module")
+def cards(pages):
+    """(url, name, "", texto de la tarjeta) por tarjeta, como las construye extract_portal_listings."""
+    page = ParsedPage(pages[PAGE], PAGE_URLS[PAGE])
+    out = []
+    for c in page.main.select(".view-content .views-row, article, li, .card"):
+        h = c.find(re.compile(r"^h[1-4]$"))
+        link = c.find("a", href=True)
+        out.append((link["href"] if link else PAGE_URLS[PAGE], h.get_text(strip=True) if h else "", "", c.get_text(" ", strip=True)))
+    # y el texto completo de la página, como en _normalize_entity
+    out += [(PAGE_URLS[PAGE], name, "", page.text) for _, name, _, _ in out[:20]]
+    return out
+
+
+def _clear_caches():
+    _kw_matcher.cache_clear()
+
+
+def bench_compiled_classifier(benchmark, cards):
+    def run():
+        _clear_caches()  # sin ventaja de caché entre rondas
+        return [classify_entity(None, *c) for c in cards]
+    out = benchmark(run)
+    assert out == [_legacy_classify(*c) for c in cards]
+
+
+def bench_legacy_classifier(benchmark, cards):
+    benchmark(lambda: [_legacy_classify(*c) for c in cards])
@@ -0,0 +1,42 @@
+# benchmarks/bench_extractors.py
+"""
+Tiempo y pico de memoria por extractor y página del corpus, sin red.
+
+- bench_extractor: API de string (cada llamada parsea su propio HTML)
+- bench_pipeline: parse único + todos los extractores + enlaces (lo que hace el crawler por página)
+"""
+from __future__ import annotations
+
+import pytest
+
+from conftest import PAGE_URLS, corpus_pages
+from crewai_html_extractor import crawl_cli
+from crewai_html_extractor.scraper.document import ParsedPage
+from crewai_html_extractor.scraper.extractors import html_tables, ine, tourism
+
+EXTRACTORS = {
+    "tourism_entities": tourism.extract_tourism_entities,
+    "portal_listings": tourism.extract_portal_listings_generic,
+    "ine_tables": ine.extract_ine_tables,
+    "html_tables": html_tables.extract_html_tables,
+    "links": crawl_cli.extract_links,
+}
+PAGES = sorted(corpus_pages())
+
+
+@pytest.mark.parametrize("extractor", sorted(EXTRACTORS))
+@pytest.mark.parametrize("page", PAGES)
+def bench_extractor(benchmark, measure, pages, page, extractor):
+    benchmark.group = page
+    measure(EXTRACTORS[extractor], pages[page], PAGE_URLS[page])
+
+
+def _pipeline(html: str, url: str):
+    doc = ParsedPage(html, url)
+    return crawl_cli.run_extractors_on_page(doc) + crawl_cli.extract_links_from_page(doc)
+
+
+@pytest.mark.parametrize("page", PAGES)
+def bench_pipeline(benchmark, measure, pages, page):
+    benchmark.group = page
+    measure(_pipeline, pages[page], PAGE_URLS[page])
@@ -0,0 +1,64 @@
+# benchmarks/bench_numeric.py
+"""
+Coerción numérica de tablas INE: columna a columna (scraper.numeric) frente al
+pipeline anterior sobre DataFrame (strip por celda + 2 replace regex + to_numeric por columna).
+Tabla sintética de 100k celdas (20k filas x 5 columnas) en formato ES con '..' y notas (p).
+"""
+from __future__ import annotations
+
+import random
+
+import pandas as pd
+import pytest
+
+from crewai_html_extractor.scraper.numeric import coerce_table
+
+pytestmark = pytest.mark.benchmark(group="numeric-100k")
+
+N_ROWS = 20_000
+
+
+def _es(x: float, dec: int) -> str:
+    return f"{x:,.{dec}f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _table():
+    rng = random.Random("numeric")
+    cols = [
+        [f"Municipio {i}" for i in range(N_ROWS)],
+        [_es(rng.randint(0, 9_000_000), 0) for _ in range(N_ROWS)],
+        [".." if rng.random() < 0.05 else _es(rng.randint(0, 900_000), 0) for _ in range(N_ROWS)],
+        [_es(rng.uniform(0, 100), 2) + ("(p)" if rng.random() < 0.1 else "") for _ in range(N_ROWS)],
+        [_es(rng.uniform(-50, 50), 1) for _ in range(N_ROWS)],
+    ]
+    return {"schema": ["Municipio", "Viajeros", "Pernoctaciones", "Ocupación (%)", "Variación"], "columns": cols}
+
+
+def _legacy(table):
+    df = pd.DataFrame(dict(zip(table["schema"], table["columns"])))
+    df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+    df = df.replace(r"\.", "", regex=True).replace(",", ".", regex=True)
+    out = {}
+    for c in df.columns:
+        try:
+            out[c] = pd.to_numeric(df[c])
+        except (TypeError, ValueError):
+            out[c] = df[c]
+    return pd.DataFrame(out)
+
+
+@pytest.fixture(scope="module")
+def table():
+    return _table()
+
+
+def bench_coerce_table(benchmark, table):
+    def run():
+        t = {"schema": table["schema"], "columns": [list(c) for c in table["columns"]]}
+        return coerce_table(t)
+    reports = benchmark(run)
+    assert [r["type"] for r in reports] == ["text", "int", "int", "percent", "float"]
+
+
+def bench_legacy_dataframe(benchmark, table):
+    benchmark(_legacy, table)
@@ -0,0 +1,61 @@
+# benchmarks/conftest.py
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+try:
+    import pytest_benchmark
+except ImportError:
+    pytest_benchmark = None
+
+ROOT = Path(__file__).resolve().parent
+CORPUS = ROOT / "corpus"
+sys.path.insert(0, str(ROOT.parent))
+
+PAGE_URLS = {
+    "ine_tables.html": "https://www.ine.es/jaxiT3/Tabla.htm?t=2074",
+    "drupal_listing.html": "https://turisme.vinaros.es/es/servicios/restauracion",
+    "jsonld_hotels.html": "https://turismo.example.es/es/alojamientos",
+    "li_heavy.html": "https://www.ayuntamiento.example.es/es/turismo",
+}
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list) -> None:
+    # Sin el plugin no hay fixture benchmark: la suite se salta en vez de fallar
+    if pytest_benchmark is None:
+        skip = pytest.mark.skip(reason="requiere pytest-benchmark (pip install -e .[bench])")
+        for item in items:
+            item.add_marker(skip)
+
+
+def corpus_pages() -> Dict[str, str]:
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(CORPUS.glob("*.html"))}
+
+
+@pytest.fixture(scope="session")
+def pages() -> Dict[str, str]:
+    return corpus_pages()
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Cronometra fn(*args) con pytest-benchmark y añade a extra_info el pico de memoria
+    (tracemalloc, en una ejecución aparte para no distorsionar los tiempos) y nº de items.
+    """
+    def run(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        tracemalloc.start()
+        try:
+            out = fn(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_kib"] = round(peak / 1024, 1)
+        benchmark.extra_info["items"] = len(out) if hasattr(out, "__len__") else None
+        return benchmark(fn, *args, **kwargs)
+    return run
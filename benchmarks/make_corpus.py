@@ -0,0 +1,172 @@
+# benchmarks/make_corpus.py
+"""
+Genera el corpus offline de benchmarks (determinista: misma semilla => mismos ficheros).
+
+Páginas representativas de lo que rastreamos:
+- ine_tables.html       tablas INE: cabecera de 2 filas, rowspan/colspan, números en formato ES, '..' y notas
+- drupal_listing.html   listado Drupal (.view-content .views-row) con tel/mailto por tarjeta
+- jsonld_hotels.html    ficha con JSON-LD (@graph grande de Hotel/Restaurant/Event)
+- li_heavy.html         portal municipal con menús/footers de cientos de <li> y enlaces
+
+Uso:
+    python benchmarks/make_corpus.py            # regenera benchmarks/corpus/*.html
+"""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+CORPUS = Path(__file__).resolve().parent / "corpus"
+
+TOWNS = ["Sitges", "Vinaròs", "Peñíscola", "Cambrils", "Salou", "Cadaqués", "Ronda", "Nerja", "Jaca", "Llanes"]
+STREETS = ["Calle Mayor", "Av. del Mar", "Carrer Major", "Passeig Marítim", "Plaza España", "Camino Real"]
+KINDS = ["Hotel", "Hostal", "Apartamentos", "Camping", "Casa Rural", "Restaurante", "Bar", "Museo", "Ruta"]
+
+
+def _head(title: str, extra: str = "") -> str:
+    return (
+        "<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title><meta name=\"description\" content=\"{title}\">{extra}</head>"
+    )
+
+
+def _nav(rng: random.Random, n: int) -> str:
+    lis = "".join(
+        f"<li class=\"menu-item\"><a href=\"/es/{rng.choice(['turismo','agenda','que-ver','alojamiento','servicios'])}/{i}\">"
+        f"Sección {i}</a></li>"
+        for i in range(n)
+    )
+    return f"<header><nav class=\"main-menu\" role=\"navigation\"><ul class=\"menu\">{lis}</ul></nav></header>"
+
+
+def _footer(rng: random.Random, n: int) -> str:
+    lis = "".join(f"<li><a href=\"https://www.example.org/legal/{i}\">Aviso {i}</a></li>" for i in range(n))
+    return (
+        f"<footer class=\"site-footer\"><ul class=\"footer-links\">{lis}</ul>"
+        "<p>Oficina de turismo · Tel. 964 45 33 34 · info@turisme.example.es</p></footer>"
+    )
+
+
+def _num_es(x: float, dec: int = 0) -> str:
+    s = f"{x:,.{dec}f}"
+    return s.replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def ine_tables(rng: random.Random) -> str:
+    tables = []
+    for t in range(6):
+        provs = [f"Provincia {i:02d}" for i in range(60)]
+        head = (
+            "<thead><tr><th rowspan=\"2\">Provincia</th><th colspan=\"2\">Viajeros</th>"
+            "<th colspan=\"2\">Pernoctaciones</th><th rowspan=\"2\">Grado de ocupación (%)</th></tr>"
+            "<tr><th>Residentes</th><th>No residentes</th><th>Residentes</th><th>No residentes</th></tr></thead>"
+        )
+        rows = []
+        for p in provs:
+            cells = [
+                _num_es(rng.randint(1_000, 900_000)),
+                _num_es(rng.randint(1_000, 900_000)),
+                _num_es(rng.randint(5_000, 3_000_000)),
+                ".." if rng.random() < 0.05 else _num_es(rng.randint(5_000, 3_000_000)),
+                _num_es(rng.uniform(10, 95), 2) + ("(p)" if rng.random() < 0.1 else ""),
+            ]
+            rows.append("<tr><th scope=\"row\">" + p + "</th>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+        tables.append(
+            f"<table class=\"tablaCentrada\" id=\"tabla{t}\"><caption>Coyuntura turística hotelera. "
+            f"Año 2024. Tabla {t}</caption>{head}<tbody>{''.join(rows)}</tbody></table>"
+            "<p class=\"nota\">Notas: (p) dato provisional. '..' dato no disponible.</p>"
+        )
+    body = "<main><h1>Encuesta de ocupación hotelera</h1>" + "".join(tables) + "</main>"
+    return _head("INE - Coyuntura Turística Hotelera (CTH). Año 2024") + "<body>" + _nav(rng, 40) + body + _footer(rng, 30) + "</body></html>"
+
+
+def drupal_listing(rng: random.Random) -> str:
+    rows = []
+    for i in range(250):
+        kind = rng.choice(KINDS)
+        town = rng.choice(TOWNS)
+        name = f"{kind} {rng.choice(['Sol', 'Mar', 'Llevant', 'Miramar', 'La Plaça', 'El Port'])} {i}"
+        tel = f"+34 9{rng.randint(10, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)}"
+        ext = f"<a href=\"https://www.{kind.lower().replace(' ', '')}{i}.es\">Web</a>" if rng.random() < 0.3 else ""
+        rows.append(
+            "<div class=\"views-row\"><article class=\"node node--type-establecimiento\">"
+            f"<h3 class=\"node__title\"><a href=\"/es/servicios/restauracion/{i}\">{name}</a></h3>"
+            f"<div class=\"field--name-field-direccion\">{rng.choice(STREETS)}, {rng.randint(1, 120)} · 1{rng.randint(2000, 2999)} {town}</div>"
+            f"<ul class=\"contact\"><li><a href=\"tel:{tel.replace(' ', '')}\">{tel}</a></li>"
+            f"<li><a href=\"mailto:info{i}@example.es\">info{i}@example.es</a></li></ul>{ext}"
+            "</article></div>"
+        )
+    body = (
+        "<main><h1>Restauración y alojamiento</h1><div class=\"view view-establecimientos\">"
+        f"<div class=\"view-content\">{''.join(rows)}</div></div></main>"
+    )
+    return _head("Dónde comer y dormir | Turisme Vinaròs") + "<body>" + _nav(rng, 60) + body + _footer(rng, 40) + "</body></html>"
+
+
+def jsonld_hotels(rng: random.Random) -> str:
+    graph = []
+    for i in range(150):
+        typ = rng.choice(["Hotel", "Restaurant", "Event", "TouristAttraction", "LodgingBusiness"])
+        node = {
+            "@type": typ,
+            "@id": f"https://turismo.example.es/#n{i}",
+            "name": f"{typ} {rng.choice(TOWNS)} {i}",
+            "url": f"https://turismo.example.es/es/ficha/{i}",
+            "description": "Establecimiento con vistas al mar, cerca del casco antiguo y de la playa.",
+            "telephone": f"+34 9{rng.randint(10, 99)} {rng.randint(100000, 999999)}",
+            "address": {
+                "@type": "PostalAddress",
+                "streetAddress": f"{rng.choice(STREETS)} {rng.randint(1, 99)}",
+                "addressLocality": rng.choice(TOWNS),
+                "postalCode": f"{rng.randint(10000, 52999)}",
+                "addressCountry": "ES",
+            },
+            "geo": {"@type": "GeoCoordinates", "latitude": round(rng.uniform(36, 43), 5), "longitude": round(rng.uniform(-8, 3), 5)},
+        }
+        if typ == "Event":
+            node["startDate"] = f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"
+        if typ in ("Hotel", "LodgingBusiness"):
+            node["aggregateRating"] = {"@type": "AggregateRating", "ratingValue": str(round(rng.uniform(6, 9.8), 1)), "reviewCount": rng.randint(5, 900)}
+        graph.append(node)
+    ld = json.dumps({"@context": "https://schema.org", "@graph": graph}, ensure_ascii=False)
+    paras = "".join(
+        f"<p>Licencia HUTB-{rng.randint(10000, 99999)}. CIF B{rng.randint(1000000, 9999999)}. "
+        f"Reservas en el 93 {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}.</p>"
+        for _ in range(80)
+    )
+    extra = f"<script type=\"application/ld+json\">{ld}</script>"
+    return _head("Alojamientos y agenda | Turismo", extra) + "<body>" + _nav(rng, 30) + f"<main><h1>Fichas</h1>{paras}</main>" + _footer(rng, 20) + "</body></html>"
+
+
+def li_heavy(rng: random.Random) -> str:
+    blocks = []
+    for b in range(12):
+        lis = "".join(
+            f"<li><a href=\"/es/{rng.choice(['noticias', 'agenda', 'museo', 'playas', 'rutas', 'tramites'])}/{b}-{i}\" "
+            f"title=\"{rng.choice(['Ruta', 'Museo', 'Evento', 'Trámite'])} {i}\">Enlace {b}.{i}</a></li>"
+            for i in range(60)
+        )
+        blocks.append(f"<section class=\"bloque\"><h2>Bloque {b}</h2><ul>{lis}</ul></section>")
+    body = "<main><h1>Ayuntamiento · Turismo</h1>" + "".join(blocks) + "</main>"
+    return _head("Portal municipal de turismo") + "<body>" + _nav(rng, 200) + body + _footer(rng, 150) + "</body></html>"
+
+
+PAGES = {
+    "ine_tables.html": ine_tables,
+    "drupal_listing.html": drupal_listing,
+    "jsonld_hotels.html": jsonld_hotels,
+    "li_heavy.html": li_heavy,
+}
+
+
+def main() -> None:
+    CORPUS.mkdir(parents=True, exist_ok=True)
+    for name, build in PAGES.items():
+        html = build(random.Random(name))
+        (CORPUS / name).write_text(html, encoding="utf-8")
+        print(f"[OK] {CORPUS / name} ({len(html) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,32 @@ from __future__ import annotations
 
 import argparse
 import logging
+import multiprocessing as mp
+import multiprocessing.connection as mp_connection
+import queue
 import re
-import time
+import signal
+import zlib
 from collections import deque
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.parse import urlparse
 
 import pandas as pd
-from bs4 import BeautifulSoup
 
-from crewai_html_extractor.scraper.core import Core
+from crewai_html_extractor.scraper.archive import PageArchive
+from crewai_html_extractor.scraper.core import (
+    DEFAULT_HEADERS, DEFAULT_STATE_DIR, MAX_BODY_BYTES, ROBOTS_POLL_S, Core, ReplayCore, RobotsPending, state_path,
+)
+from crewai_html_extractor.scraper.document import ParsedPage, as_page
+from crewai_html_extractor.scraper.encoding import repair_items
+from crewai_html_extractor.scraper.policy import POLICY_ENV, SchedulingPolicy
+from crewai_html_extractor.scraper.metrics import RunStats, StageTimer
+from crewai_html_extractor.scraper.frontier import PriorityFrontier, SqliteFrontier
+from crewai_html_extractor.scraper.robots import RobotsStore
+from crewai_html_extractor.scraper.sinks import ENTITY_COLUMNS, PAGE_COLUMNS, EntityDeduper, entity_key, make_sink
+from crewai_html_extractor.scraper.urls import normalize_url, same_host, url_host  # noqa: F401 (re-export)
 from crewai_html_extractor.scraper.extractors import tourism, html_tables
 from crewai_html_extractor.scraper.extractors import ine as ine_extractor
 
@@ -27,70 +42,96 @@ DEFAULT_KEYWORDS = (
 )
 KEYWORD_RX = re.compile(DEFAULT_KEYWORDS, re.I)
 
+# Score de semillas: por encima de cualquier enlace descubierto
+SEED_SCORE = 10
+
+# Score de un enlace: base, y extra si la URL o el texto del enlace tienen palabras clave
+LINK_SCORE = 1
+LINK_KEYWORD_BONUS = 2
+# El máximo posible: un enlace que ya lo tiene no se vuelve a puntuar
+LINK_MAX_SCORE = LINK_SCORE + LINK_KEYWORD_BONUS
+
+# Cada cuánto (s) se comprueba que los workers siguen vivos mientras se esperan resultados
+WORKER_POLL_S = 1.0
+
+# Espera máxima (s) por vuelta a robots.txt pendientes, solo cuando no queda otra URL que procesar
+ROBOTS_IDLE_WAIT_S = 10
+
+# Namespace de records reutilizables (GET condicional) en core.validators
+CRAWL_RECORD_KIND = "crawl"
+
+
+@lru_cache(maxsize=65536)
+def _url_keyword_hit(url: str) -> bool:
+    return bool(KEYWORD_RX.search(url))
+
 
-def normalize_url(base: str, href: str) -> Optional[str]:
-    if not href:
-        return None
-    href = href.strip()
-    if href.startswith("mailto:") or href.startswith("tel:") or href.startswith("javascript:"):
-        return None
-    full = urljoin(base, href)
-    # quita fragmentos
-    full, _ = urldefrag(full)
-    # solo http/https
-    parsed = urlparse(full)
-    if parsed.scheme not in ("http", "https"):
-        return None
-    return full
-
-
-def same_host(u: str, v: str) -> bool:
-    pu, pv = urlparse(u), urlparse(v)
-    return pu.netloc == pv.netloc
-
-
-def extract_links(html: str, base_url: str) -> List[Tuple[str, int]]:
-    """Devuelve [(url, score)] donde score alto si la URL/anchor coincide con KEYWORD_RX."""
-    soup = BeautifulSoup(html, "lxml")
-    links: List[Tuple[str, int]] = []
-    for a in soup.find_all("a", href=True):
-        url = normalize_url(base_url, a.get("href"))
+def extract_links(html: str, base_url: str, allowed_hosts: Optional[Set[str]] = None,
+                  deny_rx: Optional[re.Pattern] = None) -> List[Tuple[str, int]]:
+    return extract_links_from_page(as_page(html, base_url), allowed_hosts, deny_rx)
+
+
+def extract_links_from_page(page: ParsedPage, allowed_hosts: Optional[Set[str]] = None,
+                            deny_rx: Optional[re.Pattern] = None) -> List[Tuple[str, int]]:
+    """
+    Devuelve [(url, score)] donde score alto si la URL/anchor coincide con KEYWORD_RX.
+
+    Recorre los <a href> del árbol lxml compartido (sin BeautifulSoup), resuelve contra <base href>,
+    canonicaliza con normalize_url (cacheada) y aplica aquí mismo los filtros de host y deny.
+    Un enlace repetido en la página sale una vez, con su mejor score.
+    """
+    base_url = page.base_url
+    best: Dict[str, int] = {}
+    for a in page.lxml_root.iter("a"):
+        href = a.get("href")
+        if not href:
+            continue
+        url = normalize_url(base_url, href)
         if not url:
             continue
-        text = (a.get_text(" ", strip=True) or "") + " " + (a.get("title") or "")
-        score = 1
-        if KEYWORD_RX.search(url) or KEYWORD_RX.search(text):
-            score += 2
-        links.append((url, score))
+        if allowed_hosts is not None and url_host(url) not in allowed_hosts:
+            continue
+        if deny_rx is not None and deny_rx.search(url):
+            continue
+        if best.get(url) == LINK_MAX_SCORE:
+            continue
+        score = LINK_SCORE
+        if _url_keyword_hit(url) or KEYWORD_RX.search(f"{a.text_content()} {a.get('title') or ''}"):
+            score += LINK_KEYWORD_BONUS
+        if score > best.get(url, 0):
+            best[url] = score
     # ordena por score desc
-    links.sort(key=lambda x: x[1], reverse=True)
-    return links
+    return sorted(best.items(), key=lambda x: x[1], reverse=True)
 
 
 def run_extractors(html: str, url: str) -> List[Dict[str, Any]]:
     """Reutiliza tus extractores sin volver a hacer fetch."""
+    return run_extractors_on_page(as_page(html, url))
+
+
+# (etapa, extractor): mismos nombres de etapa que Orchestrator.run_once
+PAGE_EXTRACTORS = (
+    ("tourism-jsonld", tourism.extract_tourism_entities_from_page),    # Turismo JSON-LD / microdatos
+    ("tourism-listings", tourism.extract_portal_listings_from_page),   # Listados genéricos (tarjetas con datos)
+    ("ine-html", ine_extractor.extract_ine_tables_from_page),          # INE (no suele aplicar a portales turismo)
+    ("html-tables", html_tables.extract_html_tables_from_page),        # Tablas HTML genéricas
+)
+
+
+def run_extractors_on_page(page: ParsedPage, timer: Optional[StageTimer] = None) -> List[Dict[str, Any]]:
+    """Igual que run_extractors, pero sobre un documento ya parseado (un solo parse por página)."""
+    timer = timer or StageTimer()
     items: List[Dict[str, Any]] = []
-    # Turismo JSON-LD / microdatos
-    try:
-        items.extend(tourism.extract_tourism_entities(html, url))
-    except Exception as e:
-        LOG.debug(f"[extract] tourism jsonld failed: {e}")
-    # Listados genéricos (tarjetas con datos)
-    try:
-        items.extend(tourism.extract_portal_listings_generic(html, url))
-    except Exception as e:
-        LOG.debug(f"[extract] tourism listings failed: {e}")
-    # INE (no suele aplicar a portales turismo, pero no molesta)
-    try:
-        items.extend(ine_extractor.extract_ine_tables(html, url))
-    except Exception as e:
-        LOG.debug(f"[extract] ine failed: {e}")
-    # Tablas HTML genéricas
-    try:
-        items.extend(html_tables.extract_html_tables(html, url))
-    except Exception as e:
-        LOG.debug(f"[extract] html tables failed: {e}")
-    return items
+    for name, extractor in PAGE_EXTRACTORS:
+        try:
+            with timer.stage(name):
+                found = extractor(page)
+            timer.count(name, len(found))
+            items.extend(found)
+        except Exception as e:
+            LOG.debug(f"[extract] {name} failed: {e}")
+    # Mojibake: ftfy solo sobre los campos extraídos que lo necesitan
+    return repair_items(items)
 
 
 def dedupe_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -98,13 +139,7 @@ def dedupe_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     seen: Set[Tuple] = set()
     out: List[Dict[str, Any]] = []
     for e in entities:
-        key = (
-            (e.get("name") or "").strip().lower(),
-            e.get("entity_type"),
-            (e.get("telephone") or "").strip(),
-            (e.get("email") or "").strip(),
-            (e.get("url") or "").strip(),
-        )
+        key = entity_key(e)
         if key in seen:
             continue
         seen.add(key)
@@ -112,6 +147,184 @@ def dedupe_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return out
 
 
+def crawl_page(core: Core, url: str, link_filters: Optional[Dict[str, Any]] = None,
+               defer_robots: bool = False) -> Dict[str, Any]:
+    """
+    Fetch + extracción de una URL -> {final_url, items, links, not_modified, fetch, timing, items_by_extractor}.
+    Si la página no cambió (304 / mismo hash) reutiliza items y enlaces del crawl anterior.
+    link_filters: {"allowed_hosts", "deny_rx"} aplicados al extraer enlaces (ver extract_links_from_page).
+    defer_robots: host sin robots.txt todavía -> RobotsPending (el bucle del crawl la aparca) en vez de esperar.
+    Lanza excepción si el fetch falla.
+    """
+    timer = StageTimer()
+    with timer.stage("fetch"):
+        res = core.fetch_page(url, record_kind=CRAWL_RECORD_KIND, defer_robots=defer_robots)
+    final_url = res["url"]
+
+    # 304 / mismo contenido: reutiliza items y enlaces del crawl anterior sin extraer
+    prev = core.validators.load_record(url, CRAWL_RECORD_KIND) if (res["not_modified"] and core.validators) else None
+    if prev:
+        LOG.debug(f"[not-modified] {url}")
+        items = prev.get("items") or []
+        links = [tuple(x) for x in prev.get("links") or []]
+    else:
+        html = res["html"]
+        if html is None:
+            with timer.stage("fetch"):
+                final_url, html = core.fetch(url)
+        # Extrae (un único parse por árbol, perezoso, compartido por extractores y enlaces)
+        page = ParsedPage(html, final_url, timer=timer)
+        items = run_extractors_on_page(page, timer)
+        with timer.stage("links"):
+            links = extract_links_from_page(page, **(link_filters or {}))
+        if core.validators:
+            core.validators.save_record(url, {"items": items, "links": links}, CRAWL_RECORD_KIND)
+    return {"final_url": final_url, "items": items, "links": links, "not_modified": bool(prev),
+            "fetch": res.get("stats") or {}, **timer.as_dict()}
+
+
+def make_core(policy: SchedulingPolicy, archive: str = "", replay: str = "", state_dir: str = "",
+              max_bytes: int = MAX_BODY_BYTES) -> Core:
+    """
+    Core de red (grabando en 'archive' si se indica) o ReplayCore sobre 'replay' (sin red).
+    state_dir: cache, validadores, robots.txt y ritmo aprendido en disco ("" = solo en memoria).
+    """
+    if replay:
+        return ReplayCore(replay, policy=policy)
+    return Core(policy=policy, archive_path=archive or None, state_dir=state_dir or None, max_bytes=max_bytes or None)
+
+
+def _shard_of(url: str, n: int) -> int:
+    """Worker dueño del host (estable entre ejecuciones)."""
+    return zlib.crc32(urlparse(url).netloc.encode("utf-8")) % n
+
+
+def _crawl_worker(task_q: "mp.Queue", result_conn: Any, log_level: int, policy: SchedulingPolicy,
+                  link_filters: Optional[Dict[str, Any]] = None, core_opts: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Proceso worker: su propio Core (sesión, cache, robots y rate limit de SUS hosts).
+    Recibe (url, depth) y envía por su pipe (url, depth, resultado | None, error | None). None = fin.
+    Una URL de un host cuyo robots.txt aún no tiene se aparca (RobotsPending) y sigue con las demás.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # el coordinador gestiona Ctrl-C
+    logging.basicConfig(level=log_level)
+    core = make_core(policy, **(core_opts or {}))
+    released: deque = deque()
+    try:
+        while True:
+            released.extend(core.robots.take_ready())
+            if released:
+                url, depth = released.popleft()
+            else:
+                try:
+                    task = task_q.get(timeout=ROBOTS_POLL_S if core.robots.waiting() else None)
+                except queue.Empty:
+                    continue
+                if task is None:
+                    break
+                url, depth = task
+            LOG.info(f"[GET] {url}")
+            try:
+                result_conn.send((url, depth, crawl_page(core, url, link_filters, defer_robots=True), None))
+            except RobotsPending:
+                core.robots.defer(url, (url, depth))
+            except Exception as e:
+                result_conn.send((url, depth, None, f"{type(e).__name__}: {e}"))
+    finally:
+        core.close()  # guarda el ritmo aprendido de sus hosts
+        result_conn.close()
+
+
+def _run_sharded(n_workers: int, next_task, admit, record, fail,
+                 budget, policy: SchedulingPolicy, prefetch: int = 2,
+                 link_filters: Optional[Dict[str, Any]] = None, core_opts: Optional[Dict[str, Any]] = None,
+                 idle=lambda: False) -> None:
+    """
+    Coordinador multi-proceso: el frontier, el seen-set y el de-dupe viven aquí; cada URL se
+    envía al worker dueño de su host (crc32(host) % N), así la cortesía por host sigue siendo local
+    a un único proceso. Como mucho 'prefetch' tareas en vuelo por worker; lo que espera a un worker
+    ocupado se aparca en una cola local acotada.
+    next_task() -> (url, depth) | None; idle() se llama sin nada en vuelo ni en cola y devuelve
+    True si merece la pena volver a mirar (URLs esperando su robots.txt).
+    """
+    log_level = logging.getLogger().getEffectiveLevel()
+    task_qs: List[Any] = [None] * n_workers
+    # Un pipe de resultados por worker: uno que muere a medio envío solo corrompe el suyo (una cola
+    # compartida podría quedarse con su lock tomado y bloquear a los demás)
+    result_conns: List[Any] = [None] * n_workers
+    procs: List[Any] = [None] * n_workers
+
+    def spawn(w: int) -> None:
+        task_qs[w] = mp.Queue()
+        reader, writer = mp.Pipe(duplex=False)
+        result_conns[w] = reader
+        procs[w] = mp.Process(target=_crawl_worker, args=(task_qs[w], writer, log_level, policy, link_filters, core_opts),
+                              daemon=True)
+        procs[w].start()
+        writer.close()  # el coordinador solo lee: al morir el worker, recv() da EOF
+
+    for w in range(n_workers):
+        spawn(w)
+
+    parked: List[deque] = [deque() for _ in range(n_workers)]
+    # Tareas en vuelo por worker (url -> depth): si el worker muere, son las que se dan por fallidas
+    inflight: List[Dict[str, int]] = [{} for _ in range(n_workers)]
+    max_parked = n_workers * prefetch * 4
+    try:
+        while True:
+            # Rellena: saca de la cola global mientras haya presupuesto de páginas y sitio aparcado
+            n_parked = sum(len(d) for d in parked)
+            while n_parked < max_parked and budget(sum(map(len, inflight)) + n_parked) > 0:
+                nxt = next_task()
+                if nxt is None:
+                    break
+                if not admit(*nxt):
+                    continue
+                parked[_shard_of(nxt[0], n_workers)].append(nxt)
+                n_parked += 1
+            # Despacha a los workers con hueco
+            for w in range(n_workers):
+                while len(inflight[w]) < prefetch and parked[w]:
+                    url, depth = parked[w].popleft()
+                    task_qs[w].put((url, depth))
+                    inflight[w][url] = depth
+            if not any(inflight):
+                if idle():
+                    continue
+                break
+
+            for conn in mp_connection.wait(result_conns, timeout=WORKER_POLL_S):
+                w = result_conns.index(conn)
+                try:
+                    url, depth, res, err = conn.recv()
+                except Exception:
+                    # Worker muerto (OOM, crash de lxml...): sus tareas fallan y se relanza, así el run termina
+                    p = procs[w]
+                    p.join(timeout=WORKER_POLL_S)
+                    LOG.error(f"[worker] El worker {w} terminó inesperadamente (exitcode {p.exitcode}); se relanza")
+                    conn.close()
+                    lost, inflight[w] = inflight[w], {}
+                    for lost_url in lost:
+                        fail(lost_url, f"worker {w} terminó (exitcode {p.exitcode})")
+                    spawn(w)
+                    continue
+                inflight[w].pop(url, None)
+                if err is not None:
+                    fail(url, err)
+                    continue
+                record(url, depth, res)
+    finally:
+        for q in task_qs:
+            q.put(None)
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        for conn in result_conns:
+            conn.close()
+        # Lo aparcado y lo que estaba en vuelo queda in_progress: --resume lo vuelve a encolar
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="Crawler de portales turísticos (descubre entidades)")
     ap.add_argument("--seed", action="append", required=True,
@@ -123,109 +336,226 @@ def main() -> None:
     ap.add_argument("--allow", default="", help="Regex de allow para URLs (opcional)")
     ap.add_argument("--deny", default=r"\.(pdf|jpg|jpeg|png|gif|svg|webp|ico|zip|rar|7z|mp4|mp3|wav)$",
                     help="Regex de deny para URLs")
+    ap.add_argument("--format", default="csv", choices=["csv", "jsonl", "parquet"],
+                    help="Formato de entities/pages (se escriben en streaming)")
+    ap.add_argument("--flush-every", type=int, default=20, help="Vuelca entidades y log de páginas a disco cada N páginas")
+    ap.add_argument("--state-db", default="", help="SQLite con frontier/seen/índice de de-dupe (default: <outdir>/crawl_state.sqlite)")
+    ap.add_argument("--resume", action="store_true", help="Reanuda un crawl previo desde --state-db en vez de empezar de cero")
+    ap.add_argument("--commit-every", type=int, default=50, help="Operaciones de frontier por commit a disco")
+    ap.add_argument("--frontier-mem", type=int, default=100_000, help="Máximo de URLs en el heap en memoria (el resto queda en disco)")
+    ap.add_argument("--max-attempts", type=int, default=3, help="Al reanudar, reintenta URLs fallidas con menos intentos que esto")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Procesos de crawl; el frontier se reparte por host y cada worker tiene su Core")
+    ap.add_argument("--policy", default="",
+                    help=f"Política de cortesía (JSON/TOML: delays, reglas por host, reintentos); default: ${POLICY_ENV}")
+    ap.add_argument("--archive", default="",
+                    help="Guarda las respuestas crudas en este archivo .warc.gz (para --replay)")
+    ap.add_argument("--replay", default="",
+                    help="Sin red: re-extrae las páginas de un archivo grabado con --archive")
+    ap.add_argument("--state-dir", default=DEFAULT_STATE_DIR,
+                    help="Estado de red entre ejecuciones (cache HTTP, validadores, robots.txt, ritmo aprendido); "
+                         "vacío = solo en memoria")
+    ap.add_argument("--max-bytes", type=int, default=MAX_BODY_BYTES,
+                    help="Tope de bytes por página descargada; lo que pase se descarta (0 = sin tope)")
     ap.add_argument("--log-level", default="INFO", choices=["CRITICAL","ERROR","WARNING","INFO","DEBUG"])
     args = ap.parse_args()
 
     logging.basicConfig(level=getattr(logging, args.log_level))
     outdir = Path(args.outdir); outdir.mkdir(parents=True, exist_ok=True)
+    # Cortesía por despliegue: solo se aplica alrededor de las peticiones (Core)
+    policy = SchedulingPolicy.load(args.policy or None)
 
     allow_rx = re.compile(args.allow, re.I) if args.allow else None
     deny_rx = re.compile(args.deny, re.I) if args.deny else None
 
-    core = Core()  # tu Core respeta robots, cache, backoff, etc.
-
     # Conjunto de hosts permitidos (si same-domain=True, los de las seeds)
     allowed_hosts: Set[str] = set(urlparse(s).netloc for s in args.seed)
-
-    q: deque[str] = deque()
-    seen_urls: Set[str] = set()
-
-    # Inicializa cola con semillas
+    # Mismos filtros aplicados ya al extraer enlaces (en el worker, antes de volver al coordinador)
+    link_filters = {"allowed_hosts": allowed_hosts if args.same_domain else None, "deny_rx": deny_rx}
+    # Red (grabando con --archive) o replay sin red: cada worker abre su propio Core
+    core_opts = {"archive": args.archive, "replay": args.replay, "state_dir": args.state_dir, "max_bytes": args.max_bytes}
+    # En replay solo se visitan URLs archivadas (el resto no se puede servir)
+    replay_archive = PageArchive(args.replay) if args.replay else None
+    # Un solo proceso: Core aquí mismo (robots, cache, backoff y cortesía por host según la política, o replay)
+    core: Optional[Core] = make_core(policy, **core_opts) if args.workers <= 1 else None
+    # robots.txt en el coordinador: lo prohibido no llega a encolarse; cada host nuevo se pide en segundo plano
+    # (con un solo proceso, el mismo RobotsStore del Core: un robots.txt por host y su crawl-delay al limiter)
+    robots = None
+    if policy.respect_robots and not args.replay:
+        robots = core.robots if core is not None else RobotsStore(
+            state_path(args.state_dir, "robots"), user_agent=DEFAULT_HEADERS["User-Agent"], headers=DEFAULT_HEADERS)
+        for s in args.seed:
+            robots.prefetch(s)
+
+    # Frontier + seen-store en disco (reanudable con --resume)
+    crawl_db = Path(args.state_db) if args.state_db else outdir / "crawl_state.sqlite"
+    if not args.resume:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{crawl_db}{suffix}").unlink(missing_ok=True)
+    store = SqliteFrontier(str(crawl_db), batch_size=args.commit_every)
+    if args.resume:
+        store.resume(max_attempts=args.max_attempts)
+        LOG.info(f"[resume] {crawl_db}: {store.counts()}")
+    # Heap con score compuesto sobre el store (memoria acotada, de-dupe al encolar)
+    frontier = PriorityFrontier(store, max_in_memory=args.frontier_mem)
+
+    # Inicializa cola con semillas (si ya estaban, se respetan su estado)
     for s in args.seed:
-        q.append(s)
-
-    pages_crawled = 0
-    all_entities: List[Dict[str, Any]] = []
-    pages_log: List[Dict[str, Any]] = []
-
-    while q and pages_crawled < args.max_pages:
-        url = q.popleft()
-        if url in seen_urls:
-            continue
-        seen_urls.add(url)
-
+        frontier.push(s, keyword_score=SEED_SCORE, depth=0)
+    store.flush()
+
+    pages_crawled = store.counts().get("done", 0)
+
+    # Salidas en streaming + índice de de-dupe incremental (reanudable desde el store)
+    ent_sink = make_sink(args.format, outdir / "entities", ENTITY_COLUMNS, append=args.resume)
+    page_sink = make_sink(args.format, outdir / "pages", PAGE_COLUMNS, append=args.resume)
+    deduper = EntityDeduper(store.iter_entity_keys() if args.resume else None)
+    since_flush = 0
+    # Coste agregado del run (fetch, etapas, items por extractor) -> run_summary.json
+    run_stats = RunStats()
+    summary_path = outdir / "run_summary.json"
+
+    # URLs aparcadas por admit() cuyo robots.txt ya llegó: pasan delante del frontier
+    released: deque = deque()
+
+    def next_task() -> Optional[Tuple[str, int]]:
+        if robots is not None:
+            released.extend(robots.take_ready())
+        return released.popleft() if released else frontier.pop()
+
+    def idle() -> bool:
+        """Nada más que hacer: espera (poco) a que llegue algún robots.txt. -> False si nadie lo espera."""
+        if robots is None or not robots.waiting():
+            return False
+        robots.wait_ready(ROBOTS_IDLE_WAIT_S)
+        return True
+
+    def admit(url: str, depth: int) -> bool:
+        """Filtros de dominio/allow/deny/robots al sacar de la cola; marca skipped lo descartado."""
         # Restricción de dominio
         if args.same_domain:
             host = urlparse(url).netloc
             if host not in allowed_hosts:
                 LOG.debug(f"[skip] fuera de dominio: {url}")
-                continue
-
+                store.mark_skipped(url)
+                return False
+        if replay_archive is not None and url not in replay_archive:
+            LOG.debug(f"[skip] no archivada: {url}")
+            store.mark_skipped(url)
+            return False
         # Filtros allow/deny
         if deny_rx and deny_rx.search(url):
             LOG.debug(f"[deny] {url}")
-            continue
+            store.mark_skipped(url)
+            return False
         if allow_rx and not allow_rx.search(url):
             LOG.debug(f"[not-allowed] {url}")
-            continue
-
-        LOG.info(f"[GET] {url}")
-        try:
-            final_url, html = core.fetch(url)
-        except Exception as e:
-            LOG.warning(f"[fail] {url}: {e}")
-            continue
-
-        # Extrae
-        items = run_extractors(html, final_url)
-        # Guarda log de página
-        pages_log.append({
-            "url": final_url,
-            "items": len(items),
-            "ts": pd.Timestamp.utcnow().isoformat()
-        })
-
-        # Acumula entidades
-        for it in items:
-            if it.get("type") == "entity":
-                all_entities.append(it)
-
-        # Descubre nuevos enlaces
-        for next_url, score in extract_links(html, final_url):
-            if next_url in seen_urls:
+            store.mark_skipped(url)
+            return False
+        # Reglas que llegaron después de encolar la URL
+        allowed = robots.can_fetch(url) if robots is not None else True
+        if allowed is None:
+            # Host aún sin reglas: se aparca sin esperar y vuelve por next_task() cuando lleguen
+            robots.defer(url, (url, depth))
+            return False
+        if not allowed:
+            LOG.debug(f"[robots] {url}")
+            store.mark_skipped(url)
+            return False
+        return True
+
+    def record(url: str, depth: int, res: Dict[str, Any]) -> None:
+        """Coordinador: encola enlaces, de-dupe de entidades y escritura a los sinks."""
+        nonlocal pages_crawled, since_flush
+        items, final_url = res["items"], res["final_url"]
+        run_stats.add_page(res.get("timing"), res.get("fetch"), res.get("items_by_extractor"), res["not_modified"])
+
+        # Descubre nuevos enlaces (duplicados se descartan al encolar)
+        for next_url, score in res["links"]:
+            if next_url in frontier:
                 continue
-            # misma restricción que arriba, pero barata antes de encolar
-            if args.same_domain and urlparse(next_url).netloc not in allowed_hosts:
+            # misma restricción que arriba, pero barata antes de encolar (los enlaces de un 304
+            # vienen del record guardado, que pudo extraerse con otros filtros)
+            if args.same_domain and url_host(next_url) not in allowed_hosts:
                 continue
             if deny_rx and deny_rx.search(next_url):
                 continue
-            # Prioriza: palabras clave van al frente
-            if KEYWORD_RX.search(next_url):
-                q.appendleft(next_url)
-            else:
-                q.append(next_url)
-
-        pages_crawled += 1
-        LOG.info(f"[progress] {pages_crawled}/{args.max_pages} páginas, entidades={len(all_entities)}")
+            # robots.txt sin esperar: host nuevo -> se pide en segundo plano y admit() lo revisa al sacarlo
+            if robots is not None and robots.can_fetch(next_url) is False:
+                continue
+            # Prioriza por score compuesto: palabras clave, profundidad, reparto por host, antigüedad
+            frontier.push(next_url, keyword_score=score, depth=depth + 1)
 
-        # Pausa ligera entre iteraciones para no encadenar rápido (Core ya hace throttle per host)
-        time.sleep(0.3)
+        # Entidades nuevas al sink (de-dupe incremental por huella de clave)
+        new_keys: List[int] = []
+        for it in items:
+            if it.get("type") != "entity":
+                continue
+            key = deduper.add(it)
+            if key is not None:
+                new_keys.append(key)
+                ent_sink.write(it)
+        store.mark_done(url, final_url=final_url, items=len(items), not_modified=res["not_modified"], entity_keys=new_keys)
+        page_sink.write({"url": final_url, "items": len(items), "not_modified": res["not_modified"],
+                         "ts": pd.Timestamp.utcnow().isoformat()})
 
-    # De-dupe y exporta
-    all_entities = dedupe_entities(all_entities)
-    ent_path = outdir / "entities.csv"
-    if all_entities:
-        # normaliza same_as a string
-        for e in all_entities:
-            if isinstance(e.get("same_as"), list):
-                e["same_as"] = ";".join(map(str, e["same_as"]))
-        pd.DataFrame(all_entities).to_csv(ent_path, index=False)
+        pages_crawled += 1
+        since_flush += 1
+        if since_flush >= args.flush_every:
+            # Primero los sinks y luego el estado (páginas done + huellas de de-dupe): ante un crash
+            # entre ambos, --resume repite esas páginas y re-emite sus entidades en vez de perderlas
+            ent_sink.flush(); page_sink.flush(); store.flush()
+            run_stats.write(summary_path)
+            since_flush = 0
+        LOG.info(f"[progress] {pages_crawled}/{args.max_pages} páginas, entidades={len(deduper)}")
+
+    def fail(url: str, err: Any) -> None:
+        LOG.warning(f"[fail] {url}: {err}")
+        run_stats.add_failure()
+        store.mark_failed(url)
 
-    # Log de páginas
-    pd.DataFrame(pages_log).to_csv(outdir / "pages.csv", index=False)
+    try:
+        if core is None:
+            _run_sharded(args.workers, next_task, admit, record, fail,
+                         budget=lambda inflight: args.max_pages - pages_crawled - inflight, policy=policy,
+                         link_filters=link_filters, core_opts=core_opts, idle=idle)
+        else:
+            while pages_crawled < args.max_pages:
+                nxt = next_task()
+                if nxt is None:
+                    if idle():
+                        continue
+                    break
+                url, depth = nxt
+                if not admit(url, depth):
+                    continue
+
+                LOG.info(f"[GET] {url}")
+                try:
+                    res = crawl_page(core, url, link_filters, defer_robots=True)
+                except RobotsPending:
+                    core.robots.defer(url, (url, depth))
+                    continue
+                except Exception as e:
+                    fail(url, e)
+                    continue
+                record(url, depth, res)
+    except KeyboardInterrupt:
+        LOG.warning(f"[interrupt] Crawl interrumpido; reanuda con --resume (estado en {crawl_db})")
+    finally:
+        if core is not None:
+            core.close()  # también su RobotsStore, el del coordinador con un solo proceso
+        ent_sink.close()
+        page_sink.close()
+        store.close()  # tras los sinks, por lo mismo que en record()
+        if robots is not None and core is None:
+            robots.close()
+        run_stats.write(summary_path)
 
     print(f"[OK] Páginas rastreadas: {pages_crawled}")
-    print(f"[OK] Entidades encontradas (únicas): {len(all_entities)}")
-    if all_entities:
-        print(f"[OK] Guardado: {ent_path}")
-    print(f"[OK] Log de páginas: {outdir / 'pages.csv'}")
+    print(f"[OK] Entidades encontradas (únicas): {len(deduper)}")
+    if ent_sink.path.exists():
+        print(f"[OK] Guardado: {ent_sink.path}")
+    print(f"[OK] Log de páginas: {page_sink.path}")
+    print(f"[OK] Resumen del run: {summary_path}")
+    print(f"[OK] Estado del crawl: {crawl_db}")
@@ -9,7 +9,9 @@ from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from crewai_html_extractor.scraper.core import DEFAULT_STATE_DIR, Core, ReplayCore
 from crewai_html_extractor.scraper.orchestrator import Orchestrator
+from crewai_html_extractor.scraper.policy import POLICY_ENV, SchedulingPolicy
 
 
 def _ensure_outdir(path: str) -> Path:
@@ -122,6 +124,11 @@ def main() -> None:
     ap.add_argument("--enable-network", action="store_true", help="Capturar respuestas de red (si hay extractor de red)")
     ap.add_argument("--export-long", action="store_true", help="Exportar tablas en formato largo (long.csv)")
     ap.add_argument("--parquet", action="store_true", help="Si --export-long, exportar también long.parquet (requiere pyarrow)")
+    ap.add_argument("--policy", default="", help=f"Política de cortesía (JSON/TOML); default: ${POLICY_ENV}")
+    ap.add_argument("--archive", default="", help="Guarda la respuesta cruda en este archivo .warc.gz (para --replay)")
+    ap.add_argument("--replay", default="", help="Sin red: extrae la URL desde un archivo grabado con --archive")
+    ap.add_argument("--state-dir", default=DEFAULT_STATE_DIR,
+                    help="Estado entre ejecuciones (cache HTTP, validadores, robots.txt, ritmo aprendido); vacío = sin estado")
     ap.add_argument("--log-level", default="WARNING", choices=["CRITICAL","ERROR","WARNING","INFO","DEBUG"], help="Nivel de logging")
     args = ap.parse_args()
 
@@ -129,7 +136,12 @@ def main() -> None:
 
     outdir = _ensure_outdir(args.outdir)
 
-    orch = Orchestrator()
+    policy = SchedulingPolicy.load(args.policy or None)
+    if args.replay:
+        # Replay: sin red ni revalidación (siempre se vuelve a extraer)
+        orch = Orchestrator(core=ReplayCore(args.replay, policy=policy), revalidate=False)
+    else:
+        orch = Orchestrator(core=Core(policy=policy, archive_path=args.archive or None, state_dir=args.state_dir or None))
     record = orch.run_once(args.url, enable_network=args.enable_network)
 
     # record.json
@@ -0,0 +1,237 @@
+# crewai_html_extractor/scraper/adaptive.py
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+LOG = logging.getLogger("crewai.adaptive")
+
+# Respuestas que piden frenar (el servidor se queja o se defiende)
+SLOWDOWN_STATUSES = (403, 429, 503)
+# Peso de la última latencia en la media móvil
+_EWMA_ALPHA = 0.3
+# Tras un frenazo, respuestas que se ignoran como señal de frenar (las que ya estaban en vuelo)
+_COOLDOWN = 5
+# Latencia base mínima (s): con respuestas de milisegundos, el ruido no cuenta como "creciente"
+_MIN_BASELINE_S = 0.05
+
+
+class AdaptiveThrottle:
+    """
+    Intervalo y concurrencia por host aprendidos al estilo AIMD (aumento aditivo, reducción multiplicativa):
+
+    - respuesta sana (media móvil de latencia <= latency_factor x la base del host): la tasa (1/intervalo)
+      sube increase_rps; cada 10 x concurrencia respuestas sanas seguidas, +1 de concurrencia (hasta max_concurrency)
+    - latencia creciente: intervalo x 1.25 y -1 de concurrencia
+    - 403/429/503 o error de red: intervalo x 2 (al menos min_backoff_s) y concurrencia a la mitad
+    - otros 4xx/5xx (404 de enlaces muertos, 500...): ni aceleran ni frenan, ni cuentan para la racha
+    - tras frenar, las _COOLDOWN respuestas siguientes no vuelven a frenar (llegan de peticiones ya en vuelo)
+    - intervalo siempre dentro de [min_interval_s, max_interval_s]; la base es la mejor media vista,
+      que sube despacio si el host se vuelve más lento de forma sostenida
+
+    observe(host, status, latency_s) registra una respuesta (status None = error de red); Core pasa
+    interval(host) a su rate limiter en cada reserva y usa concurrency(host) en sus huecos por host.
+    Lo aprendido se guarda en SQLite (path) y la siguiente ejecución arranca desde ahí.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = ".throttle.sqlite",
+        start_interval_s: float = 3.0,
+        start_concurrency: int = 1,
+        min_interval_s: float = 1.0,
+        max_interval_s: float = 60.0,
+        max_concurrency: int = 4,
+        increase_rps: float = 0.05,
+        latency_factor: float = 2.0,
+        min_backoff_s: float = 1.0,
+        save_every_s: float = 5.0,
+    ) -> None:
+        self.start_interval_s = max(0.0, float(start_interval_s))
+        self.start_concurrency = max(1, int(start_concurrency))
+        self.min_interval_s = max(0.0, float(min_interval_s))
+        self.max_interval_s = max(self.min_interval_s, float(max_interval_s))
+        self.max_concurrency = max(self.start_concurrency, int(max_concurrency))
+        self.increase_rps = float(increase_rps)
+        self.latency_factor = float(latency_factor)
+        self.min_backoff_s = float(min_backoff_s)
+        self.save_every_s = float(save_every_s)
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, float] = {}  # host -> último guardado
+        self._lock = threading.Lock()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hosts ("
+                " host TEXT PRIMARY KEY, interval_s REAL, concurrency INTEGER, latency_s REAL,"
+                " baseline_s REAL, updated_at REAL)"
+            )
+            self._conn.commit()
+            # Lo aún no guardado (aceleraciones recientes) también al salir, aunque nadie llame a close()
+            ref = weakref.ref(self)
+            atexit.register(lambda: ref() is not None and ref().flush())
+
+    # ---------- estado ----------
+    def _state(self, host: str) -> Dict[str, Any]:
+        """Estado del host (de memoria, disco o valores iniciales). Llamar con el lock tomado."""
+        st = self._hosts.get(host)
+        if st is not None:
+            return st
+        st = {"interval_s": self.start_interval_s, "concurrency": self.start_concurrency,
+              "latency_s": None, "baseline_s": None, "streak": 0, "cooldown": 0, "saved_at": time.monotonic()}
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT interval_s, concurrency, latency_s, baseline_s FROM hosts WHERE host=?", (host,)
+            ).fetchone()
+            if row is not None:
+                st.update(
+                    interval_s=min(self.max_interval_s, max(self.min_interval_s, row[0])),
+                    concurrency=min(self.max_concurrency, max(1, int(row[1]))),
+                    latency_s=row[2], baseline_s=row[3],
+                )
+        self._hosts[host] = st
+        return st
+
+    def interval(self, host: str) -> float:
+        with self._lock:
+            return self._state(host)["interval_s"]
+
+    def concurrency(self, host: str) -> int:
+        with self._lock:
+            return self._state(host)["concurrency"]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{host: {interval_s, concurrency, latency_s}} de los hosts vistos en esta ejecución."""
+        with self._lock:
+            return {h: {k: st[k] for k in ("interval_s", "concurrency", "latency_s")} for h, st in self._hosts.items()}
+
+    # ---------- aprendizaje ----------
+    def observe(self, host: str, status: Optional[int], latency_s: Optional[float]) -> None:
+        with self._lock:
+            st = self._state(host)
+            old = (st["interval_s"], st["concurrency"])
+            if latency_s is not None:
+                ewma = latency_s if st["latency_s"] is None else (
+                    _EWMA_ALPHA * latency_s + (1 - _EWMA_ALPHA) * st["latency_s"])
+                base = st["baseline_s"]
+                st["latency_s"] = ewma
+                st["baseline_s"] = ewma if base is None or ewma < base else base + 0.02 * (ewma - base)
+
+            reason = ""
+            slow_status = status is None or status in SLOWDOWN_STATUSES
+            slow_latency = bool(st["latency_s"] and st["baseline_s"]) and (
+                st["latency_s"] > self.latency_factor * max(st["baseline_s"], _MIN_BASELINE_S))
+            if (slow_status or slow_latency) and st["cooldown"] > 0:
+                st["cooldown"] -= 1
+                st["streak"] = 0
+            elif slow_status:
+                reason = f"status {status}" if status else "error de red"
+                st["interval_s"] = max(st["interval_s"] * 2, self.min_backoff_s)
+                st["concurrency"] = max(1, st["concurrency"] // 2)
+            elif slow_latency:
+                reason = f"latencia {st['latency_s']:.2f}s (base {st['baseline_s']:.2f}s)"
+                st["interval_s"] = max(st["interval_s"] * 1.25, self.min_interval_s)
+                st["concurrency"] = max(1, st["concurrency"] - 1)
+            elif status < 400:
+                st["cooldown"] = max(0, st["cooldown"] - 1)
+                if st["interval_s"] > 0:
+                    st["interval_s"] = 1.0 / (1.0 / st["interval_s"] + self.increase_rps)
+                st["streak"] += 1
+                if st["streak"] >= 10 * st["concurrency"] and st["concurrency"] < self.max_concurrency:
+                    st["concurrency"] += 1
+                    st["streak"] = 0
+            if reason:
+                st["cooldown"] = _COOLDOWN
+                st["streak"] = 0
+            st["interval_s"] = min(self.max_interval_s, max(self.min_interval_s, st["interval_s"]))
+            new = (st["interval_s"], st["concurrency"])
+            now = time.monotonic()
+            # Frenazos a disco en el acto; las aceleraciones, como mucho cada save_every_s
+            if reason or now - st["saved_at"] >= self.save_every_s:
+                self._save(host, st, now)
+            else:
+                self._dirty[host] = now
+        if reason and new != old:
+            LOG.info(f"[adaptive] {host}: {reason} -> intervalo {new[0]:.2f}s, concurrencia {new[1]}")
+
+    # ---------- persistencia ----------
+    def _save(self, host: str, st: Dict[str, Any], now: float) -> None:
+        st["saved_at"] = now
+        self._dirty.pop(host, None)
+        if self._conn is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO hosts VALUES (?,?,?,?,?,?)",
+            (host, st["interval_s"], st["concurrency"], st["latency_s"], st["baseline_s"], time.time()),
+        )
+        self._conn.commit()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            now = time.monotonic()
+            for host in list(self._dirty):
+                self._save(host, self._hosts[host], now)
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+
+class HostSlots:
+    """Peticiones en vuelo por host con un límite que puede cambiar (limit(host) se mira en cada entrada)."""
+
+    def __init__(self, limit: Callable[[str], int]) -> None:
+        self._limit = limit
+        self._inflight: Dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._cond:
+            while self._inflight.get(host, 0) >= max(1, self._limit(host)):
+                self._cond.wait()
+            self._inflight[host] = self._inflight.get(host, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._inflight[host] -= 1
+                self._cond.notify_all()
+
+
+class AsyncHostSlots:
+    """Como HostSlots, para asyncio (ligado al loop en el que se crea)."""
+
+    def __init__(self, limit: Callable[[str], int]) -> None:
+        self._limit = limit
+        self._inflight: Dict[str, int] = {}
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight.get(host, 0) < max(1, self._limit(host)))
+            self._inflight[host] = self._inflight.get(host, 0) + 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._inflight[host] -= 1
+                self._cond.notify_all()
@@ -0,0 +1,188 @@
+# crewai_html_extractor/scraper/archive.py
+from __future__ import annotations
+
+import gzip
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.client import responses as HTTP_REASONS
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Cabeceras que describen el transporte, no el cuerpo guardado (ya descomprimido y completo)
+_HOP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive"}
+# Lectura secuencial de rebuild_index(): en memoria, un trozo y el registro en curso
+_READ_CHUNK = 1 << 20
+
+
+class PageArchive:
+    """
+    Archivo de respuestas crudas, solo de añadir, en formato WARC (.warc.gz): cada respuesta es un
+    registro WARC 'response' en su propio miembro gzip, así se puede leer uno sin descomprimir el resto.
+
+    - append(url, final_url, status, headers, body) -> offset del registro
+    - get(url) -> {"url", "status", "headers", "body", "date"} | None   (la última versión de la URL)
+    - urls() / url in archive / len(archive)
+
+    Índice de offsets en '<archivo>.idx' (TSV: url, offset, longitud, status, fecha), también solo de
+    añadir; si falta se reconstruye recorriendo los miembros. Las escrituras usan O_APPEND con una sola
+    write() por registro y por línea de índice, así varios procesos (crawl --workers) pueden compartir
+    el mismo archivo.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        self.index_path = f"{self.path}.idx"
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._index: Dict[str, Tuple[int, int]] = {}
+        if os.path.exists(self.index_path):
+            self._load_index()
+        elif os.fstat(self._fd).st_size:
+            self.rebuild_index()
+
+    # ---------- índice ----------
+    def _load_index(self) -> None:
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 3:
+                    continue  # línea a medias (proceso interrumpido)
+                try:
+                    self._index[parts[0]] = (int(parts[1]), int(parts[2]))
+                except ValueError:
+                    continue
+
+    def _append_index(self, entries: Iterable[Tuple[str, int, int, int, str]]) -> None:
+        lines = "".join(f"{u}\t{off}\t{n}\t{status}\t{date}\n" for u, off, n, status, date in entries)
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def _members(self) -> Iterator[Tuple[int, int, bytes]]:
+        """Recorre el archivo miembro a miembro, leyendo por trozos -> (offset, longitud comprimida, registro)."""
+        with open(self.path, "rb") as f:
+            pos, buf = 0, b""
+            while True:
+                d = zlib.decompressobj(wbits=31)
+                parts, n = [], 0
+                while not d.eof:
+                    if not buf:
+                        buf = f.read(_READ_CHUNK)
+                        if not buf:
+                            return  # fin del archivo (o cola truncada a medio miembro)
+                    try:
+                        parts.append(d.decompress(buf))
+                    except zlib.error:
+                        return  # cola truncada
+                    n += len(buf) - len(d.unused_data)
+                    buf = d.unused_data
+                yield pos, n, b"".join(parts)
+                pos += n
+
+    def rebuild_index(self) -> int:
+        """Reconstruye '<archivo>.idx' desde los registros. -> nº de registros."""
+        entries = []
+        for off, n, raw in self._members():
+            warc, _ = _split_head(raw)
+            uri = warc.get("warc-target-uri")
+            if not uri:
+                continue
+            status = int(_split_http(raw)[0] or 0)
+            for u in {uri, warc.get("warc-crewai-requested-uri") or uri}:
+                entries.append((u, off, n, status, warc.get("warc-date", "")))
+                self._index[u] = (off, n)
+        Path(self.index_path).unlink(missing_ok=True)
+        self._append_index(entries)
+        return len({e[1] for e in entries})
+
+    # ---------- escritura ----------
+    def append(self, url: str, final_url: str, status: int, headers: Dict[str, str], body: bytes) -> int:
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        http_head = f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+        http_head += "".join(f"{k}: {v}\r\n" for k, v in headers.items() if k.lower() not in _HOP_HEADERS)
+        http_head += f"Content-Length: {len(body)}\r\n\r\n"
+        block = http_head.encode("latin-1", errors="replace") + body
+        warc_head = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {date}\r\n"
+            f"WARC-Target-URI: {final_url}\r\n"
+            f"WARC-Crewai-Requested-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(block)}\r\n\r\n"
+        )
+        data = gzip.compress(warc_head.encode("utf-8") + block + b"\r\n\r\n", compresslevel=6)
+        with self._lock:
+            os.write(self._fd, data)
+            # Con O_APPEND el offset del fd queda al final de NUESTRA escritura
+            offset = os.lseek(self._fd, 0, os.SEEK_CUR) - len(data)
+            urls = {final_url, url}
+            self._append_index((u, offset, len(data), status, date) for u in urls)
+            for u in urls:
+                self._index[u] = (offset, len(data))
+        return offset
+
+    # ---------- lectura ----------
+    def __contains__(self, url: str) -> bool:
+        return url in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def urls(self) -> Iterator[str]:
+        return iter(list(self._index))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        loc = self._index.get(url)
+        if loc is None:
+            return None
+        raw = gzip.decompress(os.pread(self._fd, loc[1], loc[0]))
+        warc, _ = _split_head(raw)
+        status, headers, body = _split_http(raw)
+        return {
+            "url": warc.get("warc-target-uri") or url,
+            "status": status,
+            "headers": headers,
+            "body": body,
+            "date": warc.get("warc-date"),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def _split_head(raw: bytes) -> Tuple[Dict[str, str], int]:
+    """Cabeceras WARC (claves en minúscula) y offset del bloque HTTP."""
+    end = raw.find(b"\r\n\r\n")
+    head = raw[:end].decode("utf-8", errors="replace").split("\r\n")[1:]
+    fields = {}
+    for line in head:
+        k, _, v = line.partition(":")
+        fields[k.strip().lower()] = v.strip()
+    return fields, end + 4
+
+
+def _split_http(raw: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    _, start = _split_head(raw)
+    end = raw.find(b"\r\n\r\n", start)
+    lines = raw[start:end].decode("latin-1").split("\r\n")
+    try:
+        status = int(lines[0].split(" ", 2)[1])
+    except (IndexError, ValueError):
+        status = 0
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        k, _, v = line.partition(":")
+        headers[k.strip()] = v.strip()
+    length = int(headers.get("Content-Length") or 0)
+    return status, headers, raw[end + 4:end + 4 + length]
@@ -1,22 +1,53 @@
 # crewai_html_extractor/scraper/core.py
 from __future__ import annotations
 
-import re, time, random, logging
-from typing import Tuple, Dict, Any, Optional
+import os, re, time, random, logging, asyncio, hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Tuple, Dict, Any, Iterable, List, Optional, Union
 from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
-# NUEVO: cache y robots
-try:
-    import requests_cache
-except Exception:
-    requests_cache = None
-
-import urllib.robotparser as robotparser
+from .adaptive import AdaptiveThrottle, AsyncHostSlots, HostSlots
+from .archive import PageArchive
+from .encoding import decode_html
+from .httpcache import CachedSession, HttpCache
+from .policy import SchedulingPolicy
+from .ratelimit import RateRule
+from .robots import RobotsStore
+from .validators import ValidatorStore
 
 LOG = logging.getLogger("crewai.core")
 
+# Tipos que se descargan como página; el resto se corta tras las cabeceras (sin Content-Type: se acepta)
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Tope por defecto del cuerpo descargado (lo que pase se descarta)
+MAX_BODY_BYTES = 10 << 20
+_CHUNK = 64 * 1024
+# AsyncCore: cada cuánto (s) mira si ya llegó el robots.txt de un host nuevo (sin bloquear el loop)
+ROBOTS_POLL_S = 0.05
+
+# Estado persistente de Core bajo state_dir (por defecto DEFAULT_STATE_DIR; None o "" = nada en disco)
+DEFAULT_STATE_DIR = ".crewai_state"
+STATE_FILES = {
+    "cache": "http_cache",  # HttpCache añade .sqlite (o es un directorio con backend "fs")
+    "validators": "http_validators.sqlite",
+    "robots": "robots.sqlite",
+    "throttle": "throttle.sqlite",
+}
+
+DEFAULT_HEADERS = {
+    # UA realista
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-ES,es;q=0.9",
+}
+
 def parse_landing(url: str, html: str) -> dict:
     soup = BeautifulSoup(html, "lxml")
     title = soup.title.string.strip() if soup.title and soup.title.string else None
@@ -33,32 +64,65 @@ def normalize(record: dict) -> dict:
     if rec.get("meta_description"): rec["meta_description"] = re.sub(r"\s+", " ", rec["meta_description"]).strip()
     return rec
 
+def state_path(state_dir: Optional[str], kind: str, path: Optional[str] = None) -> Optional[str]:
+    """
+    Ruta del estado 'kind' (STATE_FILES): la explícita si se da ("" = desactivado);
+    si no, <state_dir>/<fichero>; sin state_dir, None (solo en memoria / sin ese estado).
+    """
+    if path is not None:
+        return path or None
+    return os.path.join(state_dir, STATE_FILES[kind]) if state_dir else None
+
 def _decode_html(resp: requests.Response) -> str:
-    raw = resp.content
-    if resp.encoding:
-        txt = resp.text
-    else:
-        try:
-            from charset_normalizer import from_bytes
-            best = from_bytes(raw).best()
-            txt = raw.decode(best.encoding, errors="replace") if best and best.encoding else raw.decode("utf-8", errors="replace")
-        except Exception:
-            txt = raw.decode("utf-8", errors="replace")
-    if "Ã" in txt or "√" in txt or "�" in txt:
-        try:
-            from ftfy import fix_text
-            txt = fix_text(txt)
-        except Exception:
-            pass
-    return txt
+    # El mojibake ya no se repara aquí sobre todo el HTML, sino en los campos extraídos (encoding.repair_items)
+    return decode_html(resp.content, resp.headers.get("Content-Type"))
+
+
+class ResponseRejected(RuntimeError):
+    """Respuesta descartada sin reintentar (p. ej. un PDF enlazado como página o un 404)."""
+
+
+class RobotsPending(RuntimeError):
+    """
+    El robots.txt del host aún no ha llegado (ya se está pidiendo): la URL no se pide todavía.
+    Solo con fetch_page(..., defer_robots=True): quien tenga cola la aparca con core.robots.defer(url, item)
+    y sigue con otras; take_ready() la devuelve.
+    """
+
 
 class Core:
     """
     fetch(url) -> (final_url, html)
-    - Rate limit con jitter
+    - Rate limit por host (token bucket con jitter, reglas por patrón de host)
     - Reintentos 429/503 (Retry-After)
-    - Respeto básico de robots.txt (crawl-delay)
-    - Cache (requests-cache) si está instalado
+    - robots.txt (RobotsStore: reglas con TTL, descarga en segundo plano): crawl-delay al rate limiter y,
+      con policy.respect_robots, las URLs prohibidas no se piden. Con un host nuevo, fetch/fetch_page
+      esperan sus reglas (como mucho robots.timeout); los lotes piden defer_robots=True y reciben
+      RobotsPending para aparcar la URL y seguir con otras
+    - Cache HTTP propia (HttpCache: SQLite o ficheros, cuerpos comprimidos, tamaño acotado,
+      TTL por host desde policy.cache_ttl, stale-if-error); cache_stats() -> hit ratio, bytes ahorrados
+    - GET condicional (If-None-Match / If-Modified-Since) con validadores por URL (ValidatorStore acotado:
+      validators_ttl_s sin uso -> se olvidan; más de validators_max_entries URLs -> LRU)
+    - Cortesía adaptativa (policy.adaptive): intervalo y concurrencia por host aprendidos (AIMD) de la
+      latencia y de 403/429/503, guardados en throttle_path para la siguiente ejecución; host_slot(url)
+      limita las peticiones simultáneas al host
+    - Cortesía según una SchedulingPolicy (por defecto, la de $CREWAI_POLICY si existe);
+      los kwargs explícitos (min_delay_s, max_delay_s, max_retries, rate_limits) la sobrescriben
+    - archive_path: guarda cada respuesta 200 cruda en un PageArchive (.warc.gz) para re-extraer
+      después sin red (ReplayCore)
+    - Descarga en streaming: un 200 que no sea HTML (html_types) se corta tras las cabeceras y lanza
+      ResponseRejected (sin reintentos); el cuerpo se lee hasta max_bytes y lo que pase se descarta
+      (stats["truncated"]; una página truncada no entra en la cache HTTP ni en el archivo)
+
+    - Estado en disco bajo state_dir (default DEFAULT_STATE_DIR): cache HTTP, validadores, robots.txt y
+      ritmo aprendido (STATE_FILES); cache_name / validators_path / robots_path / throttle_path fijan uno
+      concreto ("" lo desactiva). Con state_dir=None, robots y ritmo viven en memoria y no hay cache ni
+      validadores
+
+    fetch_page(url, record_kind=..., defer_robots=False) -> dict con url, html, status, not_modified, validadores
+    y stats ({bytes, from_cache, retries, sleep_s, status}).
+    not_modified=True (304 o mismo hash de contenido) => el llamador puede reutilizar el
+    record guardado en core.validators bajo ese kind en vez de volver a extraer.
     """
 
     def __init__(
@@ -66,127 +130,482 @@ class Core:
         timeout: int = 25,
         verify_ssl: bool = True,
         headers: Optional[Dict[str, str]] = None,
-        min_delay_s: float = 3.0,
-        max_delay_s: float = 8.0,
-        max_retries: int = 4,
-        cache_name: Optional[str] = ".http_cache",
+        min_delay_s: Optional[float] = None,
+        max_delay_s: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        cache_name: Optional[str] = None,
         cache_expire_s: int = 3600,
+        cache_backend: str = "sqlite",
+        cache_max_bytes: Optional[int] = 1 << 30,
+        cache_eviction: str = "lru",
+        rate_limits: Optional[Dict[str, RateRule]] = None,
+        validators_path: Optional[str] = None,
+        validators_ttl_s: Optional[float] = 30 * 86400,
+        validators_max_entries: Optional[int] = 200_000,
+        policy: Optional[SchedulingPolicy] = None,
+        archive_path: Optional[str] = None,
+        robots_path: Optional[str] = None,
+        robots_ttl_s: float = 86400,
+        max_bytes: Optional[int] = MAX_BODY_BYTES,
+        html_types: Tuple[str, ...] = HTML_CONTENT_TYPES,
+        throttle_path: Optional[str] = None,
+        state_dir: Optional[str] = DEFAULT_STATE_DIR,
     ) -> None:
         self.timeout = timeout
         self.verify_ssl = verify_ssl
-        self.headers = headers or {
-            # UA realista
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "es-ES,es;q=0.9",
-        }
-        self.min_delay_s = min_delay_s
-        self.max_delay_s = max_delay_s
-        self.max_retries = max_retries
-
-        # Sesión (con cache si disponible)
-        if requests_cache and cache_name:
-            self.session = requests_cache.CachedSession(
-                cache_name=cache_name,
-                expire_after=cache_expire_s,
-                allowable_methods=("GET",),
-                stale_if_error=True,
+        self.headers = headers or dict(DEFAULT_HEADERS)
+        self.policy = (policy or SchedulingPolicy.load()).replace(
+            min_delay_s=min_delay_s, max_delay_s=max_delay_s, max_retries=max_retries, rate_limits=rate_limits,
+        )
+        self.min_delay_s = self.policy.min_delay_s
+        self.max_delay_s = self.policy.max_delay_s
+        self.max_retries = int(self.policy.max_retries)
+        self.max_bytes = max_bytes
+        self.html_types = tuple(html_types)
+        self.state_dir = state_dir
+        cache_name = state_path(state_dir, "cache", cache_name)
+        validators_path = state_path(state_dir, "validators", validators_path)
+        robots_path = state_path(state_dir, "robots", robots_path)
+        throttle_path = state_path(state_dir, "throttle", throttle_path)
+
+        # Sesión (con cache si cache_name)
+        self.cache: Optional[HttpCache] = None
+        if cache_name:
+            self.cache = HttpCache(
+                cache_name, backend=cache_backend, ttl_s=cache_expire_s, ttl_rules=self.policy.cache_ttl,
+                max_bytes=cache_max_bytes, eviction=cache_eviction, stale_if_error=True,
             )
+            self.session = CachedSession(self.cache)
         else:
             self.session = requests.Session()
 
         self.session.headers.update(self.headers)
-        self._robots_cache: Dict[str, robotparser.RobotFileParser] = {}
-        self._last_fetch_per_host: Dict[str, float] = {}
-
-    def _respect_robots(self, url: str) -> float:
-        """Devuelve crawl-delay (segundos) si existe; 0 si no."""
-        parsed = urlparse(url)
-        host = f"{parsed.scheme}://{parsed.netloc}"
-        if host not in self._robots_cache:
-            rp = robotparser.RobotFileParser()
-            rp.set_url(f"{host}/robots.txt")
-            try:
-                rp.read()
-            except Exception:
-                rp = None
-            self._robots_cache[host] = rp  # puede ser None
-        rp = self._robots_cache[host]
-        if rp and hasattr(rp, "crawl_delay"):
-            try:
-                cd = rp.crawl_delay(self.headers.get("User-Agent", "*"))
-                return float(cd) if cd else 0.0
-            except Exception:
-                return 0.0
-        return 0.0
+        # Validadores por URL para GET condicional en recrawls
+        self.validators: Optional[ValidatorStore] = None
+        if validators_path:
+            self.validators = ValidatorStore(validators_path, ttl_s=validators_ttl_s, max_entries=validators_max_entries)
+
+        # Separación mínima por host = min_delay_s + jitter [0, max-min]; crawl-delay la sube
+        self.limiter = self.policy.make_limiter()
+        # robots.txt: en disco con state_dir (compartido entre workers y ejecuciones), si no en memoria
+        self.robots = RobotsStore(
+            robots_path, user_agent=self.headers.get("User-Agent", "*"), ttl_s=robots_ttl_s,
+            timeout=self.timeout, headers=self.headers, verify_ssl=self.verify_ssl,
+        )
+        if self.policy.respect_crawl_delay:
+            self.robots.on_rules(self.limiter.set_crawl_delay)
+        # Ritmo aprendido por host (arranca de la política o de lo guardado en ejecuciones anteriores):
+        # parte de min_delay_s, acelera hasta policy.adaptive_floor_s si el host va sano (un min_delay_s
+        # explícito es suelo duro) y frena hasta adaptive_max_delay_s
+        self.adaptive: Optional[AdaptiveThrottle] = None
+        if self.policy.adaptive:
+            p = self.policy
+            self.adaptive = AdaptiveThrottle(
+                throttle_path, start_interval_s=p.min_delay_s, start_concurrency=p.per_host_concurrency,
+                min_interval_s=p.adaptive_floor_s,
+                max_interval_s=max(p.adaptive_max_delay_s, p.min_delay_s),
+                max_concurrency=p.adaptive_max_concurrency,
+                min_backoff_s=float(p.adaptive_min_backoff_s),
+            )
+        self.host_slots = HostSlots(self.host_concurrency)
+        # Respuestas crudas para replay (opcional)
+        self.archive: Optional[PageArchive] = PageArchive(archive_path) if archive_path else None
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Estadísticas de la cache HTTP (None sin cache)."""
+        return self.cache.stats() if self.cache else None
+
+    def _archive(self, url: str, r: requests.Response) -> None:
+        # Desde la cache solo si la URL aún no está archivada (cache anterior a activar el archivo)
+        if self.archive is None or r.status_code != 200 or getattr(r, "truncated", False):
+            return
+        if getattr(r, "from_cache", False) and url in self.archive:
+            return
+        try:
+            self.archive.append(url, r.url, r.status_code, dict(r.headers), r.content or b"")
+        except Exception as e:
+            LOG.warning(f"[core] No se pudo archivar {url}: {e}")
+
+    def host_concurrency(self, host: str) -> int:
+        """Peticiones simultáneas permitidas al host (aprendidas o las de la política)."""
+        return self.adaptive.concurrency(host) if self.adaptive else int(self.policy.per_host_concurrency)
+
+    def host_slot(self, url: str):
+        """with core.host_slot(url): ... -> espera a que el host tenga hueco (host_concurrency)."""
+        return self.host_slots.slot(urlparse(url).netloc)
+
+    def _observe(self, url: str, r: Optional[requests.Response]) -> None:
+        # Solo lo que vino de la red (un acierto fresco de cache no dice nada del servidor); r None = error de red
+        if self.adaptive is None:
+            return
+        host = urlparse(url).netloc
+        if r is None:
+            self.adaptive.observe(host, None, None)
+        elif not getattr(r, "from_cache", False):
+            self.adaptive.observe(host, r.status_code, r.elapsed.total_seconds())
+        elif getattr(r, "is_stale", False):
+            # Copia caducada servida por stale-if-error: cuenta el 5xx o el error de red que la provocó
+            status = getattr(r, "upstream_status", None)
+            self.adaptive.observe(host, status, r.elapsed.total_seconds() if status is not None else None)
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """GET en streaming: rechaza lo que no es HTML sin bajar el cuerpo y lo lee hasta max_bytes."""
+        try:
+            r = self.session.get(url, timeout=self.timeout, verify=self.verify_ssl, headers=headers, stream=True)
+        except Exception:
+            self._observe(url, None)
+            raise
+        self._observe(url, r)
+        if r.status_code == 200:
+            ctype = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if ctype and ctype not in self.html_types:
+                r.close()
+                raise ResponseRejected(f"Failed to fetch {url}: no es HTML ({ctype})")
+        if getattr(r, "from_cache", False):
+            return r  # cuerpo ya en memoria
+        body = bytearray()
+        r.truncated = False
+        try:
+            for chunk in r.iter_content(_CHUNK):
+                body += chunk
+                if self.max_bytes is not None and len(body) > self.max_bytes:
+                    del body[self.max_bytes:]
+                    r.truncated = True
+                    LOG.warning(f"[core] {url} supera {self.max_bytes} bytes; se descarta el resto")
+                    break
+        finally:
+            r.close()  # truncada: corta la conexión en vez de seguir leyendo
+        r._content = bytes(body)
+        r._content_consumed = True
+        # Con stream=True la cache HTTP no ve el cuerpo: se guarda ya leído (entero)
+        if isinstance(self.session, CachedSession) and not r.truncated:
+            self.session.save(url, r)
+        return r
+
+    def allowed(self, url: str) -> Optional[bool]:
+        """False si robots.txt prohíbe la URL; None si sus reglas aún no han llegado (se piden, sin esperar)."""
+        if not self.policy.respect_robots:
+            return True
+        return self.robots.can_fetch(url)
+
+    def _check_robots(self, url: str, defer: bool = False) -> None:
+        allowed = self.allowed(url)
+        if allowed is None:
+            if defer:
+                raise RobotsPending(f"Failed to fetch {url}: robots.txt del host aún sin llegar")
+            # Llamada suelta: espera las reglas; si no llegan tras el timeout de robots, se permite
+            self.robots.wait_origin(url, self.robots.timeout + 1)
+            allowed = self.allowed(url)
+        if not allowed:
+            raise RuntimeError(f"Failed to fetch {url}: prohibida por robots.txt")
+
+    def _throttle_delay(self, url: str) -> float:
+        """Reserva el siguiente hueco para el host y devuelve cuántos segundos hay que esperar."""
+        host = urlparse(url).netloc
+        if self.adaptive is not None:
+            self.limiter.set_interval(host, self.adaptive.interval(host))
+        # Pide robots.txt del host en segundo plano si no se tiene; su crawl-delay llega al limiter
+        # por el aviso on_rules (sin respect_robots, las primeras peticiones al host no lo esperan)
+        if self.policy.respect_crawl_delay or self.policy.respect_robots:
+            self.robots.can_fetch(url)
+        return self.limiter.reserve(host)
 
-    def _throttle(self, url: str) -> None:
-        parsed = urlparse(url)
-        host = parsed.netloc
-        # Respeta crawl-delay si lo hay
-        crawl_delay = self._respect_robots(url)
-        base_delay = max(self.min_delay_s, crawl_delay or 0.0)
-        # Evita ráfagas por host
-        now = time.time()
-        last = self._last_fetch_per_host.get(host, 0.0)
-        min_gap = base_delay + random.uniform(0, self.max_delay_s - self.min_delay_s)
-        to_wait = max(0.0, last + min_gap - now)
+    def time_until_slot(self, url: str) -> float:
+        """Segundos hasta el próximo hueco libre del host (no reserva): permite hacer otro trabajo mientras."""
+        return self.limiter.wait_time(urlparse(url).netloc)
+
+    def _throttle(self, url: str) -> float:
+        to_wait = self._throttle_delay(url)
         if to_wait > 0:
             time.sleep(to_wait)
-        self._last_fetch_per_host[host] = time.time()
+        return max(0.0, to_wait)
+
+    def _request_headers(self, url: str, attempt: int) -> Dict[str, str]:
+        # Cabeceras oportunas por sitio: añade Referer a la primera petición
+        headers = {}
+        if attempt == 1:
+            parsed = urlparse(url)
+            headers["Referer"] = f"{parsed.scheme}://{parsed.netloc}/"
+        return headers
+
+    def _retry_wait(self, r: requests.Response, attempt: int) -> Optional[float]:
+        """Espera (s) antes de reintentar según el status; None si la respuesta no es reintentable."""
+        # Si 429/503, respeta Retry-After
+        if r.status_code in (429, 503):
+            ra = r.headers.get("Retry-After")
+            if ra:
+                try:
+                    wait_s = int(ra)
+                except ValueError:
+                    wait_s = self.policy.backoff_s * (2 ** attempt)
+            else:
+                wait_s = self.policy.backoff_s * (2 ** attempt)
+            LOG.warning(f"[core] {r.status_code} recibido. Esperando {wait_s:.1f}s (attempt {attempt}).")
+            return wait_s + random.uniform(0, 1.0)
+
+        # 403: prueba un pequeño backoff y sigue
+        if r.status_code == 403:
+            wait_s = self.policy.backoff_s * (1.5 ** attempt) + random.uniform(0, 1.0)
+            LOG.warning(f"[core] 403 recibido. Backoff {wait_s:.1f}s (attempt {attempt}).")
+            return wait_s
+
+        return None
+
+    def _raise_for_status(self, url: str, r: requests.Response) -> None:
+        """4xx (ya descontados 403/429) -> ResponseRejected sin reintentar; 5xx -> HTTPError, que sí se reintenta."""
+        try:
+            r.raise_for_status()
+        except requests.HTTPError as e:
+            if 400 <= r.status_code < 500:
+                raise ResponseRejected(f"Failed to fetch {url}: HTTP {r.status_code}") from e
+            raise
+
+    def _error_wait(self, e: Exception, attempt: int) -> float:
+        wait_s = self.policy.backoff_s * (2 ** attempt) + random.uniform(0, 1.0)
+        LOG.warning(f"[core] Error {type(e).__name__}: {e}. Reintentando en {wait_s:.1f}s (attempt {attempt}).")
+        return wait_s
+
+    def _conditional_headers(self, url: str, record_kind: Optional[str]) -> Tuple[Dict[str, str], Optional[Dict[str, Any]]]:
+        """Cabeceras If-None-Match/If-Modified-Since si hay validadores y un record reutilizable."""
+        if not (self.validators and record_kind):
+            return {}, None
+        prev = self.validators.get(url)
+        if not prev or not self.validators.has_record(url, record_kind):
+            return {}, None
+        headers = {}
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            headers["If-Modified-Since"] = prev["last_modified"]
+        return headers, prev
+
+    def _page_result(self, url: str, r: requests.Response, prev: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if r.status_code == 304 and prev:
+            return {
+                "url": url, "html": None, "status": 304, "not_modified": True,
+                "etag": prev.get("etag"), "last_modified": prev.get("last_modified"),
+                "content_hash": prev.get("content_hash"),
+            }
+        content_hash = hashlib.sha1(r.content or b"").hexdigest()
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if self.validators:
+            self.validators.save_validators(url, etag, last_modified, content_hash)
+        return {
+            "url": r.url, "html": _decode_html(r), "status": r.status_code,
+            # Sin validadores en el servidor, el hash detecta igualmente "sin cambios"
+            "not_modified": bool(prev and prev.get("content_hash") == content_hash),
+            "etag": etag, "last_modified": last_modified, "content_hash": content_hash,
+        }
 
     def fetch(self, url: str) -> Tuple[str, str]:
-        self._throttle(url)
+        res = self.fetch_page(url)
+        return res["url"], res["html"]
+
+    def close(self) -> None:
+        """Guarda el ritmo aprendido y libera sesión, robots, cache, validadores, archivo y estado en disco."""
+        if self.adaptive is not None:
+            self.adaptive.close()
+        if self.archive is not None:
+            self.archive.close()
+        self.robots.close()
+        self.session.close()
+        if self.validators is not None:
+            self.validators.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def fetch_page(self, url: str, record_kind: Optional[str] = None, defer_robots: bool = False) -> Dict[str, Any]:
+        self._check_robots(url, defer_robots)
+        stats = {"bytes": 0, "from_cache": False, "retries": 0, "sleep_s": self._throttle(url), "status": None}
+        cond_headers, prev = self._conditional_headers(url, record_kind)
+
+        def done(r: requests.Response) -> Dict[str, Any]:
+            self._archive(url, r)
+            res = self._page_result(url, r, prev)
+            stats.update(bytes=len(r.content or b""), from_cache=bool(getattr(r, "from_cache", False)),
+                         retries=attempt - 1, status=r.status_code, truncated=bool(getattr(r, "truncated", False)))
+            stats["sleep_s"] = round(stats["sleep_s"], 3)
+            res["stats"] = stats
+            return res
 
         attempt = 0
         last_err = None
         while attempt <= self.max_retries:
             attempt += 1
             try:
-                # Cabeceras oportunas por sitio: añade Referer a la primera petición
-                headers = {}
-                if attempt == 1:
-                    parsed = urlparse(url)
-                    headers["Referer"] = f"{parsed.scheme}://{parsed.netloc}/"
-
-                r = self.session.get(url, timeout=self.timeout, verify=self.verify_ssl, headers=headers)
+                headers = self._request_headers(url, attempt)
+                headers.update(cond_headers)
+                r = self._get(url, headers)
                 # Respuestas cacheadas no cuentan contra rate (pero mantenemos throttle entre dominios)
-                if r.status_code in (200, 304):
-                    return r.url, _decode_html(r)
-
-                # Si 429/503, respeta Retry-After
-                if r.status_code in (429, 503):
-                    ra = r.headers.get("Retry-After")
-                    if ra:
-                        try:
-                            wait_s = int(ra)
-                        except ValueError:
-                            wait_s = self.min_delay_s * (2 ** attempt)
-                    else:
-                        wait_s = self.min_delay_s * (2 ** attempt)
-                    LOG.warning(f"[core] {r.status_code} recibido. Esperando {wait_s:.1f}s (attempt {attempt}).")
-                    time.sleep(wait_s + random.uniform(0, 1.0))
+                if r.status_code == 200 or (r.status_code == 304 and prev):
+                    return done(r)
+                if r.status_code == 304:
+                    # 304 sin record previo: pide el cuerpo completo
+                    cond_headers = {}
                     continue
 
-                # 403: prueba un pequeño backoff y sigue
-                if r.status_code == 403:
-                    wait_s = self.min_delay_s * (1.5 ** attempt) + random.uniform(0, 1.0)
-                    LOG.warning(f"[core] 403 recibido. Backoff {wait_s:.1f}s (attempt {attempt}).")
+                wait_s = self._retry_wait(r, attempt)
+                if wait_s is not None:
+                    stats["sleep_s"] += wait_s
                     time.sleep(wait_s)
                     continue
 
-                # Otros códigos: lanza
-                r.raise_for_status()
+                # Otros códigos: 4xx falla ya (404 de enlaces muertos...), 5xx se reintenta
+                self._raise_for_status(url, r)
 
-                return r.url, _decode_html(r)
+                return done(r)
 
+            except ResponseRejected:
+                raise
             except Exception as e:
                 last_err = e
-                wait_s = self.min_delay_s * (2 ** attempt) + random.uniform(0, 1.0)
-                LOG.warning(f"[core] Error {type(e).__name__}: {e}. Reintentando en {wait_s:.1f}s (attempt {attempt}).")
+                wait_s = self._error_wait(e, attempt)
+                stats["sleep_s"] += wait_s
                 time.sleep(wait_s)
 
         raise RuntimeError(f"Failed to fetch {url}: {last_err}")
+
+
+class ReplayCore(Core):
+    """
+    Core sin red: sirve las páginas de un PageArchive (grabado con Core(archive_path=...)).
+    Mismo contrato que Core.fetch / fetch_page, sin cortesía, reintentos, robots ni validadores:
+    re-extraer un sitio entero va a velocidad de CPU. Una URL que no esté archivada lanza RuntimeError.
+    """
+
+    def __init__(self, archive_path: str, policy: Optional[SchedulingPolicy] = None, **kwargs: Any) -> None:
+        super().__init__(cache_name="", validators_path="", robots_path="", throttle_path="",
+                         policy=policy or SchedulingPolicy(), **kwargs)
+        self.archive = PageArchive(archive_path)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.archive
+
+    def time_until_slot(self, url: str) -> float:
+        return 0.0
+
+    def fetch_page(self, url: str, record_kind: Optional[str] = None, defer_robots: bool = False) -> Dict[str, Any]:
+        rec = self.archive.get(url)
+        if rec is None:
+            raise RuntimeError(f"Failed to fetch {url}: no está en el archivo {self.archive.path}")
+        # Respuesta reconstruida: misma decodificación (charset, ftfy) que una descarga real
+        r = requests.Response()
+        r.status_code = rec["status"]
+        r.headers = requests.structures.CaseInsensitiveDict(rec["headers"])
+        r._content = rec["body"]
+        r.url = rec["url"]
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        res = self._page_result(url, r, None)
+        res["stats"] = {"bytes": len(rec["body"]), "from_cache": True, "retries": 0, "sleep_s": 0.0, "status": r.status_code}
+        return res
+
+
+class AsyncCore(Core):
+    """
+    await fetch(url) -> (final_url, html)
+    Mismo contrato que Core.fetch (reintentos 429/503 con Retry-After, backoff 403,
+    crawl-delay de robots, cache HTTP) sin bloquear el event loop:
+    - Pool de conexiones compartido (HTTPAdapter) dimensionado a max_concurrency
+    - Límite global de peticiones en vuelo (max_concurrency) y por host (per_host_concurrency, o la
+      aprendida si policy.adaptive)
+    - Las esperas de cortesía/backoff son asyncio.sleep; la E/S HTTP corre en un ThreadPoolExecutor
+    """
+
+    def __init__(self, *args: Any, max_concurrency: Optional[int] = None, per_host_concurrency: Optional[int] = None,
+                 **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Sin valor explícito, los de la política del despliegue
+        self.max_concurrency = max(1, int(max_concurrency or self.policy.max_concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency or self.policy.per_host_concurrency))
+
+        adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="crewai-fetch")
+
+        # Los semáforos asyncio quedan ligados a un loop: se recrean si cambia
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._host_slots: Optional[AsyncHostSlots] = None
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global_sem = asyncio.Semaphore(self.max_concurrency)
+            self._host_slots = AsyncHostSlots(self.host_concurrency)
+        return loop
+
+    def host_concurrency(self, host: str) -> int:
+        return self.adaptive.concurrency(host) if self.adaptive else self.per_host_concurrency
+
+    async def _arobots(self, url: str) -> bool:
+        """allowed() sin bloquear el loop; si las reglas no llegan tras el timeout de robots, se permite."""
+        deadline = time.monotonic() + self.robots.timeout + 1
+        allowed = self.allowed(url)
+        while allowed is None and time.monotonic() < deadline:
+            await asyncio.sleep(ROBOTS_POLL_S)
+            allowed = self.allowed(url)
+        return allowed is not False
+
+    async def _athrottle(self, loop: asyncio.AbstractEventLoop, url: str) -> None:
+        # robots.txt se pide en segundo plano: reservar hueco no bloquea el loop
+        to_wait = self._throttle_delay(url)
+        if to_wait > 0:
+            await asyncio.sleep(to_wait)
+
+    async def fetch(self, url: str) -> Tuple[str, str]:  # type: ignore[override]
+        loop = self._bind_loop()
+        host = urlparse(url).netloc
+
+        # Host nuevo: su robots.txt se espera con asyncio.sleep (el resto de URLs siguen)
+        if not await self._arobots(url):
+            raise RuntimeError(f"Failed to fetch {url}: prohibida por robots.txt")
+
+        async with self._host_slots.slot(host):
+            await self._athrottle(loop, url)
+
+            attempt = 0
+            last_err = None
+            while attempt <= self.max_retries:
+                attempt += 1
+                try:
+                    headers = self._request_headers(url, attempt)
+                    get = partial(self._get, url, headers)
+                    # Solo la petición ocupa hueco global; las esperas no
+                    async with self._global_sem:
+                        r = await loop.run_in_executor(self._executor, get)
+
+                    if r.status_code in (200, 304):
+                        await loop.run_in_executor(self._executor, self._archive, url, r)
+                        html = await loop.run_in_executor(self._executor, _decode_html, r)
+                        return r.url, html
+
+                    wait_s = self._retry_wait(r, attempt)
+                    if wait_s is not None:
+                        await asyncio.sleep(wait_s)
+                        continue
+
+                    self._raise_for_status(url, r)
+
+                    html = await loop.run_in_executor(self._executor, _decode_html, r)
+                    return r.url, html
+
+                except ResponseRejected:
+                    raise
+                except Exception as e:
+                    last_err = e
+                    await asyncio.sleep(self._error_wait(e, attempt))
+
+        raise RuntimeError(f"Failed to fetch {url}: {last_err}")
+
+    async def fetch_many(self, urls: Iterable[str]) -> List[Tuple[str, Union[Tuple[str, str], Exception]]]:
+        """Descarga en paralelo (respetando los límites) y devuelve [(url, (final_url, html) | excepción)]."""
+        urls = list(urls)
+        results = await asyncio.gather(*(self.fetch(u) for u in urls), return_exceptions=True)
+        return list(zip(urls, results))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        super().close()
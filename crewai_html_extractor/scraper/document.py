@@ -0,0 +1,103 @@
+# crewai_html_extractor/scraper/document.py
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+import lxml.html
+
+from .metrics import StageTimer
+
+
+class ParsedPage:
+    """
+    Documento HTML parseado UNA vez por fetch y compartido por todos los extractores
+    y por el descubrimiento de enlaces.
+
+    - soup: árbol BeautifulSoup (parser lxml), perezoso: solo se construye si algún extractor lo usa
+    - Vistas perezosas (se calculan la primera vez y se reutilizan):
+      text, title, main, tables, scripts, jsonld_scripts
+    - lxml_root / lxml_tables: árbol lxml nativo (perezoso) para recorridos rápidos (tablas, enlaces)
+    - base_url: URL base para resolver enlaces (<base href> si lo hay)
+    - memo(key, factory): caché genérica por página para cálculos derivados
+    - timer: StageTimer opcional; cada árbol se cronometra en la etapa "parse" al construirse (dentro
+      de la etapa que lo pidió primero, que también lo incluye)
+    """
+
+    def __init__(self, html: str, url: str, soup: Optional[BeautifulSoup] = None, timer: Optional[StageTimer] = None) -> None:
+        self.html = html or ""
+        self.url = url
+        self.timer = timer
+        if soup is not None:
+            self.soup = soup
+        self._memo: Dict[str, Any] = {}
+
+    def _parse(self, build: Callable[[], Any]) -> Any:
+        if self.timer is None:
+            return build()
+        with self.timer.stage("parse"):
+            return build()
+
+    def memo(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Calcula factory() una sola vez por página y lo cachea bajo 'key'."""
+        if key not in self._memo:
+            self._memo[key] = factory()
+        return self._memo[key]
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return self._parse(lambda: BeautifulSoup(self.html, "lxml"))
+
+    @cached_property
+    def text(self) -> str:
+        return self.soup.get_text(" ", strip=True)
+
+    @cached_property
+    def title(self) -> str:
+        return self.soup.title.get_text(strip=True) if self.soup.title else ""
+
+    @cached_property
+    def main(self):
+        return self.soup.find("main") or self.soup
+
+    @cached_property
+    def tables(self) -> List[Any]:
+        return self.soup.select("table")
+
+    @cached_property
+    def lxml_root(self):
+        # Parse en C (barato) solo si algún extractor o los enlaces lo piden
+        return self._parse(self._lxml_document)
+
+    def _lxml_document(self):
+        try:
+            return lxml.html.document_fromstring(self.html)
+        except Exception:  # documento vacío o sin nodos
+            return lxml.html.document_fromstring("<html></html>")
+
+    @cached_property
+    def base_url(self) -> str:
+        base = self.lxml_root.find(".//base[@href]")
+        href = (base.get("href") or "").strip() if base is not None else ""
+        return urljoin(self.url, href) if href else self.url
+
+    @cached_property
+    def lxml_tables(self) -> List[Any]:
+        return self.lxml_root.xpath("//table")
+
+    @cached_property
+    def scripts(self) -> List[Any]:
+        return self.soup.find_all("script")
+
+    @cached_property
+    def jsonld_scripts(self) -> List[Any]:
+        return [s for s in self.scripts if s.get("type") == "application/ld+json"]
+
+
+def as_page(html_or_page: Union[str, ParsedPage], url: str) -> ParsedPage:
+    """Acepta HTML crudo o un ParsedPage ya construido (no vuelve a parsear)."""
+    if isinstance(html_or_page, ParsedPage):
+        return html_or_page
+    return ParsedPage(html_or_page, url)
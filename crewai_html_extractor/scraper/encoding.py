@@ -0,0 +1,132 @@
+# crewai_html_extractor/scraper/encoding.py
+from __future__ import annotations
+
+import codecs
+import re
+from typing import Any, Optional
+
+# Detección completa y reparación de mojibake: opcionales y solo cuando hacen falta
+try:
+    from charset_normalizer import from_bytes
+except Exception:
+    from_bytes = None
+
+try:
+    from ftfy import fix_text
+except Exception:
+    fix_text = None
+
+# Bytes del principio del documento donde se busca <meta charset> (el "prescan" de HTML5)
+SNIFF_BYTES = 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# <meta charset="x"> y <meta http-equiv="Content-Type" content="text/html; charset=x">
+_META_CHARSET_RX = re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+_HEADER_CHARSET_RX = re.compile(r"""charset\s*=\s*["']?([^\s;"']+)""", re.I)
+# Como los navegadores: latin-1/ascii declarados son en la práctica windows-1252
+_ALIASES = {"iso8859_1": "cp1252", "ascii": "cp1252"}
+# Huellas típicas de UTF-8 leído como latin-1 (o de bytes ya perdidos)
+_MOJIBAKE_RX = re.compile("[Ã√Â�]")
+
+
+def _codec(name: Optional[str]) -> Optional[str]:
+    """Nombre de codec normalizado, o None si Python no lo conoce."""
+    if not name:
+        return None
+    try:
+        name = codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+    return _ALIASES.get(name.replace("-", "_"), name)
+
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    m = _HEADER_CHARSET_RX.search(content_type or "")
+    return _codec(m.group(1)) if m else None
+
+
+def _bom_codec(head: bytes) -> Optional[str]:
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            return name
+    return None
+
+
+def sniff_charset(head: bytes) -> Optional[str]:
+    """Codificación por BOM o <meta charset> en los primeros SNIFF_BYTES; None si no se declara."""
+    bom = _bom_codec(head)
+    if bom:
+        return bom
+    m = _META_CHARSET_RX.search(head[:SNIFF_BYTES])
+    return _codec(m.group(1).decode("ascii", errors="ignore")) if m else None
+
+
+def decode_html(raw: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Bytes -> texto sin leer el documento más de lo necesario:
+    BOM > charset de la cabecera > <meta charset> (primer KB) > UTF-8 estricto
+    > charset_normalizer sobre todo el cuerpo (si está) > UTF-8 con reemplazos.
+    """
+    raw = raw or b""
+    bom = _bom_codec(raw)
+    if bom:
+        return raw.decode(bom, errors="replace")
+    enc = header_charset(content_type) or sniff_charset(raw[:SNIFF_BYTES])
+    if enc:
+        return raw.decode(enc, errors="replace")
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    if from_bytes is not None:
+        try:
+            best = from_bytes(raw).best()
+            if best and best.encoding:
+                return raw.decode(best.encoding, errors="replace")
+        except Exception:
+            pass
+    return raw.decode("utf-8", errors="replace")
+
+
+def needs_repair(s: str) -> bool:
+    return bool(_MOJIBAKE_RX.search(s))
+
+
+def repair_text(s: str) -> str:
+    """ftfy solo si el texto tiene pinta de mojibake (y ftfy está instalado)."""
+    if fix_text is None or not _MOJIBAKE_RX.search(s):
+        return s
+    return fix_text(s)
+
+
+def repair_items(data: Any) -> Any:
+    """
+    Repara in situ los strings con mojibake de items extraídos (dicts/listas anidados, p. ej. celdas
+    de tablas) en vez de pasar ftfy por todo el HTML. -> el mismo objeto.
+    """
+    if fix_text is None:
+        return data
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if isinstance(v, str):
+                    if _MOJIBAKE_RX.search(v):
+                        node[k] = fix_text(v)
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(node, list):
+            for i, v in enumerate(node):
+                if isinstance(v, str):
+                    if _MOJIBAKE_RX.search(v):
+                        node[i] = fix_text(v)
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+    return data
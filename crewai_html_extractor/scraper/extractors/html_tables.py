@@ -1,17 +1,26 @@
-import pandas as pd
-from bs4 import BeautifulSoup
+from ..document import ParsedPage, as_page
+from ..numeric import coerce_table
+from ..tables import parse_table, table_rows
 
 def extract_html_tables(html: str, base_url: str):
-    soup = BeautifulSoup(html, "lxml")
+    return extract_html_tables_from_page(as_page(html, base_url))
+
+def extract_html_tables_from_page(page: ParsedPage):
+    base_url = page.url
     items = []
-    for i, tbl in enumerate(soup.select("table")):
+    for i, tbl in enumerate(page.lxml_tables):
         try:
-            df = pd.read_html(str(tbl), flavor="lxml")[0]
+            table = parse_table(tbl)
+            # <table> vacío: nada que extraer (las tablas solo con cabecera sí se devuelven)
+            if not table["schema"]:
+                continue
+            # columnas numéricas a int/float como hacía read_html (formato es/en detectado por columna)
+            coerce_table(table)
             items.append({
                 "type":"table",
-                "label": tbl.get("id") or f"table_{i}",
-                "schema": [str(c) for c in df.columns],
-                "data": df.where(pd.notnull(df), None).values.tolist(),
+                "label": table["id"] or f"table_{i}",
+                "schema": table["schema"],
+                "data": table_rows(table),
                 "unit": None,
                 "source":{"method":"html","selector":"table","url":base_url},
                 "confidence": 0.98
@@ -1,13 +1,13 @@
 from __future__ import annotations
-import json, re
-from typing import Any, Dict, List, Optional, Tuple
-from bs4 import BeautifulSoup
-import re
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from ..document import ParsedPage, as_page
+from ..structured import HAS_EXTRUCT, page_jsonld_nodes, page_microdata
+from ..urls import normalize_url
+
 # --- Clasificador de entidades turismo: segment & subtype ---
 
 SCHEMA_TO_SEG_SUB = {
@@ -59,11 +59,52 @@ KW = {
 
 
 
+_WS_RX = re.compile(r"\s+")
+
+# Orden de precedencia: (segment, subtype) en el orden de KW; gana el primero que aparezca en algún campo
+_KW_ORDER: List[Tuple[str, str]] = [(seg, sub) for seg, submap in KW.items() for sub in submap]
+_KW_RX = [re.compile(KW[seg][sub], re.I) for seg, sub in _KW_ORDER]
+_KW_GROUP = {f"k{i}": i for i in range(len(_KW_ORDER))}
+
+_URL_HINTS = (
+    (re.compile(r"/(hotel|aloj|apart|hostal|camping)/"), "accommodation", 55),
+    (re.compile(r"/(experien|actividad|agenda|evento|ruta|tour)/"), "experience", 50),
+    (re.compile(r"/(restaur|bar|agencia|servici|empresa|info)/"), "business", 50),
+)
+
+
+@lru_cache(maxsize=None)
+def _kw_matcher(limit: int) -> re.Pattern:
+    """
+    Un único autómata con las `limit` primeras palabras clave como alternativas con nombre dentro de
+    un lookahead (no consume texto): en cada posición gana la alternativa de menor índice.
+    """
+    alts = "|".join(f"(?P<k{i}>{KW[seg][sub]})" for i, (seg, sub) in enumerate(_KW_ORDER[:limit]))
+    return re.compile(f"(?=(?:{alts}))", re.I)
+
+
+def _min_kw_index(text: str, limit: int) -> int:
+    """
+    Índice de la palabra clave de mayor precedencia (< limit) presente en `text`, o `limit` si no hay.
+    Una sola pasada: tras cada acierto se sigue desde esa posición solo con las de mayor precedencia.
+    """
+    pos = 0
+    while limit and text:
+        m = _kw_matcher(limit).search(text, pos)
+        if not m:
+            break
+        limit = _KW_GROUP[m.lastgroup]
+        pos = m.start() + 1
+    return limit
+
+
 def _tok(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip().lower()
+    return _WS_RX.sub(" ", (s or "")).strip().lower()
 
-def _match_any(rx: str, texto: str) -> bool:
-    return bool(re.search(rx, texto, re.I)) if rx else False
+
+def _page_kw_index(page: ParsedPage) -> int:
+    """_min_kw_index del texto completo de la página, una vez por página (lo comparten todas sus entidades)."""
+    return page.memo("tourism.text_kw_index", lambda: _min_kw_index(_tok(page.text), len(_KW_ORDER)))
 
 def _classify_by_schema(schema_type) -> tuple[str|None, str|None, str]:
     types = schema_type if isinstance(schema_type, list) else [schema_type]
@@ -76,11 +117,13 @@ def _classify_by_schema(schema_type) -> tuple[str|None, str|None, str]:
             return seg, sub, "schema"
     return None, None, "none"
 
-def classify_entity(raw_type, url: str, name: str, description: str, full_text: str) -> tuple[str|None, str|None, str, int]:
+def classify_entity(raw_type, url: str, name: str, description: str, full_text: str,
+                    full_text_index: Optional[int] = None) -> tuple[str|None, str|None, str, int]:
     """
     Devuelve (segment, subtype, source, score)
     source: 'schema' | 'keywords' | 'url' | 'fallback'
     score:  1..100
+    full_text_index: _min_kw_index de full_text ya calculado (p. ej. memoizado por página); evita recorrerlo
     """
     seg, sub, src = _classify_by_schema(raw_type)
     if seg:
@@ -90,24 +133,27 @@ def classify_entity(raw_type, url: str, name: str, description: str, full_text:
     u = _tok(url)
     n = _tok(name)
     d = _tok(description)
-    t = _tok(full_text)
-    hay = lambda rx: (_match_any(rx, n) or _match_any(rx, d) or _match_any(rx, u) or _match_any(rx, t))
 
-    # Keywords por grupo y subtipo
-    for seg_key, submap in KW.items():
-        for sub_key, rx in submap.items():
-            if hay(rx):
-                # preferencia por URL/texto nombre (menos ruido)
-                score = 65 if _match_any(rx, u) or _match_any(rx, n) else 60
-                return seg_key, sub_key, "keywords", score
+    # Keywords por grupo y subtipo: cada campo se recorre una vez con el autómata compilado;
+    # el texto completo (el más largo) solo busca palabras de mayor precedencia que las ya vistas
+    best = len(_KW_ORDER)
+    for field in (n, d, u):
+        best = _min_kw_index(field, best)
+        if best == 0:
+            break
+    if best:
+        best = min(best, full_text_index) if full_text_index is not None else _min_kw_index(_tok(full_text), best)
+    if best < len(_KW_ORDER):
+        seg_key, sub_key = _KW_ORDER[best]
+        # preferencia por URL/texto nombre (menos ruido)
+        rx = _KW_RX[best]
+        score = 65 if rx.search(u) or rx.search(n) else 60
+        return seg_key, sub_key, "keywords", score
 
     # Pistas de URL (segment genérico)
-    if re.search(r"/(hotel|aloj|apart|hostal|camping)/", u): 
-        return "accommodation", None, "url", 55
-    if re.search(r"/(experien|actividad|agenda|evento|ruta|tour)/", u): 
-        return "experience", None, "url", 50
-    if re.search(r"/(restaur|bar|agencia|servici|empresa|info)/", u): 
-        return "business", None, "url", 50
+    for rx, seg_key, score in _URL_HINTS:
+        if rx.search(u):
+            return seg_key, None, "url", score
 
     return None, None, "fallback", 40
 
@@ -145,16 +191,6 @@ INTERESTING_TYPES = {
     "TouristDestination": "destination",
 }
 
-def _json_loads_loose(s: str) -> Optional[Any]:
-    try:
-        return json.loads(s)
-    except Exception:
-        try:
-            import json5  # opcional
-            return json5.loads(s)
-        except Exception:
-            return None
-
 def _first(obj, *keys, default=None):
     for k in keys:
         if isinstance(obj, dict) and k in obj and obj[k]:
@@ -206,238 +242,226 @@ def _rating(node: dict) -> Tuple[Optional[float], Optional[int]]:
         return val, cnt
     return None, None
 
-def _collect_contacts(soup: BeautifulSoup, text: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    # tel prioritario desde <a href="tel:">
-    tel = None
-    a_tel = soup.select('a[href^="tel:"]')
-    if a_tel:
-        tel = a_tel[0].get("href", "").split(":", 1)[-1].strip()
+def _contact_anchor_index(page: ParsedPage) -> Dict[int, Dict[str, str]]:
+    """
+    Índice de documento (una pasada): id(nodo) -> {"tel", "email"} con el PRIMER <a href="tel:/mailto:">
+    que cuelga de ese nodo. Cada enlace se propaga a sus ancestros hasta uno que ya tenga ese campo
+    (ese y los de arriba ya lo tienen por un enlace anterior), así el coste total es lineal.
+    """
+    def build() -> Dict[int, Dict[str, str]]:
+        index: Dict[int, Dict[str, str]] = {}
+        for a in page.soup.select('a[href^="tel:"], a[href^="mailto:"]'):
+            scheme, _, value = a.get("href", "").partition(":")
+            key = "tel" if scheme.lower() == "tel" else "email"
+            value = value.strip()
+            if not value:
+                continue
+            node = a
+            while node is not None:
+                slot = index.setdefault(id(node), {})
+                if key in slot:
+                    break
+                slot[key] = value
+                node = node.parent
+        return index
+    return page.memo("tourism.contact_anchors", build)
+
+def _card_contacts(page: ParsedPage, card, text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Teléfono y email de UNA tarjeta: enlaces tel:/mailto: dentro de ella y, si no, regex sobre su texto."""
+    found = _contact_anchor_index(page).get(id(card), {})
+    tel = found.get("tel")
     if not tel:
         m = RE_TEL.search(text)
         tel = m.group(0).strip() if m else None
-
-    email = None
-    a_mail = soup.select('a[href^="mailto:"]')
-    if a_mail:
-        email = a_mail[0].get("href", "").split(":", 1)[-1].strip()
+    email = found.get("email")
     if not email:
         m = RE_EMAIL.search(text)
         email = m.group(0).strip() if m else None
+    return tel, email
 
-    # og:phone (raro pero existe)
-    og_phone = soup.find("meta", property="og:phone_number")
-    if og_phone and not tel:
-        tel = og_phone.get("content", "").strip() or tel
-
-    return tel, email, None  # website se expondrá como url principal
-
-def _detect_ids(text: str) -> Tuple[Optional[str], Optional[str]]:
-    lic = None
-    m = RE_LICENCIAS.search(text)
-    if m:
-        lic = m.group(0)
-    cif = None
-    for rx in (RE_CIF, RE_NIE, RE_DNI):
-        mm = rx.search(text)
-        if mm:
-            cif = mm.group(0)
-            break
-    return lic, cif
+def _scan(rx: re.Pattern, text: str) -> List[Tuple[int, str]]:
+    return [(m.start(), m.group(0).strip()) for m in rx.finditer(text)]
 
-def _normalize_entity(node: dict, base_url: str, soup: BeautifulSoup, full_text: str) -> Dict[str, Any]:
-    typ = _first(node, "@type", "type")
-    if isinstance(typ, list):
-        typ = next((t for t in typ if t in INTERESTING_TYPES), typ[0] if typ else None)
-    
-    def _normalize_entity(node: dict, base_url: str, soup: BeautifulSoup, full_text: str) -> Dict[str, Any]:
-        typ = _first(node, "@type", "type")
-        if isinstance(typ, list):
-            typ = next((t for t in typ if t in INTERESTING_TYPES), typ[0] if typ else None)
-
-        name = _first(node, "name")
-        legal_name = _first(node, "legalName")
-        url = _first(node, "url") or base_url
-        same_as = _as_list(_first(node, "sameAs"))
-        desc = _first(node, "description")
-
-    
-
-
-        lic, cif = _detect_ids(full_text)
-
-        # 👇 NUEVO: clasificación segment/subtype
-        segment, subtype, seg_source, seg_score = classify_entity(typ, url, name or "", desc or "", full_text)
-
-        # si no hubo segment por schema, usar mapa INTERESTING_TYPES como fallback para "entity_type" legacy
-        legacy_entity_type = INTERESTING_TYPES.get(str(typ), "other")
-
-        base_conf = 0.95 if name else 0.8
-        # refuerza confianza si hay schema + tel/email o address
-        if segment and seg_source == "schema":
-            base_conf += 0.02
-        if (tel or email) and (street or locality):
-            base_conf += 0.01
-        base_conf = min(base_conf, 0.99)
+def _page_facts(page: ParsedPage) -> Dict[str, Any]:
+    """
+    Hechos de página calculados UNA vez y compartidos por todas las entidades (JSON-LD, @graph,
+    microdatos, OG): cada regex recorre el texto completo una sola vez.
 
+    - licences / phones / emails: [(offset, valor)] en page.text
+    - tax_ids: [(offset, valor, "cif"|"nie"|"dni")]
+    - tel / email: contacto de página (primer tel:/mailto:, si no regex; tel cae a og:phone_number)
+    - licence / cif_nif: lo que se asigna a las entidades (primera licencia; CIF > NIE > DNI)
+    """
+    def build() -> Dict[str, Any]:
+        text = page.text
+        licences = _scan(RE_LICENCIAS, text)
+        tax_ids = [(off, v, kind) for kind, rx in (("cif", RE_CIF), ("nie", RE_NIE), ("dni", RE_DNI)) for off, v in _scan(rx, text)]
+        phones = _scan(RE_TEL, text)
+        emails = _scan(RE_EMAIL, text)
+
+        # El nodo raíz del índice de enlaces tiene el primer tel:/mailto: del documento
+        anchors = _contact_anchor_index(page).get(id(page.soup), {})
+        tel = anchors.get("tel") or (phones[0][1] if phones else None)
+        email = anchors.get("email") or (emails[0][1] if emails else None)
+        if not tel:
+            # og:phone (raro pero existe)
+            og_phone = page.soup.find("meta", property="og:phone_number")
+            tel = (og_phone.get("content", "").strip() or None) if og_phone else None
+
+        cif = next((v for kind in ("cif", "nie", "dni") for _, v, k in tax_ids if k == kind), None)
         return {
-            "type": "entity",
-            "segment": segment,             # accommodation | experience | business
-            "subtype": subtype,             # hotel | tour_guiado | restaurante | ...
-            "segment_source": seg_source,   # schema | keywords | url | fallback
-            "segment_score": seg_score,     # 40..80
-            "entity_type": legacy_entity_type,  # retrocompatibilidad
-            "name": name,
-            "legal_name": legal_name,
-            "description": desc,
-            "tourism_license": lic,
-            "cif_nif": cif,
-            "url": url,
-            "same_as": same_as,
-            "telephone": tel,
+            "licences": licences,
+            "tax_ids": tax_ids,
+            "phones": phones,
+            "emails": emails,
+            "tel": tel,
             "email": email,
-            "price_range": price_range,
-            "rating": rating,
-            "rating_count": rating_count,
-            "address_street": street,
-            "address_locality": locality,
-            "address_region": region,
-            "address_postal_code": pc,
-            "address_country": country,
-            "lat": lat,
-            "lon": lon,
-            "checkin": checkin,
-            "checkout": checkout,
-            "event_start": event_start,
-            "event_end": event_end,
-            "source": {"method": "jsonld/heuristics", "url": base_url, "schema_type": typ},
-            "confidence": base_conf,
+            "licence": licences[0][1] if licences else None,
+            "cif_nif": cif,
         }
+    return page.memo("tourism.page_facts", build)
 
+def _normalize_entity(node: dict, page: ParsedPage) -> Dict[str, Any]:
+    base_url = page.url
+    facts = _page_facts(page)
+    typ = _first(node, "@type", "type")
+    if isinstance(typ, list):
+        typ = next((t for t in typ if t in INTERESTING_TYPES), typ[0] if typ else None)
 
-        name = _first(node, "name")
-        legal_name = _first(node, "legalName")
-        url = _first(node, "url")
-        same_as = _as_list(_first(node, "sameAs"))
-        desc = _first(node, "description")
-
-        addr = _first(node, "address")
-        street, locality, region, pc, country = _postal_address(addr if isinstance(addr, dict) else (addr[0] if _as_list(addr) else {}))
-
-        geo = _first(node, "geo")
-        lat, lon = _geo(geo if isinstance(geo, dict) else (geo[0] if _as_list(geo) else {}))
-
-        tel = _first(node, "telephone", "phone")
-        email = _first(node, "email")
-        if not tel or not email:
-            tel2, email2, _ = _collect_contacts(soup, full_text)
-            tel = tel or tel2
-            email = email or email2
-
-        price_range = _first(node, "priceRange")
-        rating, rating_count = _rating(node)
+    name = _first(node, "name")
+    legal_name = _first(node, "legalName")
+    url = _first(node, "url") or base_url
+    same_as = _as_list(_first(node, "sameAs"))
+    desc = _first(node, "description")
+
+    addr = _first(node, "address")
+    street, locality, region, pc, country = _postal_address(addr if isinstance(addr, dict) else (addr[0] if _as_list(addr) else {}))
+
+    geo = _first(node, "geo")
+    lat, lon = _geo(geo if isinstance(geo, dict) else (geo[0] if _as_list(geo) else {}))
+
+    tel = _first(node, "telephone", "phone")
+    email = _first(node, "email")
+    tel = tel or facts["tel"]
+    email = email or facts["email"]
+
+    price_range = _first(node, "priceRange")
+    rating, rating_count = _rating(node)
+
+    checkin = _first(node, "checkinTime", "checkin")
+    checkout = _first(node, "checkoutTime", "checkout")
+
+    # si no hubo segment por schema, usar mapa INTERESTING_TYPES como fallback para "entity_type" legacy
+    legacy_entity_type = INTERESTING_TYPES.get(str(typ), "other")
+
+    event_start = _first(node, "startDate") if legacy_entity_type == "event" else None
+    event_end = _first(node, "endDate") if legacy_entity_type == "event" else None
+
+    lic, cif = facts["licence"], facts["cif_nif"]
+
+    # 👇 NUEVO: clasificación segment/subtype
+    segment, subtype, seg_source, seg_score = classify_entity(typ, url, name or "", desc or "", page.text,
+                                                              full_text_index=_page_kw_index(page))
+
+    base_conf = 0.95 if name else 0.8
+    # refuerza confianza si hay schema + tel/email o address
+    if segment and seg_source == "schema":
+        base_conf += 0.02
+    if (tel or email) and (street or locality):
+        base_conf += 0.01
+    base_conf = min(base_conf, 0.99)
+
+    return {
+        "type": "entity",
+        "segment": segment,             # accommodation | experience | business
+        "subtype": subtype,             # hotel | tour_guiado | restaurante | ...
+        "segment_source": seg_source,   # schema | keywords | url | fallback
+        "segment_score": seg_score,     # 40..80
+        "entity_type": legacy_entity_type,  # retrocompatibilidad
+        "name": name,
+        "legal_name": legal_name,
+        "description": desc,
+        "tourism_license": lic,
+        "cif_nif": cif,
+        "url": url,
+        "same_as": same_as,
+        "telephone": tel,
+        "email": email,
+        "price_range": price_range,
+        "rating": rating,
+        "rating_count": rating_count,
+        "address_street": street,
+        "address_locality": locality,
+        "address_region": region,
+        "address_postal_code": pc,
+        "address_country": country,
+        "lat": lat,
+        "lon": lon,
+        "checkin": checkin,
+        "checkout": checkout,
+        "event_start": event_start,
+        "event_end": event_end,
+        "source": {"method": "jsonld/heuristics", "url": base_url, "schema_type": typ},
+        "confidence": base_conf,
+    }
 
-        checkin = _first(node, "checkinTime", "checkin")
-        checkout = _first(node, "checkoutTime", "checkout")
+def extract_tourism_entities(html: str, base_url: str) -> List[Dict[str, Any]]:
+    return extract_tourism_entities_from_page(as_page(html, base_url))
 
-        event_start = _first(node, "startDate") if entity_type == "event" else None
-        event_end = _first(node, "endDate") if entity_type == "event" else None
+def _interesting(typ) -> bool:
+    return typ in INTERESTING_TYPES or (isinstance(typ, list) and any(t in INTERESTING_TYPES for t in typ))
 
-        lic, cif = _detect_ids(full_text)
+def _schema_type(typ) -> Optional[str]:
+    # extruct devuelve el tipo como URL ("http://schema.org/Hotel")
+    return str(typ).rstrip("/").rsplit("/", 1)[-1] if typ else None
 
-        return {
-            "type": "entity",
-            "entity_type": entity_type,
-            "name": name,
-            "legal_name": legal_name,
-            "description": desc,
-            "tourism_license": lic,
-            "cif_nif": cif,
-            "url": url or base_url,
-            "same_as": same_as,
-            "telephone": tel,
-            "email": email,
-            "price_range": price_range,
-            "rating": rating,
-            "rating_count": rating_count,
-            "address_street": street,
-            "address_locality": locality,
-            "address_region": region,
-            "address_postal_code": pc,
-            "address_country": country,
-            "lat": lat,
-            "lon": lon,
-            "checkin": checkin,
-            "checkout": checkout,
-            "event_start": event_start,
-            "event_end": event_end,
-            "source": {"method": "jsonld/heuristics", "url": base_url, "schema_type": typ},
-            "confidence": 0.95 if name else 0.8,
-        }
-
-def extract_tourism_entities(html: str, base_url: str) -> List[Dict[str, Any]]:
+def extract_tourism_entities_from_page(page: ParsedPage, microdata: str = "auto") -> List[Dict[str, Any]]:
     """
     Extrae entidades turísticas desde JSON-LD + heurísticas HTML.
     Devuelve items con type="entity".
+
+    microdata: "auto" (microdatos/OpenGraph solo si el JSON-LD no dio entidades) | "always" | "never".
     """
-    soup = BeautifulSoup(html, "lxml")
-    text = soup.get_text(" ", strip=True)
+    base_url = page.url
 
     items: List[Dict[str, Any]] = []
 
-    # 1) JSON-LD
-    for s in soup.find_all("script", {"type": "application/ld+json"}):
-        data = _json_loads_loose(s.string or "")
-        if not data:
-            continue
-        nodes = data if isinstance(data, list) else [data]
-        for node in nodes:
-            if not isinstance(node, dict):
-                continue
-            # @graph suele agrupar múltiples entidades
-            if "@graph" in node and isinstance(node["@graph"], list):
-                for g in node["@graph"]:
-                    if isinstance(g, dict):
-                        typ = g.get("@type")
-                        if typ in INTERESTING_TYPES or (isinstance(typ, list) and any(t in INTERESTING_TYPES for t in typ)):
-                            items.append(_normalize_entity(g, base_url, soup, text))
-                continue
-            typ = node.get("@type")
-            if typ in INTERESTING_TYPES or (isinstance(typ, list) and any(t in INTERESTING_TYPES for t in typ)):
-                items.append(_normalize_entity(node, base_url, soup, text))
+    # 1) JSON-LD (decodificado y con @graph aplanado una vez por página)
+    for node in page_jsonld_nodes(page):
+        if _interesting(node.get("@type")):
+            items.append(_normalize_entity(node, page))
 
     # 2) (Opcional) microdatos/opengraph con extruct si está instalado
-    try:
-        import extruct
-        from w3lib.html import get_base_url
-        ex = extruct.extract(html, base_url=get_base_url(html, base_url), syntaxes=["microdata", "opengraph"])
-        # microdata
-        for md in ex.get("microdata", []):
-            node = md.get("properties") or {}
-            if not isinstance(node, dict):
-                continue
-            typ = md.get("type") or node.get("@type")
-            if isinstance(typ, list):
-                tt = next((t for t in typ if t in INTERESTING_TYPES), None)
-            else:
-                tt = typ
-            if tt in INTERESTING_TYPES:
-                node["@type"] = tt
-                items.append(_normalize_entity(node, base_url, soup, text))
-        # og: basic fallback (solo nombre/desc/url)
-        for og in ex.get("opengraph", []):
-            ogp = og.get("properties") or {}
-            if "og:title" in ogp or "title" in ogp:
-                node = {
-                    "@type": "Organization",
-                    "name": ogp.get("og:title") or ogp.get("title"),
-                    "description": ogp.get("og:description") or ogp.get("description"),
-                    "url": ogp.get("og:url") or base_url,
-                }
-                items.append(_normalize_entity(node, base_url, soup, text))
-    except Exception:
-        pass
-
-    # 3) De-duplicación básica por (name, entity_type)
+    if microdata == "never" or (microdata == "auto" and items) or not HAS_EXTRUCT:
+        return _dedupe_entities(items)
+    ex = page_microdata(page)
+    for md in ex["microdata"]:
+        node = md.get("properties") or {}
+        if not isinstance(node, dict):
+            continue
+        typ = md.get("type") or node.get("@type")
+        types = [_schema_type(t) for t in (typ if isinstance(typ, list) else [typ])]
+        tt = next((t for t in types if t in INTERESTING_TYPES), None)
+        if tt:
+            items.append(_normalize_entity(dict(node, **{"@type": tt}), page))
+    # og: basic fallback (solo nombre/desc/url)
+    for og in ex["opengraph"]:
+        ogp = og.get("properties") or {}
+        if isinstance(ogp, list):  # extruct: [(propiedad, valor), ...]
+            ogp = dict(p for p in ogp if isinstance(p, (list, tuple)) and len(p) == 2)
+        if "og:title" in ogp or "title" in ogp:
+            node = {
+                "@type": "Organization",
+                "name": ogp.get("og:title") or ogp.get("title"),
+                "description": ogp.get("og:description") or ogp.get("description"),
+                "url": ogp.get("og:url") or base_url,
+            }
+            items.append(_normalize_entity(node, page))
+
+    return _dedupe_entities(items)
+
+def _dedupe_entities(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # De-duplicación básica por (name, entity_type)
     seen = set()
     deduped = []
     for it in items:
@@ -466,26 +490,124 @@ def _looks_name(line: str) -> bool:
     if len(line) > 120: return False
     return True
 
-def extract_portal_listings_generic(html: str, base_url: str):
+def _guess_expected_segment_from_url(url: str) -> tuple[str|None, str|None]:
+    u = (url or "").lower()
+    if any(k in u for k in ("restauracion", "restauración", "restaurantes", "bares", "bar", "donde-comer", "dondecomer", "gastronomia")):
+        return "business", "restaurante"
+    if any(k in u for k in ("agenda", "event", "evento", "experienc", "activid", "que-ver", "quever", "rutas", "ruta", "tours", "tour")):
+        return "experience", None
+    if any(k in u for k in ("aloj", "hotel", "hostal", "apart", "camping")):
+        return "accommodation", None
+    return None, None
 
-    def _guess_expected_segment_from_url(url: str) -> tuple[str|None, str|None]:
-        u = (url or "").lower()
-        if any(k in u for k in ("restauracion", "restauración", "restaurantes", "bares", "bar", "donde-comer", "dondecomer", "gastronomia")):
-            return "business", "restaurante"
-        if any(k in u for k in ("agenda", "event", "evento", "experienc", "activid", "que-ver", "quever", "rutas", "ruta", "tours", "tour")):
-            return "experience", None
-        if any(k in u for k in ("aloj", "hotel", "hostal", "apart", "camping")):
-            return "accommodation", None
-        return None, None
+# Tarjetas candidatas (Drupal/WordPress típicos), en orden de prioridad
+CARD_SELECTORS = (".view-content .views-row", "article", "li", ".card, .c-card, .listing, .teaser")
+
+# Regiones de navegación: sus <li>/enlaces son menús, no fichas
+_NAV_ROLES = {"navigation", "menu", "menubar", "banner", "contentinfo"}
+_NAV_CLASS_RX = re.compile(r"(?:^|[-_])(?:menu|nav|navbar|navigation|breadcrumbs?|footer|pager|social)(?:$|[-_])", re.I)
+
+def _is_nav_node(node) -> bool:
+    name = getattr(node, "name", None)
+    if name == "nav":
+        return True
+    if name in ("header", "footer"):
+        # <header>/<footer> de una ficha (dentro de <article>) sí es contenido
+        return node.find_parent("article") is None
+    if (node.get("role") or "").lower() in _NAV_ROLES:
+        return True
+    tokens = list(node.get("class") or [])
+    if node.get("id"):
+        tokens.append(node["id"])
+    return any(_NAV_CLASS_RX.search(t) for t in tokens)
+
+def _in_nav_region(node, nav_cache: Dict[int, bool]) -> bool:
+    """¿node (o algún ancestro) es navegación/cabecera/pie/menú? Memo por nodo: cada ancestro se evalúa una vez."""
+    path = []
+    verdict = False
+    while node is not None and getattr(node, "name", None) not in (None, "[document]"):
+        key = id(node)
+        if key in nav_cache:
+            verdict = nav_cache[key]
+            break
+        path.append(key)
+        if _is_nav_node(node):
+            verdict = True
+            break
+        node = node.parent
+    for key in path:
+        nav_cache[key] = verdict
+    return verdict
+
+def _is_link_entry(node) -> bool:
+    """<li> que es solo un enlace (entrada de menú o de lista de enlaces), sin más contenido."""
+    if node.name != "li":
+        return False
+    children = [ch for ch in node.children if getattr(ch, "name", None) or str(ch).strip()]
+    return len(children) == 1 and getattr(children[0], "name", None) == "a"
+
+def _signature(node) -> tuple:
+    return node.name, tuple(sorted(node.get("class") or ()))
+
+def _listing_cards(page: ParsedPage) -> List[Any]:
+    """
+    Detección de tarjetas ANTES de cualquier trabajo por tarjeta:
+
+    - candidatas = CARD_SELECTORS dentro de page.main, fuera de nav/header/footer/menús
+      y sin los <li> que son solo un enlace (listas de enlaces)
+    - una candidata que envuelve a otras y no se repite entre sus hermanos (misma firma tag+clases)
+      es un contenedor del listado, no una ficha -> se descarta
+    - de las anidadas (li dentro de article dentro de .views-row) solo queda la más externa
+    """
+    def build() -> List[Any]:
+        nav_cache: Dict[int, bool] = {}
+        seen: set = set()
+        cands: List[Any] = []
+        for sel in CARD_SELECTORS:
+            for c in page.main.select(sel):
+                if id(c) in seen or _is_link_entry(c) or _in_nav_region(c, nav_cache):
+                    continue
+                seen.add(id(c))
+                cands.append(c)
+
+        # Candidatas que contienen otras candidatas (una subida por candidata)
+        wraps: set = set()
+        for c in cands:
+            for anc in c.parents:
+                if id(anc) in seen:
+                    wraps.add(id(anc))
+
+        sig_counts: Dict[int, Dict[tuple, int]] = {}
+        def repeated(c) -> bool:
+            parent = c.parent
+            if parent is None:
+                return False
+            counts = sig_counts.get(id(parent))
+            if counts is None:
+                counts = {}
+                for sib in parent.find_all(True, recursive=False):
+                    sig = _signature(sib)
+                    counts[sig] = counts.get(sig, 0) + 1
+                sig_counts[id(parent)] = counts
+            return counts.get(_signature(c), 0) > 1
+
+        kept = [c for c in cands if id(c) not in wraps or repeated(c)]
+        kept_ids = {id(c) for c in kept}
+        # Solo la más externa
+        return [c for c in kept if not any(id(anc) in kept_ids for anc in c.parents)]
+    return page.memo("tourism.listing_cards", build)
 
 def extract_portal_listings_generic(html: str, base_url: str, expected_segment: str|None = None, subtype_hint: str|None = None):
+    return extract_portal_listings_from_page(as_page(html, base_url), expected_segment=expected_segment, subtype_hint=subtype_hint)
+
+def extract_portal_listings_from_page(page: ParsedPage, expected_segment: str|None = None, subtype_hint: str|None = None):
     """
     Heurístico para páginas de listados (hoteles/restaurantes/experiencias).
     - Usa enlaces externos SI existen.
     - Si no, procesa tarjetas internas (.views-row, article, li, .card).
     - Etiqueta segment/subtype por: schema -> keywords -> URL -> expected_segment.
     """
-    soup = BeautifulSoup(html, "lxml")
+    base_url = page.url
     netloc = urlparse(base_url).netloc
 
     # 0) Pistas por URL
@@ -498,9 +620,9 @@ def extract_portal_listings_generic(html: str, base_url: str, expected_segment:
     items = []
     seen_urls = set()
 
-    def build_item(name: str|None, href: str|None, lines: list[str], container_text: str) -> dict:
-        # contactos
-        tel, email, _ = _collect_contacts(soup, container_text)
+    def build_item(node, name: str|None, href: str|None, lines: list[str], container_text: str) -> dict:
+        # contactos de la propia tarjeta (no los primeros del documento)
+        tel, email = _card_contacts(page, node, container_text)
         # clasificación
         seg, sub, seg_src, seg_score = classify_entity(
             raw_type=None,
@@ -553,10 +675,11 @@ def extract_portal_listings_generic(html: str, base_url: str, expected_segment:
         return [_clean_line(s) for s in node.get_text("\n", strip=True).split("\n") if _clean_line(s)]
 
     # 1) Caso 1: tarjetas con ENLACE EXTERNO (p. ej. webs propias)
-    main = soup.find("main") or soup
+    main = page.main
+    nav_cache: Dict[int, bool] = {}
     for a in main.select('a[href^="http"]'):
         href = (a.get("href") or "").strip()
-        if not href:
+        if not href or _in_nav_region(a, nav_cache):
             continue
         host = urlparse(href).netloc
         if not host or host.endswith(netloc):
@@ -568,15 +691,11 @@ def extract_portal_listings_generic(html: str, base_url: str, expected_segment:
         cont = a.find_parent(["article","li","div","section"]) or a.parent
         lines = extract_lines(cont)
         name = next((ln for ln in lines if _looks_name(ln)), None)
-        item = build_item(name, href, lines, cont.get_text(" ", strip=True))
+        item = build_item(cont, name, href, lines, cont.get_text(" ", strip=True))
         items.append(item)
 
     # 2) Caso 2: tarjetas INTERNAS (sin enlace externo): Drupal/WordPress típicos
-    cards = []
-    cards += main.select(".view-content .views-row")
-    cards += main.select("article")
-    cards += main.select("li")
-    cards += main.select(".card, .c-card, .listing, .teaser")
+    cards = _listing_cards(page)
 
     for c in cards:
         # evita duplicar si ya vino por el caso 1
@@ -599,7 +718,7 @@ def extract_portal_listings_generic(html: str, base_url: str, expected_segment:
         href = normalize_url(base_url, href) if href else None
 
         lines = extract_lines(c)
-        item = build_item(name, href, lines, c.get_text(" ", strip=True))
+        item = build_item(c, name, href, lines, c.get_text(" ", strip=True))
         # Evita duplicados por nombre+url
         key = (item.get("name"), item.get("url"))
         if key not in seen_urls:
@@ -615,5 +734,3 @@ def extract_portal_listings_generic(html: str, base_url: str, expected_segment:
         seen.add(key)
         out.append(it)
     return out
-
-    
@@ -0,0 +1,313 @@
+# crewai_html_extractor/scraper/frontier.py
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import math
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+LOG = logging.getLogger("crewai.frontier")
+
+QUEUED, IN_PROGRESS, DONE, FAILED, SKIPPED = "queued", "in_progress", "done", "failed", "skipped"
+
+
+class SqliteFrontier:
+    """
+    Frontier + seen-store persistente en SQLite (WAL), reanudable tras un crash o Ctrl-C.
+
+    Tabla urls: url, priority, depth, status, attempts, last_fetch_ts, discovered_ts,
+                final_url, items, not_modified
+    Tabla entity_keys: huellas de las entidades ya emitidas (índice de de-dupe reanudable;
+                       las entidades en sí van a los sinks en streaming)
+    Tabla hosts: URLs vistas por host (penalización por host del score de PriorityFrontier)
+
+    - add(url, priority, depth) -> False si la URL ya se había visto (cualquier estado)
+    - url in store / host_count(host): consultas en disco, sin sets en memoria
+    - pop() -> (url, depth) | None: la de mayor prioridad (FIFO a igualdad); pasa a in_progress
+    - mark_done(url, ...) / mark_failed(url) / mark_skipped(url)
+    - Commits por lotes (batch_size operaciones) + flush(); close() hace flush
+    - mark_done (y sus entity_keys) NO entra en los commits por lotes: se queda en memoria hasta flush(),
+      que el llamador hace tras volcar sus sinks. Un crash antes deja la página in_progress (resume() la
+      repite) en vez de darla por hecha con sus entidades aún sin escribir
+    - resume(): in_progress -> queued y reintenta failed con attempts < max_attempts
+    """
+
+    def __init__(self, path: str, batch_size: int = 50) -> None:
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self._pending = 0
+        # mark_done pendientes de flush(): [(DONE, final_url, items, not_modified, ts, url)] y huellas de entidades
+        self._done: List[Tuple[str, str, int, int, float, str]] = []
+        self._done_keys: List[int] = []
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " url TEXT PRIMARY KEY, priority REAL NOT NULL DEFAULT 0, depth INTEGER NOT NULL DEFAULT 0,"
+            " status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_fetch_ts REAL, discovered_ts REAL, final_url TEXT, items INTEGER, not_modified INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_urls_queue ON urls (status, priority DESC)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS entity_keys (key INTEGER PRIMARY KEY)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+        self._backfill_hosts()
+        self._conn.commit()
+
+    def _backfill_hosts(self) -> None:
+        """Estados anteriores a la tabla hosts: se cuenta una vez desde urls."""
+        if self._conn.execute("SELECT 1 FROM hosts LIMIT 1").fetchone() is not None:
+            return
+        counts: Counter = Counter(urlparse(url).netloc for url in self.iter_urls())
+        self._conn.executemany("INSERT INTO hosts (host, n) VALUES (?, ?)", counts.items())
+
+    # ----------------------------- escritura por lotes -----------------------------
+    def _touch(self, n: int = 1) -> None:
+        self._pending += n
+        if self._pending >= self.batch_size:
+            # Solo cola/claims/skips: lo marcado done espera a flush()
+            self._conn.commit()
+            self._pending = 0
+
+    def flush(self) -> None:
+        if self._done:
+            self._conn.executemany(
+                "UPDATE urls SET status = ?, final_url = ?, items = ?, not_modified = ?, last_fetch_ts = ?"
+                " WHERE url = ?", self._done,
+            )
+            self._done = []
+        if self._done_keys:
+            self._conn.executemany("INSERT OR IGNORE INTO entity_keys (key) VALUES (?)",
+                                   [(k,) for k in self._done_keys])
+            self._done_keys = []
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    # ----------------------------- frontier -----------------------------
+    def __contains__(self, url: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def add(self, url: str, priority: float = 0.0, depth: int = 0) -> bool:
+        cur = self._conn.execute(
+            "INSERT OR IGNORE INTO urls (url, priority, depth, status, discovered_ts) VALUES (?, ?, ?, ?, ?)",
+            (url, float(priority), int(depth), QUEUED, time.time()),
+        )
+        if cur.rowcount:
+            self._conn.execute(
+                "INSERT INTO hosts (host, n) VALUES (?, 1) ON CONFLICT (host) DO UPDATE SET n = n + 1",
+                (urlparse(url).netloc,),
+            )
+            self._touch()
+            return True
+        return False
+
+    def host_count(self, host: str) -> int:
+        row = self._conn.execute("SELECT n FROM hosts WHERE host = ?", (host,)).fetchone()
+        return row[0] if row else 0
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        row = self._conn.execute(
+            "SELECT url, depth FROM urls WHERE status = ? ORDER BY priority DESC, rowid LIMIT 1", (QUEUED,)
+        ).fetchone()
+        if not row:
+            return None
+        self._conn.execute(
+            "UPDATE urls SET status = ?, attempts = attempts + 1, last_fetch_ts = ? WHERE url = ?",
+            (IN_PROGRESS, time.time(), row[0]),
+        )
+        self._touch()
+        return row[0], int(row[1])
+
+    def claim(self, url: str) -> None:
+        """Marca como in_progress una URL elegida fuera de pop() (p. ej. desde PriorityFrontier)."""
+        self._conn.execute(
+            "UPDATE urls SET status = ?, attempts = attempts + 1, last_fetch_ts = ? WHERE url = ?",
+            (IN_PROGRESS, time.time(), url),
+        )
+        self._touch()
+
+    def top_queued(self, limit: int) -> List[Tuple[str, int, float, int]]:
+        """[(url, depth, priority, rowid)] de las URLs en cola con mayor prioridad."""
+        return self._conn.execute(
+            "SELECT url, depth, priority, rowid FROM urls WHERE status = ? ORDER BY priority DESC, rowid LIMIT ?",
+            (QUEUED, int(limit)),
+        ).fetchall()
+
+    def iter_urls(self) -> Iterator[str]:
+        for (url,) in self._conn.execute("SELECT url FROM urls"):
+            yield url
+
+    def mark_done(self, url: str, final_url: Optional[str] = None, items: int = 0, not_modified: bool = False,
+                  entity_keys: Optional[List[int]] = None) -> None:
+        self._done.append((DONE, final_url or url, int(items), int(bool(not_modified)), time.time(), url))
+        if entity_keys:
+            self._done_keys.extend(entity_keys)
+
+    def mark_failed(self, url: str) -> None:
+        self._conn.execute("UPDATE urls SET status = ? WHERE url = ?", (FAILED, url))
+        self._touch()
+
+    def mark_skipped(self, url: str) -> None:
+        self._conn.execute("UPDATE urls SET status = ? WHERE url = ?", (SKIPPED, url))
+        self._touch()
+
+    def resume(self, max_attempts: int = 3) -> None:
+        self._conn.execute("UPDATE urls SET status = ? WHERE status = ?", (QUEUED, IN_PROGRESS))
+        self._conn.execute(
+            "UPDATE urls SET status = ? WHERE status = ? AND attempts < ?", (QUEUED, FAILED, int(max_attempts))
+        )
+        self.flush()
+
+    # ----------------------------- lectura -----------------------------
+    def counts(self) -> Dict[str, int]:
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+
+    def iter_entity_keys(self) -> Iterator[int]:
+        for (key,) in self._conn.execute("SELECT key FROM entity_keys"):
+            yield key
+
+    def iter_pages(self) -> Iterator[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT final_url, items, not_modified, last_fetch_ts FROM urls WHERE status = ? ORDER BY last_fetch_ts",
+            (DONE,),
+        )
+        for final_url, items, not_modified, ts in rows:
+            iso = datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+            yield {"url": final_url, "items": items, "not_modified": bool(not_modified), "ts": iso}
+
+
+def _url_key(url: str) -> int:
+    """Huella de 8 bytes de la URL: el seen-set en memoria ocupa mucho menos que guardar los str."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "big")
+
+
+class PriorityFrontier:
+    """
+    Frontier por prioridad (heap) con score compuesto y de-dupe O(1) al encolar.
+
+    score = kw_weight * keyword_score - depth_weight * depth - host_weight * log1p(urls ya encoladas del host)
+    A igualdad de score gana la URL descubierta antes (FIFO), así ningún enlace se queda sin turno.
+
+    - push(url, keyword_score, depth) -> False si la URL ya se había visto
+    - pop() -> (url, depth) | None
+    - Memoria acotada: el heap guarda como mucho max_in_memory entradas.
+      * Con store (SqliteFrontier): todo se persiste; el heap es una caché de las mejores filas en cola
+        y se recarga desde disco cuando se vacía o cuando lo volcado supera a su cabeza. El seen-set y
+        las cuentas por host son las del store (en disco): nada crece en memoria con el crawl.
+      * Sin store: se descartan las entradas de menor score (se cuentan en .dropped); el seen-set (huellas
+        de 8 bytes) guarda como mucho max_seen URLs en dos generaciones (al llenarse se olvida la más
+        vieja, así que una URL muy antigua podría volver a encolarse) y las cuentas, max_hosts hosts.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SqliteFrontier] = None,
+        max_in_memory: int = 100_000,
+        kw_weight: float = 1.0,
+        depth_weight: float = 0.5,
+        host_weight: float = 0.25,
+        max_seen: int = 1_000_000,
+        max_hosts: int = 10_000,
+    ) -> None:
+        self.store = store
+        self.max_in_memory = max(16, int(max_in_memory))
+        self.kw_weight = kw_weight
+        self.depth_weight = depth_weight
+        self.host_weight = host_weight
+        self.max_seen = max(2, int(max_seen))
+        self.max_hosts = max(2, int(max_hosts))
+        self.dropped = 0
+        self._heap: List[Tuple[float, int, str, int]] = []
+        # Solo sin store (con store, todo se consulta en disco)
+        self._seen: Set[int] = set()
+        self._seen_old: Set[int] = set()
+        self._host_counts: Counter = Counter()
+        self._seq = 0
+        # Mejor score que quedó solo en disco al recortar el heap (None = nada volcado)
+        self._spilled_max: Optional[float] = None
+
+        if store is not None:
+            self._reload()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, url: str) -> bool:
+        if self.store is not None:
+            return url in self.store
+        key = _url_key(url)
+        return key in self._seen or key in self._seen_old
+
+    def _host_count(self, host: str) -> int:
+        return self.store.host_count(host) if self.store is not None else self._host_counts[host]
+
+    def score(self, url: str, keyword_score: float, depth: int) -> float:
+        host_n = self._host_count(urlparse(url).netloc)
+        return self.kw_weight * keyword_score - self.depth_weight * depth - self.host_weight * math.log1p(host_n)
+
+    def _remember(self, url: str) -> None:
+        """Seen-set y cuentas por host en memoria (sin store), acotados."""
+        if len(self._seen) >= self.max_seen // 2:
+            self._seen_old, self._seen = self._seen, set()
+        self._seen.add(_url_key(url))
+        self._host_counts[urlparse(url).netloc] += 1
+        if len(self._host_counts) > self.max_hosts:
+            self._host_counts = Counter(dict(self._host_counts.most_common(self.max_hosts // 2)))
+
+    def push(self, url: str, keyword_score: float = 1.0, depth: int = 0) -> bool:
+        if url in self:
+            return False
+        prio = self.score(url, keyword_score, depth)
+        if self.store is not None:
+            self.store.add(url, priority=prio, depth=depth)
+        else:
+            self._remember(url)
+        self._seq += 1
+        heapq.heappush(self._heap, (-prio, self._seq, url, depth))
+        if len(self._heap) > self.max_in_memory:
+            self._trim()
+        return True
+
+    def _trim(self) -> None:
+        # Una lista ordenada ya cumple el invariante de heap
+        ordered = sorted(self._heap)
+        keep_n = self.max_in_memory // 2
+        self._heap, cut = ordered[:keep_n], ordered[keep_n:]
+        if not cut:
+            return
+        if self.store is None:
+            self.dropped += len(cut)
+            LOG.debug(f"[frontier] heap lleno: descartadas {len(cut)} URLs de baja prioridad")
+            return
+        best_cut = -cut[0][0]
+        self._spilled_max = best_cut if self._spilled_max is None else max(self._spilled_max, best_cut)
+
+    def _reload(self) -> None:
+        rows = self.store.top_queued(self.max_in_memory + 1)  # type: ignore[union-attr]
+        self._heap = [(-prio, rowid, url, depth) for (url, depth, prio, rowid) in rows[: self.max_in_memory]]
+        heapq.heapify(self._heap)
+        self._seq = max(self._seq, max((r[3] for r in rows), default=0))
+        self._spilled_max = rows[self.max_in_memory][2] if len(rows) > self.max_in_memory else None
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        if self.store is not None and self._spilled_max is not None:
+            if not self._heap or -self._heap[0][0] < self._spilled_max:
+                self._reload()
+        if not self._heap:
+            return None
+        _, _, url, depth = heapq.heappop(self._heap)
+        if self.store is not None:
+            self.store.claim(url)
+        return url, depth
@@ -0,0 +1,409 @@
+# crewai_html_extractor/scraper/httpcache.py
+from __future__ import annotations
+
+import fnmatch
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# zstd es opcional (mejor ratio y más rápido que gzip)
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+LOG = logging.getLogger("crewai.httpcache")
+
+# Cuerpos más pequeños no compensan comprimirse
+_MIN_COMPRESS = 512
+# Cabeceras del transporte: el cuerpo se guarda ya descomprimido
+_DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive"}
+# Resolución (s) del último acceso para el LRU: un acierto solo escribe si el guardado es más viejo
+ACCESS_RESOLUTION_S = 60.0
+
+
+def _compress(body: bytes, codec: str) -> Tuple[str, bytes]:
+    if len(body) < _MIN_COMPRESS or codec == "none":
+        return "none", body
+    if codec == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(body)
+    return "gzip", gzip.compress(body, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Entrada de cache en zstd y 'zstandard' no está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class SqliteCacheBackend:
+    """
+    Entradas en una tabla SQLite (un fichero); el LRU usa la columna accessed_at, que una lectura
+    solo actualiza si tiene más de ACCESS_RESOLUTION_S (los aciertos seguidos no son escrituras).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, codec TEXT, body BLOB,"
+            " raw_size INTEGER, size INTEGER, stored_at REAL, expires_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, codec, body, raw_size, size, stored_at, expires_at, accessed_at"
+                " FROM entries WHERE key=?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - (row[9] or 0) >= ACCESS_RESOLUTION_S:
+                self._conn.execute("UPDATE entries SET accessed_at=? WHERE key=?", (now, key))
+                self._conn.commit()
+        url, status, headers, codec, body, raw_size, size, stored_at, expires_at, _ = row
+        return {"url": url, "status": status, "headers": json.loads(headers), "codec": codec, "body": body,
+                "raw_size": raw_size, "size": size, "stored_at": stored_at, "expires_at": expires_at}
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        """Guarda y devuelve el tamaño que ocupaba la entrada anterior (0 si no había)."""
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                (key, entry["url"], entry["status"], json.dumps(entry["headers"]), entry["codec"], entry["body"],
+                 entry["raw_size"], entry["size"], entry["stored_at"], entry["expires_at"], time.time()),
+            )
+            self._conn.commit()
+        return old[0] if old else 0
+
+    def touch(self, key: str, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE entries SET expires_at=?, accessed_at=? WHERE key=?", (expires_at, time.time(), key))
+            self._conn.commit()
+
+    def usage(self) -> Tuple[int, int]:
+        """-> (nº de entradas, bytes ocupados)."""
+        with self._lock:
+            n, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(n), int(size)
+
+    def victims(self, order: str) -> Iterator[Tuple[str, int]]:
+        """Candidatas a desalojo en orden: 'lru' (menos usada antes) o 'size' (más grande antes)."""
+        col = "size DESC" if order == "size" else "accessed_at ASC"
+        with self._lock:
+            rows = self._conn.execute(f"SELECT key, size FROM entries ORDER BY {col}").fetchall()
+        return iter(rows)
+
+    def delete(self, keys: List[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM entries WHERE key=?", [(k,) for k in keys])
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FileCacheBackend:
+    """
+    Una entrada = dos ficheros en <dir>/<k[:2]>/: <key>.json (metadatos) y <key>.body (cuerpo).
+    Escrituras atómicas (tmp + replace); el LRU usa el mtime del .json (se actualiza al leer).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.root = Path(path)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        d = self.root / key[:2]
+        return d / f"{key}.json", d / f"{key}.body"
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_p, body_p = self._paths(key)
+        try:
+            meta = json.loads(meta_p.read_bytes())
+            body = body_p.read_bytes()
+            os.utime(meta_p)
+        except (OSError, ValueError):
+            return None
+        meta["body"] = body
+        return meta
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        meta_p, body_p = self._paths(key)
+        old = 0
+        try:
+            old = int(json.loads(meta_p.read_bytes()).get("size") or 0)
+        except (OSError, ValueError):
+            pass
+        meta = {k: v for k, v in entry.items() if k != "body"}
+        # Primero el cuerpo: un .json visible siempre tiene su .body
+        self._write(body_p, entry["body"])
+        self._write(meta_p, json.dumps(meta).encode("utf-8"))
+        return old
+
+    def touch(self, key: str, expires_at: float) -> None:
+        meta_p, _ = self._paths(key)
+        try:
+            meta = json.loads(meta_p.read_bytes())
+        except (OSError, ValueError):
+            return
+        meta["expires_at"] = expires_at
+        self._write(meta_p, json.dumps(meta).encode("utf-8"))
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        out = []
+        for meta_p in self.root.glob("*/*.json"):
+            try:
+                st = meta_p.stat()
+                size = int(json.loads(meta_p.read_bytes()).get("size") or 0)
+            except (OSError, ValueError):
+                continue
+            out.append((meta_p.stem, size, st.st_mtime))
+        return out
+
+    def usage(self) -> Tuple[int, int]:
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def victims(self, order: str) -> Iterator[Tuple[str, int]]:
+        entries = self._entries()
+        entries.sort(key=(lambda e: -e[1]) if order == "size" else (lambda e: e[2]))
+        return ((key, size) for key, size, _ in entries)
+
+    def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            for p in self._paths(key):
+                p.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        pass
+
+
+class HttpCache:
+    """
+    Cache HTTP propia (sustituye a requests-cache):
+
+    - backend: "sqlite" (<name>.sqlite) o "fs" (directorio <name>/)
+    - cuerpos comprimidos con zstd si está instalado, si no gzip ("none" para no comprimir)
+    - TTL por defecto ttl_s y por host con reglas {patrón_fnmatch_de_host: segundos} (la primera que case gana;
+      0 = no cachear ese host)
+    - tamaño acotado: max_bytes / max_entries; al pasarse se desaloja hasta el 90% por 'lru' o 'size'
+    - stats(): hits, misses, stale_hits, hit_ratio, bytes_saved (red evitada), bytes_stored vs bytes_raw
+    - stale_if_error: CachedSession sirve la entrada caducada si la red falla o responde 5xx
+      (con is_stale=True y upstream_status: el 5xx recibido, None si fue un error de red)
+    """
+
+    def __init__(
+        self,
+        name: str = ".http_cache",
+        backend: str = "sqlite",
+        ttl_s: float = 3600,
+        ttl_rules: Optional[Mapping[str, float]] = None,
+        max_bytes: Optional[int] = 1 << 30,
+        max_entries: Optional[int] = None,
+        eviction: str = "lru",
+        codec: Optional[str] = None,
+        stale_if_error: bool = True,
+    ) -> None:
+        if backend == "fs":
+            self.backend: Any = FileCacheBackend(name)
+        elif backend == "sqlite":
+            self.backend = SqliteCacheBackend(name if name.endswith(".sqlite") else f"{name}.sqlite")
+        else:
+            raise ValueError(f"Backend de cache desconocido: {backend!r} (sqlite | fs)")
+        if eviction not in ("lru", "size"):
+            raise ValueError(f"Política de desalojo desconocida: {eviction!r} (lru | size)")
+        self.ttl_s = float(ttl_s)
+        self.ttl_rules: Dict[str, float] = dict(ttl_rules or {})
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.codec = codec or ("zstd" if zstandard is not None else "gzip")
+        self.stale_if_error = stale_if_error
+        self._lock = threading.Lock()
+        self._count, self._size = self.backend.usage()
+        self._stats = {"hits": 0, "misses": 0, "stale_hits": 0, "stores": 0, "evictions": 0,
+                       "bytes_saved": 0, "bytes_raw": 0, "bytes_stored": 0}
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(f"GET {url}".encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        host = urlparse(url).netloc
+        for pattern, ttl in self.ttl_rules.items():
+            if fnmatch.fnmatch(host, pattern):
+                return float(ttl)
+        return self.ttl_s
+
+    def _count_stat(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    # ---------- lectura ----------
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Entrada de la URL (fresca o caducada) con 'fresh': bool, o None."""
+        entry = self.backend.get(self.key(url))
+        if entry is None:
+            return None
+        entry["fresh"] = time.time() < entry["expires_at"]
+        return entry
+
+    def to_response(self, entry: Dict[str, Any], stale: bool = False) -> requests.Response:
+        r = requests.Response()
+        r.status_code = entry["status"]
+        r.headers = CaseInsensitiveDict(entry["headers"])
+        r._content = _decompress(entry["body"], entry["codec"])
+        r.url = entry["url"]
+        r.encoding = get_encoding_from_headers(r.headers)
+        r.reason = "OK"
+        r.from_cache = True  # mismo atributo que ponía requests-cache (Core lo lee para las stats)
+        r.is_stale = stale
+        self._count_stat("stale_hits" if stale else "hits")
+        self._count_stat("bytes_saved", len(r._content))
+        return r
+
+    # ---------- escritura ----------
+    def store(self, url: str, r: requests.Response) -> None:
+        ttl = self.ttl_for(url)
+        cc = (r.headers.get("Cache-Control") or "").lower()
+        if ttl <= 0 or "no-store" in cc:
+            return
+        raw = r.content or b""
+        codec, body = _compress(raw, self.codec)
+        now = time.time()
+        entry = {
+            "url": r.url, "status": r.status_code,
+            "headers": {k: v for k, v in r.headers.items() if k.lower() not in _DROP_HEADERS},
+            "codec": codec, "body": body, "raw_size": len(raw), "size": len(body),
+            "stored_at": now, "expires_at": now + ttl,
+        }
+        old = self.backend.put(self.key(url), entry)
+        with self._lock:
+            self._stats["stores"] += 1
+            self._stats["bytes_raw"] += len(raw)
+            self._stats["bytes_stored"] += len(body)
+            self._count += 0 if old else 1
+            self._size += len(body) - old
+            over = (self.max_bytes is not None and self._size > self.max_bytes) or (
+                self.max_entries is not None and self._count > self.max_entries)
+        if over:
+            self.evict()
+
+    def refresh(self, url: str) -> None:
+        """304 sobre una entrada guardada: el cuerpo sigue valiendo, se renueva su TTL."""
+        self.backend.touch(self.key(url), time.time() + self.ttl_for(url))
+
+    def evict(self) -> int:
+        """Desaloja hasta quedar en el 90% de max_bytes / max_entries. -> nº de entradas borradas."""
+        with self._lock:
+            self._count, self._size = self.backend.usage()
+            target_bytes = int(self.max_bytes * 0.9) if self.max_bytes is not None else None
+            target_n = int(self.max_entries * 0.9) if self.max_entries is not None else None
+            drop: List[str] = []
+            count, size = self._count, self._size
+            for key, entry_size in self.backend.victims(self.eviction):
+                if (target_bytes is None or size <= target_bytes) and (target_n is None or count <= target_n):
+                    break
+                drop.append(key)
+                count -= 1
+                size -= entry_size
+            if drop:
+                self.backend.delete(drop)
+                self._count, self._size = count, size
+                self._stats["evictions"] += len(drop)
+        if drop:
+            LOG.info(f"[httpcache] Desalojadas {len(drop)} entradas ({self.eviction}); quedan {count} / {size} bytes")
+        return len(drop)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s.update(entries=self._count, size_bytes=self._size)
+        lookups = s["hits"] + s["stale_hits"] + s["misses"]
+        s["hit_ratio"] = round((s["hits"] + s["stale_hits"]) / lookups, 3) if lookups else None
+        s["compression_saved_bytes"] = s["bytes_raw"] - s["bytes_stored"]
+        return s
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+class CachedSession(requests.Session):
+    """
+    requests.Session con HttpCache en los GET:
+    fresca -> respuesta de cache (sin red) · caducada o ausente -> red y se guarda el 200
+    (un 304 renueva el TTL) · error de red o 5xx con entrada caducada -> la caducada (stale_if_error),
+    con upstream_status (el 5xx, o None si falló la red) y elapsed de la respuesta real para quien mida el servidor.
+    Con stream=True el cuerpo aún no se ha leído: quien lo lea llama a save(url, r) después.
+    """
+
+    def __init__(self, cache: HttpCache) -> None:
+        super().__init__()
+        self.cache = cache
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        if method.upper() != "GET":
+            return super().request(method, url, *args, **kwargs)
+        entry = self.cache.lookup(url)
+        if entry is not None and entry["fresh"]:
+            return self.cache.to_response(entry)
+        try:
+            r = super().request(method, url, *args, **kwargs)
+        except Exception:
+            if entry is not None and self.cache.stale_if_error:
+                LOG.warning(f"[httpcache] Error de red; sirviendo copia caducada de {url}")
+                stale = self.cache.to_response(entry, stale=True)
+                stale.upstream_status = None
+                return stale
+            raise
+        if r.status_code >= 500 and entry is not None and self.cache.stale_if_error:
+            LOG.warning(f"[httpcache] {r.status_code}; sirviendo copia caducada de {url}")
+            r.close()
+            stale = self.cache.to_response(entry, stale=True)
+            stale.upstream_status, stale.elapsed = r.status_code, r.elapsed
+            return stale
+        self.cache._count_stat("misses")
+        if not kwargs.get("stream"):
+            self.save(url, r)
+        return r
+
+    def save(self, url: str, r: requests.Response) -> None:
+        """Guarda un 200 o renueva el TTL con un 304 (sin entrada previa no hace nada)."""
+        if r.status_code == 200:
+            self.cache.store(url, r)
+        elif r.status_code == 304:
+            self.cache.refresh(url)
@@ -0,0 +1,139 @@
+# crewai_html_extractor/scraper/metrics.py
+from __future__ import annotations
+
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# Contadores de fetch que se suman en el resumen del run
+FETCH_COUNTERS = ("bytes", "retries", "sleep_s")
+
+
+class StageTimer:
+    """
+    Cronómetro por etapa de una página (fetch, parse, cada extractor, enlaces...).
+
+    - with timer.stage("tourism-jsonld"): ...  -> suma wall (perf_counter) y CPU (thread_time)
+    - timer.count("tourism-jsonld", n)         -> items producidos por la etapa
+    - as_dict() -> {"timing": {etapa: {"wall_s", "cpu_s"}}, "items_by_extractor": {etapa: n}}
+
+    CPU por hilo: con fetch en paralelo (AsyncCore / run_many) no se mezcla el de otras páginas.
+    """
+
+    def __init__(self) -> None:
+        self.timing: Dict[str, Dict[str, float]] = {}
+        self.items: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            t = self.timing.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+            t["wall_s"] = round(t["wall_s"] + time.perf_counter() - w0, 6)
+            t["cpu_s"] = round(t["cpu_s"] + time.thread_time() - c0, 6)
+
+    def count(self, name: str, n: int) -> None:
+        self.items[name] = self.items.get(name, 0) + int(n)
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Suma un as_dict() de otro timer (p. ej. la extracción hecha en otro proceso)."""
+        for name, t in (other.get("timing") or {}).items():
+            agg = self.timing.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+            agg["wall_s"] = round(agg["wall_s"] + t.get("wall_s", 0.0), 6)
+            agg["cpu_s"] = round(agg["cpu_s"] + t.get("cpu_s", 0.0), 6)
+        for name, n in (other.get("items_by_extractor") or {}).items():
+            self.count(name, n)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"timing": dict(self.timing), "items_by_extractor": dict(self.items)}
+
+
+class RunStats:
+    """
+    Agregado de un run (crawl o lote): suma lo que cada página deja en meta/resultado.
+
+    - add_page(timing, fetch, items_by_extractor, not_modified)
+    - add_failure()
+    - summary() -> dict con totales, medias por página y reparto de tiempo por etapa
+    - write(path) -> JSON (run_summary.json)
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.pages = 0
+        self.failed = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fetch: Dict[str, float] = defaultdict(float)
+        self.timing: Dict[str, Dict[str, float]] = defaultdict(lambda: {"wall_s": 0.0, "cpu_s": 0.0})
+        self.items: Dict[str, int] = defaultdict(int)
+
+    def add_page(
+        self,
+        timing: Optional[Dict[str, Dict[str, float]]] = None,
+        fetch: Optional[Dict[str, Any]] = None,
+        items_by_extractor: Optional[Dict[str, int]] = None,
+        not_modified: bool = False,
+    ) -> None:
+        self.pages += 1
+        self.not_modified += int(bool(not_modified))
+        for name, t in (timing or {}).items():
+            agg = self.timing[name]
+            agg["wall_s"] += t.get("wall_s", 0.0)
+            agg["cpu_s"] += t.get("cpu_s", 0.0)
+        for name, n in (items_by_extractor or {}).items():
+            self.items[name] += n
+        if fetch:
+            for k in FETCH_COUNTERS:
+                self.fetch[k] += fetch.get(k) or 0
+            if fetch.get("from_cache"):
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def add_failure(self) -> None:
+        self.failed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._t0
+        n = max(1, self.pages)
+        stages_wall = sum(t["wall_s"] for t in self.timing.values()) or 1.0
+        return {
+            "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "elapsed_s": round(elapsed, 3),
+            "pages": self.pages,
+            "failed": self.failed,
+            "not_modified": self.not_modified,
+            "pages_per_s": round(self.pages / elapsed, 3) if elapsed > 0 else None,
+            "fetch": {
+                "bytes": int(self.fetch["bytes"]),
+                "retries": int(self.fetch["retries"]),
+                "sleep_s": round(self.fetch["sleep_s"], 3),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            },
+            "stages": {
+                name: {
+                    "wall_s": round(t["wall_s"], 3),
+                    "cpu_s": round(t["cpu_s"], 3),
+                    "wall_per_page_ms": round(1000 * t["wall_s"] / n, 2),
+                    "share": round(t["wall_s"] / stages_wall, 3),
+                }
+                for name, t in sorted(self.timing.items(), key=lambda kv: -kv[1]["wall_s"])
+            },
+            "items_by_extractor": dict(self.items),
+        }
+
+    def write(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
@@ -0,0 +1,154 @@
+# crewai_html_extractor/scraper/numeric.py
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Valores "sin dato" del INE/Eurostat: '..' no disponible, ':' confidencial / no disponible
+MISSING_TOKENS = ("..", "...", "…", ":")
+
+# Notas al pie pegadas al valor: (p) provisional, (e) estimado, (a) avance, (*), (1)...
+# (empieza por '(' literal: re salta rápido por el texto; el espacio previo se quita después)
+_FLAG_RX = re.compile(r"\((?P<flag>[A-Za-z]{1,2}|\*{1,3}|\d{1,2})\)(?=\n)")
+
+# Tras quitar notas y "sin dato", una columna numérica solo puede contener estos caracteres
+_NUMERIC_CHARS = str.maketrans("", "", "0123456789.,%+-\n")
+
+_NL, _PCT, _PLUS, _MINUS = ord("\n"), ord("%"), ord("+"), ord("-")
+
+# es (INE): miles '.', decimal ',' · en: miles ',', decimal '.'; a igualdad ("1.234") gana es
+_FORMATS = (("es", ".", ","), ("en", ",", "."))
+
+
+def _replace_lines(text: str, old: str, new: str) -> str:
+    # Sustituye líneas completas "\n<old>\n"; se repite porque replace() no solapa "\nX\nX\n"
+    needle = f"\n{old}\n"
+    while needle in text:
+        text = text.replace(needle, f"\n{new}\n")
+    return text
+
+
+def _is_digit(b: np.ndarray) -> np.ndarray:
+    return (b >= 48) & (b <= 57)
+
+
+def _well_formed(buf: np.ndarray, thousands: int, decimal: int) -> bool:
+    """
+    Comprueba la forma de TODAS las celdas a la vez sobre los bytes de la columna ("\n" entre celdas,
+    4 bytes "\n" de relleno a cada lado): solo índices y comparaciones de numpy, sin bucle por celda.
+    """
+    nl = np.flatnonzero(buf == _NL)
+    # Miles: dígito delante, exactamente 3 dígitos detrás y grupo inicial de 1-3 dígitos
+    t = np.flatnonzero(buf == thousands)
+    if len(t):
+        if not _is_digit(buf[t - 1]).all():
+            return False
+        if not (_is_digit(buf[t + 1]) & _is_digit(buf[t + 2]) & _is_digit(buf[t + 3]) & ~_is_digit(buf[t + 4])).all():
+            return False
+        if (_is_digit(buf[t - 2]) & _is_digit(buf[t - 3]) & _is_digit(buf[t - 4])).any():
+            return False
+    # Decimal: uno por celda, con dígitos delante y detrás y sin separador de miles después
+    d = np.flatnonzero(buf == decimal)
+    if len(d):
+        if not (_is_digit(buf[d + 1]) & _is_digit(buf[d - 1])).all():
+            return False
+        line_end = nl[np.searchsorted(nl, d)]
+        nxt_d = np.append(d[1:], len(buf))
+        if (nxt_d < line_end).any():
+            return False
+        if len(t):
+            i = np.searchsorted(t, d)
+            nxt_t = np.append(t, len(buf))[i]
+            if (nxt_t < line_end).any():
+                return False
+    # '%' solo al final de la celda; signo solo al principio y seguido de dígito
+    pct = np.flatnonzero(buf == _PCT)
+    if len(pct) and not (buf[pct + 1] == _NL).all():
+        return False
+    sign = np.flatnonzero((buf == _PLUS) | (buf == _MINUS))
+    if len(sign) and not ((buf[sign - 1] == _NL) & _is_digit(buf[sign + 1])).all():
+        return False
+    return True
+
+
+def coerce_column(values: Sequence[Optional[str]], name: str = "") -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Convierte una columna de texto a números si TODOS sus valores son numéricos en un mismo formato:
+
+    - es (INE): miles '.', decimal ',' ("1.234.567", "55,46") · en: miles ',', decimal '.'
+      (a igualdad, p. ej. "1.234", gana es)
+    - '%' al final -> tipo percent (el valor se queda en puntos porcentuales)
+    - '..', '...', '…', ':' y vacío -> None (se cuentan como missing)
+    - notas al pie "(p)", "(e)", "(*)", "(1)" -> se quitan del valor y se cuentan en el informe
+
+    Las columnas de texto se devuelven intactas (sin quitar puntos ni notas).
+    Vectorizado por columna: la columna se une en un único texto, se limpia con replace/translate,
+    la forma de los números se valida con numpy sobre sus bytes y se parsea a float64 de una vez.
+
+    -> (valores, informe) con informe = {"column", "type": int|float|percent|text|empty,
+       "format": es|en|None, "missing", "flags": {nota: n}}
+    """
+    report: Dict[str, Any] = {"column": name, "type": "text", "format": None, "missing": 0, "flags": {}}
+    n = len(values)
+    # Centinelas '\n' a ambos lados: cada celda es exactamente "\n<valor>\n"
+    text = "\n" + "\n".join(v or "" for v in values) + "\n"
+    # parse_table ya colapsa espacios; una celda multilínea no es numérica
+    if n == 0 or text.count("\n") != n + 1:
+        return list(values), report
+
+    flags: Counter = Counter()
+    core = text.replace(" ", "").replace("\t", "")
+    if "(" in core:
+        flags.update(_FLAG_RX.findall(core))
+        core = _FLAG_RX.sub("", core)
+    for tok in MISSING_TOKENS:
+        if tok in core:
+            core = _replace_lines(core, tok, "")
+    # Descarte rápido de columnas de texto
+    if core.translate(_NUMERIC_CHARS):
+        return list(values), report
+    if not core.strip("\n"):
+        report.update(type="empty", missing=n, flags=dict(flags))
+        return [None] * n, report
+
+    buf = np.frombuffer(b"\n\n\n\n" + core.encode("ascii") + b"\n\n\n\n", dtype=np.uint8)
+    for fmt, thousands, decimal in _FORMATS:
+        if not _well_formed(buf, ord(thousands), ord(decimal)):
+            continue
+        clean = _replace_lines(core.replace("%", "").replace(thousands, "").replace(decimal, "."), "", "nan")
+        try:
+            arr = np.fromiter(map(float, clean[1:-1].split("\n")), dtype=np.float64, count=n)
+        except ValueError:  # p. ej. "+" o "%" sueltos
+            continue
+        break
+    else:
+        return list(values), report
+
+    nan_idx = np.flatnonzero(np.isnan(arr))
+    report.update(format=fmt, missing=len(nan_idx), flags=dict(flags))
+    if "%" in core:
+        report["type"] = "percent"
+    elif decimal in core:
+        report["type"] = "float"
+    else:
+        report["type"] = "int"
+        arr = np.nan_to_num(arr).astype(np.int64)
+    out = arr.tolist()
+    for i in nan_idx.tolist():
+        out[i] = None
+    return out, report
+
+
+def coerce_table(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aplica coerce_column a cada columna de un parse_table() (in place) y devuelve el informe por columna."""
+    reports = []
+    for j, name in enumerate(table["schema"]):
+        table["columns"][j], rep = coerce_column(table["columns"][j], name)
+        # Cabecera con '%' (p. ej. "Grado de ocupación (%)"): la columna es porcentaje
+        if rep["type"] in ("int", "float") and "%" in name:
+            rep["type"] = "percent"
+        reports.append(rep)
+    return reports
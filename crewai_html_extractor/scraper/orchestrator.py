@@ -3,16 +3,26 @@
 from __future__ import annotations
 
 import logging
-import random
-import time
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .core import Core
+from requests.adapters import HTTPAdapter
+
+from .core import ROBOTS_POLL_S, Core, RobotsPending
+from .document import ParsedPage
+from .encoding import repair_items
+from .policy import SchedulingPolicy
+from .metrics import StageTimer
 from .extractors import tourism
 from .extractors import html_tables
 from .extractors import ine as ine_extractor
 
+LOG = logging.getLogger("crewai.orchestrator")
+
 # Extractor de red (opcional)
 try:
     from .extractors import network as network_extractor  # type: ignore
@@ -33,98 +43,199 @@ def _guess_seg_from_url(u: str) -> tuple[Optional[str], Optional[str]]:
     return None, None
 
 
+def extract_record(html: str, final_url: str) -> Dict[str, Any]:
+    """
+    Extracción pura (sin red) de una página ya descargada: parse único + extractores.
+    -> {"items", "method_chain", "timing", "items_by_extractor"}
+    Función de módulo y con argumentos simples para poder ejecutarse en un ProcessPoolExecutor.
+    """
+    method_chain: List[str] = []
+    items: List[Dict[str, Any]] = []
+    timer = StageTimer()
+
+    # Parse único (perezoso, por árbol) compartido por todos los extractores
+    page = ParsedPage(html, final_url, timer=timer)
+
+    # Pista de segmento por URL (ya tenemos final_url seguro)
+    exp_seg, exp_sub = _guess_seg_from_url(final_url)
+
+    # Turismo (JSON-LD / microdatos)
+    try:
+        with timer.stage("tourism-jsonld"):
+            t_jsonld = tourism.extract_tourism_entities_from_page(page)
+        timer.count("tourism-jsonld", len(t_jsonld or []))
+        if t_jsonld:
+            items.extend(t_jsonld)
+        method_chain.append("tourism-jsonld")
+    except Exception as e:
+        LOG.debug(f"[orchestrator] Tourism JSON-LD failed: {e}")
+
+    # Turismo (listados genéricos con pista por URL)
+    try:
+        with timer.stage("tourism-listings"):
+            t_list = tourism.extract_portal_listings_from_page(
+                page, expected_segment=exp_seg, subtype_hint=exp_sub
+            )
+        timer.count("tourism-listings", len(t_list or []))
+        if t_list:
+            items.extend(t_list)
+        method_chain.append("tourism-listings")
+    except Exception as e:
+        LOG.debug(f"[orchestrator] Tourism listings failed: {e}")
+
+    # INE
+    try:
+        with timer.stage("ine-html"):
+            ine_items = ine_extractor.extract_ine_tables_from_page(page)
+        timer.count("ine-html", len(ine_items or []))
+        if ine_items:
+            items.extend(ine_items)
+        method_chain.append("ine-html")
+    except Exception as e:
+        LOG.debug(f"[orchestrator] INE extractor failed: {e}")
+
+    # Tablas HTML genéricas
+    try:
+        with timer.stage("html-tables"):
+            generic_items = html_tables.extract_html_tables_from_page(page)
+        timer.count("html-tables", len(generic_items or []))
+        if generic_items:
+            items.extend(generic_items)
+        method_chain.append("html-tables")
+    except Exception as e:
+        LOG.debug(f"[orchestrator] HTML tables extractor failed: {e}")
+
+    # Mojibake: ftfy solo sobre los campos extraídos que lo necesitan
+    repair_items(items)
+    return {"items": items, "method_chain": method_chain, **timer.as_dict()}
+
+
+def _process_context():
+    # El lote ya tiene hilos de fetch vivos: mejor no hacer fork() del proceso con ellos
+    if "forkserver" in mp.get_all_start_methods():
+        return mp.get_context("forkserver")
+    return mp.get_context()
+
+
 class Orchestrator:
-    def __init__(self, core: Optional[Core] = None, logger: Optional[logging.Logger] = None, **kwargs) -> None:
-        self.core = core or Core()
-        self.log = logger or logging.getLogger("crewai.orchestrator")
+    """
+    run_once(url) -> record (fetch + extracción de una URL)
+    run_many(urls, fetch_concurrency=..., extract_workers=...) -> iterador de records según terminan:
+    fetch en un pool de hilos (E/S, cortesía de Core) solapado con la extracción en un pool de procesos (CPU).
+    Las URLs de un host cuyo robots.txt aún no ha llegado (RobotsPending) se aparcan en core.robots y
+    vuelven al lote cuando llega; mientras, siguen las demás.
+    """
 
-    def _pause(self, lo: float = 0.4, hi: float = 0.8) -> None:
-        time.sleep(lo + random.uniform(0, hi - lo))
+    def __init__(
+        self,
+        core: Optional[Core] = None,
+        logger: Optional[logging.Logger] = None,
+        revalidate: bool = True,
+        policy: Optional[SchedulingPolicy] = None,
+        **kwargs,
+    ) -> None:
+        # La cortesía (SchedulingPolicy) solo se aplica en Core, alrededor de la E/S de red:
+        # los extractores corren seguidos, sin pausas entre ellos
+        self.core = core or Core(policy=policy)
+        self.log = logger or LOG
+        # GET condicional: si la página no cambió, reutiliza el record anterior sin extraer
+        self.revalidate = revalidate
 
-    def run_once(self, url: str, enable_network: bool = False) -> Dict[str, Any]:
-        method_chain: List[str] = ["fetch"]
-        items: List[Dict[str, Any]] = []
+    def _record_kind(self, enable_network: bool) -> str:
+        return "record+network" if enable_network else "record"
 
+    def _fetch(self, url: str, enable_network: bool, timer: StageTimer,
+               defer_robots: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Etapa de red. -> (record_final, None) si no hace falta extraer (error de fetch o
+        página sin cambios con record guardado); (None, res) con res["html"] listo si hay que extraer.
+        defer_robots: RobotsPending sube al llamador en vez de esperar el robots.txt de un host nuevo.
+        """
         # --- FETCH robusto: inicializa final_url y captura errores ---
         final_url = url
+        store = self.core.validators if self.revalidate else None
+        record_kind = self._record_kind(enable_network)
         try:
-            final_url, html = self.core.fetch(url)
-        except Exception as e:
-            # Devuelve un record “vacío” con el error de fetch
-            return {
-                "url": final_url,
-                "extracted_at": datetime.utcnow().isoformat(),
-                "data_items": [],
-                "meta": {
-                    "method_chain": method_chain,
-                    "count": 0,
-                    "source_url": final_url,
-                    "error": f"fetch_failed: {e}",
-                },
-            }
-
-        # Pista de segmento por URL (ya tenemos final_url seguro)
-        exp_seg, exp_sub = _guess_seg_from_url(final_url)
-
-        # Turismo (JSON-LD / microdatos)
-        try:
-            t_jsonld = tourism.extract_tourism_entities(html, final_url)
-            if t_jsonld:
-                items.extend(t_jsonld)
-            method_chain.append("tourism-jsonld")
+            # Peticiones simultáneas por host (run_many): las que permita Core (aprendidas o de la política)
+            with self.core.host_slot(url), timer.stage("fetch"):
+                res = self.core.fetch_page(url, record_kind=record_kind if store else None, defer_robots=defer_robots)
+            final_url, html = res["url"], res["html"]
+        except RobotsPending:
+            raise  # defer_robots: el llamador la aparca hasta que lleguen las reglas
         except Exception as e:
-            self.log.debug(f"[orchestrator] Tourism JSON-LD failed: {e}")
-        self._pause()
+            return self._fetch_failed(final_url, e, timer), None
 
-        # Turismo (listados genéricos con pista por URL)
-        try:
-            t_list = tourism.extract_portal_listings_generic(
-                html, final_url, expected_segment=exp_seg, subtype_hint=exp_sub
-            )
-            if t_list:
-                items.extend(t_list)
-            method_chain.append("tourism-listings")
-        except Exception as e:
-            self.log.debug(f"[orchestrator] Tourism listings failed: {e}")
-        self._pause()
+        # 304 / mismo contenido: cortocircuita todo el pipeline de extracción
+        if store and res.get("not_modified"):
+            prev = store.load_record(url, record_kind)
+            if prev:
+                meta = prev.setdefault("meta", {})
+                meta["not_modified"] = True
+                meta["revalidated_at"] = datetime.utcnow().isoformat()
+                # Coste de ESTA revalidación (no el de la extracción original)
+                meta.update(timer.as_dict(), fetch=res.get("stats") or {})
+                return prev, None
+            if html is None:
+                # 304 sin record guardado: hace falta el cuerpo (puede fallar igual que el primer fetch)
+                try:
+                    with self.core.host_slot(url), timer.stage("fetch"):
+                        res["url"], res["html"] = self.core.fetch(url)
+                except Exception as e:
+                    return self._fetch_failed(final_url, e, timer), None
+        return None, res
 
-        # INE
-        try:
-            ine_items = ine_extractor.extract_ine_tables(html, final_url)
-            if ine_items:
-                items.extend(ine_items)
-            method_chain.append("ine-html")
-        except Exception as e:
-            self.log.debug(f"[orchestrator] INE extractor failed: {e}")
-        self._pause()
-
-        # Tablas HTML genéricas
-        try:
-            generic_items = html_tables.extract_html_tables(html, final_url)
-            if generic_items:
-                items.extend(generic_items)
-            method_chain.append("html-tables")
-        except Exception as e:
-            self.log.debug(f"[orchestrator] HTML tables extractor failed: {e}")
-        self._pause()
+    def _fetch_failed(self, final_url: str, e: Exception, timer: StageTimer) -> Dict[str, Any]:
+        """Record “vacío” con el error de fetch."""
+        return {
+            "url": final_url,
+            "extracted_at": datetime.utcnow().isoformat(),
+            "data_items": [],
+            "meta": {
+                "method_chain": ["fetch"],
+                "count": 0,
+                "source_url": final_url,
+                "error": f"fetch_failed: {e}",
+                **timer.as_dict(),
+            },
+        }
 
-        # (Opcional) Red
-        if enable_network and HAS_NETWORK:
-            try:
-                net_items = network_extractor.extract_network(final_url)  # type: ignore[attr-defined]
-                if net_items:
-                    items.extend(net_items)
-                method_chain.append("network")
-            except Exception as e:
-                self.log.debug(f"[orchestrator] Network extractor failed: {e}")
-        elif enable_network and not HAS_NETWORK:
+    def _network_items(self, final_url: str, timer: StageTimer) -> Optional[List[Dict[str, Any]]]:
+        """(Opcional) Red: None si no se ejecutó o falló."""
+        if not HAS_NETWORK:
             self.log.info(
                 "[orchestrator] enable_network=True, pero el extractor de red no está disponible "
                 "(instala 'playwright' y ejecuta 'playwright install')."
             )
+            return None
+        try:
+            with timer.stage("network"):
+                net_items = network_extractor.extract_network(final_url)  # type: ignore[attr-defined]
+            timer.count("network", len(net_items or []))
+            return net_items or []
+        except Exception as e:
+            self.log.debug(f"[orchestrator] Network extractor failed: {e}")
+            return None
+
+    def _finish(
+        self,
+        url: str,
+        res: Dict[str, Any],
+        extracted: Dict[str, Any],
+        timer: StageTimer,
+        enable_network: bool,
+        net_items: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Compone el record de salida y lo guarda para revalidación."""
+        final_url = res["url"]
+        timer.merge(extracted)
+        items = list(extracted.get("items") or [])
+        method_chain = ["fetch"] + list(extracted.get("method_chain") or [])
+        if net_items is not None:
+            items.extend(net_items)
+            method_chain.append("network")
 
         # Record de salida
-        return {
+        record = {
             "url": final_url,
             "extracted_at": datetime.utcnow().isoformat(),
             "data_items": items,
@@ -132,6 +243,127 @@ class Orchestrator:
                 "method_chain": method_chain,
                 "count": len(items),
                 "source_url": final_url,
+                "fetch": res.get("stats") or {},
+                **timer.as_dict(),
             },
         }
+        if extracted.get("error"):
+            record["meta"]["error"] = extracted["error"]
+        store = self.core.validators if self.revalidate else None
+        if store:
+            try:
+                store.save_record(url, record, self._record_kind(enable_network))
+            except Exception as e:
+                self.log.debug(f"[orchestrator] No se pudo guardar el record para revalidación: {e}")
+        return record
+
+    def run_once(self, url: str, enable_network: bool = False) -> Dict[str, Any]:
+        # Coste por etapa (wall/CPU) e items por extractor -> meta
+        timer = StageTimer()
+        # Una sola URL: si su host es nuevo, Core espera su robots.txt (no hay otra cosa que hacer)
+        done, res = self._fetch(url, enable_network, timer)
+        if done is not None:
+            return done
+        extracted = extract_record(res["html"], res["url"])
+        net_items = self._network_items(res["url"], timer) if enable_network else None
+        return self._finish(url, res, extracted, timer, enable_network, net_items)
+
+    def _fetch_for_batch(self, url: str, enable_network: bool, timer: StageTimer):
+        # En run_many el extractor de red (E/S) va en el hilo de fetch, no en el pool de CPU
+        done, res = self._fetch(url, enable_network, timer, defer_robots=True)
+        if res is not None and enable_network:
+            res["network_items"] = self._network_items(res["url"], timer)
+        return done, res
+
+    def run_many(
+        self,
+        urls: Iterable[str],
+        *,
+        fetch_concurrency: Optional[int] = None,
+        extract_workers: Optional[int] = None,
+        enable_network: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lote en streaming: solapa la E/S de red con la extracción y rinde cada record al terminar
+        (en orden de finalización, no de entrada; record["meta"]["source_url"] / record["url"] lo identifican).
+
+        - fetch_concurrency: hilos de fetch (default: policy.max_concurrency). La cortesía por host
+          (rate limit, crawl-delay, concurrencia por host, ritmo adaptativo) la sigue aplicando Core.
+        - extract_workers: procesos de extracción (default: nº de CPUs; 0 = en este proceso)
+        - urls se consume de forma perezosa y hay un número acotado de páginas en vuelo, así que
+          admite generadores de miles de URLs sin cargar todo en memoria.
+        """
+        fetch_n = max(1, int(fetch_concurrency or self.core.policy.max_concurrency))
+        extract_n = (os.cpu_count() or 1) if extract_workers is None else max(0, int(extract_workers))
+        # Páginas descargadas esperando extracción: acota la memoria
+        max_pending = fetch_n + 2 * max(1, extract_n)
+
+        # Pool de conexiones a la medida de los hilos de fetch
+        adapter = HTTPAdapter(pool_connections=fetch_n, pool_maxsize=fetch_n)
+        self.core.session.mount("http://", adapter)
+        self.core.session.mount("https://", adapter)
+
+        extract_pool = ProcessPoolExecutor(max_workers=extract_n, mp_context=_process_context()) if extract_n else None
+        fetch_pool = ThreadPoolExecutor(max_workers=fetch_n, thread_name_prefix="crewai-batch")
+        fetching: Dict[Future, Tuple[str, StageTimer]] = {}
+        extracting: Dict[Future, Tuple[str, StageTimer, Dict[str, Any]]] = {}
+        pending_urls = iter(urls)
+        exhausted = False
+        # URLs aparcadas por RobotsPending cuyo robots.txt ya llegó: pasan delante de las nuevas
+        robots = self.core.robots
+        released: deque = deque()
+
+        def next_url() -> Optional[str]:
+            nonlocal exhausted
+            released.extend(robots.take_ready())
+            if released:
+                return released.popleft()
+            url = None if exhausted else next(pending_urls, None)
+            exhausted = url is None
+            return url
+
+        try:
+            while True:
+                while len(fetching) < fetch_n and len(fetching) + len(extracting) < max_pending:
+                    url = next_url()
+                    if url is None:
+                        break
+                    timer = StageTimer()
+                    fetching[fetch_pool.submit(self._fetch_for_batch, url, enable_network, timer)] = (url, timer)
+                if not fetching and not extracting:
+                    if robots.waiting():
+                        # Solo quedan URLs esperando su robots.txt: nada más que hacer mientras
+                        robots.wait_ready(robots.timeout + 1)
+                        continue
+                    break
 
+                finished, _ = wait(list(fetching) + list(extracting), return_when=FIRST_COMPLETED,
+                                   timeout=ROBOTS_POLL_S if robots.waiting() else None)
+                for fut in finished:
+                    if fut in fetching:
+                        url, timer = fetching.pop(fut)
+                        try:
+                            done, res = fut.result()
+                        except RobotsPending:
+                            robots.defer(url, url)
+                            continue
+                        if done is not None:
+                            yield done
+                        elif extract_pool is not None:
+                            extracting[extract_pool.submit(extract_record, res["html"], res["url"])] = (url, timer, res)
+                        else:
+                            extracted = extract_record(res["html"], res["url"])
+                            yield self._finish(url, res, extracted, timer, enable_network, res.get("network_items"))
+                    else:
+                        url, timer, res = extracting.pop(fut)
+                        try:
+                            extracted = fut.result()
+                        except Exception as e:
+                            # p. ej. un worker muerto (BrokenProcessPool): record sin items con el error
+                            self.log.warning(f"[orchestrator] Extracción fallida para {url}: {e}")
+                            extracted = {"items": [], "method_chain": [], "error": f"extract_failed: {e}"}
+                        yield self._finish(url, res, extracted, timer, enable_network, res.get("network_items"))
+        finally:
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            if extract_pool is not None:
+                extract_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,135 @@
+# crewai_html_extractor/scraper/policy.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .ratelimit import HostRateLimiter, RateRule
+
+# TOML es opcional (stdlib desde Python 3.11)
+try:
+    import tomllib
+except Exception:
+    tomllib = None
+
+LOG = logging.getLogger("crewai.policy")
+
+# Variable de entorno con la ruta del fichero de política del despliegue
+POLICY_ENV = "CREWAI_POLICY"
+
+
+class SchedulingPolicy:
+    """
+    Política de cortesía/planificación de un despliegue. Solo gobierna la E/S de red
+    (Core la aplica alrededor de cada petición); la extracción corre sin pausas.
+
+    - min_delay_s / max_delay_s: separación por host = min + jitter [0, max-min]
+    - burst: peticiones seguidas permitidas por host antes de espaciar
+    - rate_limits: {patrón_fnmatch_de_host: intervalo | [intervalo, burst]} (la primera que case gana)
+    - respect_robots: no pedir URLs que robots.txt prohíbe (Core y el frontier del crawler)
+    - respect_crawl_delay: el crawl-delay de robots.txt sube el intervalo del host
+    - max_retries / backoff_base_s: reintentos y base del backoff exponencial (429/503/403/errores)
+    - max_concurrency / per_host_concurrency: peticiones en vuelo (AsyncCore, run_many)
+    - adaptive: intervalo y concurrencia por host aprendidos (AIMD) a partir de min_delay_s /
+      per_host_concurrency: un host sano acelera hasta adaptive_floor_s y uno que se queja frena hasta
+      adaptive_max_delay_s (tras un 403/429/503 o un error de red, al menos adaptive_min_backoff_s);
+      la concurrencia sube hasta adaptive_max_concurrency; las reglas de rate_limits y el crawl-delay
+      siguen siendo un mínimo
+    - adaptive_floor_s: con min_delay_s por defecto, adaptive_min_delay_s; un min_delay_s explícito
+      (kwarg, fichero o flag) es un suelo duro, salvo que adaptive_min_delay_s también se dé explícito
+    - cache_ttl: {patrón_fnmatch_de_host: segundos} TTL de la cache HTTP por host (0 = no cachear)
+
+    Cargable desde JSON o TOML: SchedulingPolicy.from_file(path), o load() con $CREWAI_POLICY.
+    Claves desconocidas se ignoran con un aviso.
+    """
+
+    FIELDS: Dict[str, Any] = {
+        "min_delay_s": 3.0,
+        "max_delay_s": 8.0,
+        "burst": 1,
+        "rate_limits": {},
+        "respect_robots": True,
+        "respect_crawl_delay": True,
+        "max_retries": 4,
+        "backoff_base_s": None,  # None = min_delay_s (comportamiento histórico)
+        "max_concurrency": 16,
+        "per_host_concurrency": 1,
+        "adaptive": True,
+        "adaptive_min_delay_s": 1.0,
+        "adaptive_min_backoff_s": 1.0,
+        "adaptive_max_delay_s": 60.0,
+        "adaptive_max_concurrency": 4,
+        "cache_ttl": {},
+    }
+
+    def __init__(self, **kwargs: Any) -> None:
+        unknown = set(kwargs) - set(self.FIELDS)
+        if unknown:
+            LOG.warning(f"[policy] Claves desconocidas ignoradas: {', '.join(sorted(unknown))}")
+        for name, default in self.FIELDS.items():
+            value = kwargs.get(name, default)
+            setattr(self, name, dict(value) if isinstance(value, dict) else value)
+        # Campos dados explícitamente (el resto son valores por defecto)
+        self.explicit = frozenset(k for k in self.FIELDS if kwargs.get(k) is not None)
+        self.min_delay_s = max(0.0, float(self.min_delay_s))
+        self.max_delay_s = max(self.min_delay_s, float(self.max_delay_s))
+        self.rate_limits: Dict[str, RateRule] = {
+            k: tuple(v) if isinstance(v, list) else v for k, v in self.rate_limits.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"SchedulingPolicy({self.as_dict()!r})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def replace(self, **changes: Any) -> "SchedulingPolicy":
+        """Copia con algunos campos cambiados (p. ej. desde flags de CLI)."""
+        changes = {k: v for k, v in changes.items() if v is not None}
+        data = self.as_dict()
+        data.update(changes)
+        new = SchedulingPolicy(**data)
+        new.explicit = self.explicit | frozenset(k for k in changes if k in self.FIELDS)
+        return new
+
+    @property
+    def backoff_s(self) -> float:
+        return float(self.min_delay_s if self.backoff_base_s is None else self.backoff_base_s)
+
+    @property
+    def adaptive_floor_s(self) -> float:
+        """Intervalo mínimo al que puede acelerar el ritmo adaptativo de un host."""
+        if "min_delay_s" in self.explicit and "adaptive_min_delay_s" not in self.explicit:
+            return self.min_delay_s
+        return min(float(self.adaptive_min_delay_s), self.min_delay_s)
+
+    def make_limiter(self) -> HostRateLimiter:
+        return HostRateLimiter(
+            default_interval_s=self.min_delay_s,
+            jitter_s=self.max_delay_s - self.min_delay_s,
+            burst=self.burst,
+            rules=self.rate_limits,
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "SchedulingPolicy":
+        p = Path(path)
+        if p.suffix.lower() == ".toml":
+            if tomllib is None:
+                raise RuntimeError("Política en TOML requiere Python 3.11+ (o usa JSON)")
+            data = tomllib.loads(p.read_text(encoding="utf-8"))
+        else:
+            data = json.loads(p.read_text(encoding="utf-8"))
+        # En TOML la política puede ir bajo [scheduling]
+        data = data.get("scheduling", data)
+        LOG.info(f"[policy] Política cargada de {p}")
+        return cls(**data)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SchedulingPolicy":
+        """path explícito > $CREWAI_POLICY > valores por defecto."""
+        path = path or os.environ.get(POLICY_ENV)
+        return cls.from_file(path) if path else cls()
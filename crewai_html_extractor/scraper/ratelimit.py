@@ -0,0 +1,170 @@
+# crewai_html_extractor/scraper/ratelimit.py
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import random
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+# Regla por patrón de host: intervalo (s) o (intervalo, burst)
+RateRule = Union[float, Tuple[float, int]]
+
+
+class TokenBucket:
+    """
+    Bucket de un host: se rellena a 1 token cada 'interval_s' hasta 'burst' tokens.
+    reserve() nunca bloquea: consume ya (los tokens pueden quedar en negativo) y
+    devuelve cuánto hay que esperar para que el hueco reservado sea efectivo.
+    """
+
+    __slots__ = ("interval_s", "burst", "tokens", "updated")
+
+    def __init__(self, interval_s: float, burst: int = 1, now: Optional[float] = None) -> None:
+        self.interval_s = max(0.0, float(interval_s))
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        if self.interval_s <= 0:
+            self.tokens = float(self.burst)
+        elif now > self.updated:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) / self.interval_s)
+        self.updated = max(self.updated, now)
+
+    def reserve(self, now: float, cost: float = 1.0) -> float:
+        wait_s = self.wait_time(now)
+        # cost > 1 retrasa los huecos siguientes (jitter), no el actual
+        self.tokens -= cost
+        return wait_s
+
+    def wait_time(self, now: float) -> float:
+        """Segundos hasta que haya un token libre (sin consumir)."""
+        self._refill(now)
+        if self.tokens >= 1 or self.interval_s <= 0:
+            return 0.0
+        return (1.0 - self.tokens) * self.interval_s
+
+
+class HostRateLimiter:
+    """
+    Rate limiter por host (token bucket), seguro entre hilos y usable desde asyncio.
+
+    - default_interval_s: separación base entre peticiones al mismo host
+    - jitter_s: retraso aleatorio extra [0, jitter_s] por petición (se descuenta del bucket,
+      así que la separación mínima efectiva es interval + jitter, como el throttle anterior)
+    - rules: {patrón_fnmatch_de_host: intervalo | (intervalo, burst)}; la primera que case gana
+    - set_crawl_delay(host, s): siembra desde robots.txt; nunca baja del intervalo configurado
+    - set_interval(host, s): intervalo aprendido (AdaptiveThrottle) en lugar del por defecto; no baja de una
+      regla explícita del host ni de su crawl-delay, y el jitter se escala con él
+    - reserve(host) -> s a esperar (no bloquea) · wait_time(host) -> s hasta el próximo hueco
+    - try_acquire(host) / acquire(host) / await acquire_async(host)
+    """
+
+    def __init__(
+        self,
+        default_interval_s: float = 3.0,
+        jitter_s: float = 0.0,
+        burst: int = 1,
+        rules: Optional[Mapping[str, RateRule]] = None,
+    ) -> None:
+        self.default_interval_s = max(0.0, float(default_interval_s))
+        self.jitter_s = max(0.0, float(jitter_s))
+        self.default_burst = max(1, int(burst))
+        self.rules: Dict[str, RateRule] = dict(rules or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._crawl_delay: Dict[str, float] = {}
+        self._learned: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _matching_rule(self, host: str) -> Optional[Tuple[float, int]]:
+        for pattern, rule in self.rules.items():
+            if fnmatch.fnmatch(host, pattern):
+                if isinstance(rule, (tuple, list)):
+                    return float(rule[0]), int(rule[1])
+                return float(rule), self.default_burst
+        return None
+
+    def _rule_for(self, host: str) -> Tuple[float, int]:
+        return self._matching_rule(host) or (self.default_interval_s, self.default_burst)
+
+    def _interval(self, host: str) -> float:
+        learned = self._learned.get(host)
+        if learned is None:
+            interval = self._rule_for(host)[0]
+        else:
+            rule = self._matching_rule(host)
+            interval = max(learned, rule[0] if rule else 0.0)
+        return max(interval, self._crawl_delay.get(host, 0.0))
+
+    def _bucket(self, host: str, now: float) -> TokenBucket:
+        b = self._buckets.get(host)
+        if b is None:
+            b = self._buckets[host] = TokenBucket(self._interval(host), self._rule_for(host)[1], now)
+        return b
+
+    def set_crawl_delay(self, host: str, delay_s: Optional[float]) -> None:
+        if not delay_s:
+            return
+        with self._lock:
+            self._crawl_delay[host] = float(delay_s)
+            b = self._buckets.get(host)
+            if b is not None:
+                b.interval_s = self._interval(host)
+
+    def set_interval(self, host: str, interval_s: float) -> None:
+        with self._lock:
+            if self._learned.get(host) == interval_s:
+                return
+            self._learned[host] = max(0.0, float(interval_s))
+            b = self._buckets.get(host)
+            if b is not None:
+                b.interval_s = self._interval(host)
+
+    def interval_for(self, host: str) -> float:
+        with self._lock:
+            return self._bucket(host, time.monotonic()).interval_s
+
+    def _cost(self, host: str, b: TokenBucket) -> float:
+        if self.jitter_s and b.interval_s > 0:
+            jitter = self.jitter_s
+            # Con intervalo aprendido, el jitter guarda la proporción jitter/intervalo por defecto
+            if host in self._learned and self.default_interval_s > 0:
+                jitter *= b.interval_s / self.default_interval_s
+            return 1.0 + random.uniform(0, jitter) / b.interval_s
+        return 1.0
+
+    def reserve(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            b = self._bucket(host, now)
+            return b.reserve(now, self._cost(host, b))
+
+    def wait_time(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            return self._bucket(host, now).wait_time(now)
+
+    def try_acquire(self, host: str) -> bool:
+        """Toma el hueco solo si está libre ya; si no, no consume nada."""
+        with self._lock:
+            now = time.monotonic()
+            b = self._bucket(host, now)
+            if b.wait_time(now) > 0:
+                return False
+            b.reserve(now, self._cost(host, b))
+            return True
+
+    def acquire(self, host: str) -> float:
+        wait_s = self.reserve(host)
+        if wait_s > 0:
+            time.sleep(wait_s)
+        return wait_s
+
+    async def acquire_async(self, host: str) -> float:
+        wait_s = self.reserve(host)
+        if wait_s > 0:
+            await asyncio.sleep(wait_s)
+        return wait_s
@@ -0,0 +1,261 @@
+# crewai_html_extractor/scraper/robots.py
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+import urllib.robotparser as robotparser
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+
+LOG = logging.getLogger("crewai.robots")
+
+# Sin robots.txt legible (red caída, 5xx) se permite todo, pero se reintenta antes
+ERROR_TTL_S = 3600
+
+
+def origin_of(url: str) -> str:
+    p = urlparse(url)
+    return f"{p.scheme}://{p.netloc}"
+
+
+class RobotsStore:
+    """
+    robots.txt por origen (scheme://host) sin bloquear nunca el camino del fetch:
+
+    - can_fetch(url) -> True | False | None (None = aún no se conocen las reglas; se piden en segundo plano)
+    - defer(url, item) aparca 'item' (p. ej. la URL y su profundidad) hasta que lleguen las reglas de su
+      origen; take_ready() devuelve lo ya liberado. Así quien tiene una cola sigue con otros hosts en vez
+      de esperar; wait_ready(timeout) solo cuando no queda otra cosa que hacer
+    - wait_origin(url, timeout): espera a las reglas de UN origen (llamadas sueltas, sin cola que aprovechar)
+    - crawl_delay(url) -> s | None · prefetch(url) -> pide las reglas del origen si no están
+    - reglas parseadas en memoria + texto en disco (SQLite) con TTL: otros procesos/ejecuciones
+      las reutilizan sin volver a descargarlas
+    - on_rules(host, crawl_delay): aviso al cargar reglas de un host (Core lo conecta al rate limiter)
+
+    Semántica de descarga (la de urllib.robotparser): 401/403 -> todo prohibido; otro 4xx -> todo permitido;
+    error de red / 5xx -> todo permitido durante ERROR_TTL_S.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = ".robots.sqlite",
+        user_agent: str = "*",
+        ttl_s: float = 86400,
+        timeout: float = 10,
+        headers: Optional[Dict[str, str]] = None,
+        verify_ssl: bool = True,
+        max_workers: int = 4,
+    ) -> None:
+        self.user_agent = user_agent
+        self.ttl_s = float(ttl_s)
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+        self._rules: Dict[str, Optional[robotparser.RobotFileParser]] = {}
+        self._expires: Dict[str, float] = {}
+        self._pending: Set[str] = set()
+        self._waiting: Dict[str, List[Any]] = {}  # origen -> items aparcados hasta sus reglas
+        self._ready: List[Any] = []
+        self._listeners: List[Callable[[str, Optional[float]], None]] = []
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)  # avisa al terminar cada descarga
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max(1, int(max_workers))
+        self._session = requests.Session()
+        self._session.headers.update(headers or {})
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS robots ("
+                " origin TEXT PRIMARY KEY, status INTEGER, body TEXT, fetched_at REAL, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def on_rules(self, fn: Callable[[str, Optional[float]], None]) -> None:
+        self._listeners.append(fn)
+
+    # ---------- consultas (no bloquean) ----------
+    def _get(self, url: str) -> Optional[robotparser.RobotFileParser]:
+        """Reglas en memoria (o disco) del origen; si no hay o caducaron, las pide en segundo plano."""
+        origin = origin_of(url)
+        with self._lock:
+            known = origin in self._rules
+            rp = self._rules.get(origin)
+            fresh = known and time.time() < self._expires.get(origin, 0)
+        if fresh:
+            return rp
+        if not known and self._load_from_disk(origin):
+            with self._lock:
+                return self._rules.get(origin)
+        self.prefetch(url)
+        return rp  # las caducadas siguen valiendo mientras llegan las nuevas
+
+    def can_fetch(self, url: str) -> Optional[bool]:
+        origin = origin_of(url)
+        with self._lock:
+            unknown = origin not in self._rules
+            pending = origin in self._pending
+        if unknown and (pending or not self._load_from_disk(origin)):
+            self.prefetch(url)
+            return None
+        rp = self._get(url)
+        if rp is None:
+            return True
+        try:
+            return rp.can_fetch(self.user_agent, url)
+        except Exception:
+            return True
+
+    def defer(self, url: str, item: Any) -> None:
+        """Aparca item hasta que lleguen las reglas del origen de url (las pide si hace falta)."""
+        origin = origin_of(url)
+        with self._lock:
+            if origin in self._rules and origin not in self._pending:
+                self._ready.append(item)  # llegaron entre can_fetch y defer
+                return
+            self._waiting.setdefault(origin, []).append(item)
+        self.prefetch(url)
+
+    def take_ready(self) -> List[Any]:
+        """Items aparcados cuyas reglas ya llegaron (o cuya descarga falló: se permiten)."""
+        with self._lock:
+            ready, self._ready = self._ready, []
+        return ready
+
+    def waiting(self) -> int:
+        """Items aparcados (liberados o no) que aún no ha recogido take_ready()."""
+        with self._lock:
+            return len(self._ready) + sum(map(len, self._waiting.values()))
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que se libere algún item aparcado. -> True si hay alguno para take_ready()."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._done:
+            while not self._ready and self._waiting:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    break
+                self._done.wait(left)
+            return bool(self._ready)
+
+    def wait_origin(self, url: str, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine la descarga de robots.txt del origen de url. -> True si ya no está pendiente."""
+        origin = origin_of(url)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._done:
+            while origin in self._pending:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._done.wait(left)
+            return True
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        rp = self._get(url)
+        return self._delay_of(rp)
+
+    def _delay_of(self, rp: Optional[robotparser.RobotFileParser]) -> Optional[float]:
+        if rp is None:
+            return None
+        try:
+            cd = rp.crawl_delay(self.user_agent)
+            return float(cd) if cd else None
+        except Exception:
+            return None
+
+    # ---------- carga ----------
+    def prefetch(self, url: str) -> None:
+        """Encola la descarga de robots.txt del origen (si no está ya en curso)."""
+        origin = origin_of(url)
+        with self._lock:
+            if origin in self._pending:
+                return
+            self._pending.add(origin)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="crewai-robots")
+            executor = self._executor
+        executor.submit(self._fetch, origin)
+
+    def _fetch(self, origin: str) -> None:
+        status, body = 0, ""
+        try:
+            try:
+                r = self._session.get(f"{origin}/robots.txt", timeout=self.timeout, verify=self.verify_ssl)
+                status, body = r.status_code, (r.text if r.status_code == 200 else "")
+            except Exception as e:
+                LOG.debug(f"[robots] {origin}/robots.txt no disponible: {e}")
+            ttl = self.ttl_s if 200 <= status < 500 else ERROR_TTL_S
+            now = time.time()
+            # Primero en memoria: lo aparcado con defer() se libera con reglas aunque falle el disco
+            self._install(origin, status, body, now + ttl)
+            if self._conn is not None:
+                with self._db_lock:
+                    self._conn.execute("INSERT OR REPLACE INTO robots VALUES (?,?,?,?,?)",
+                                       (origin, status, body, now, now + ttl))
+                    self._conn.commit()
+        except Exception as e:
+            LOG.warning(f"[robots] No se pudieron guardar las reglas de {origin}: {e}")
+        finally:
+            # Siempre: si no, el origen quedaría "pendiente" para siempre y nunca se reintentaría
+            with self._done:
+                self._pending.discard(origin)
+                self._ready.extend(self._waiting.pop(origin, ()))
+                self._done.notify_all()
+
+    def _load_from_disk(self, origin: str) -> bool:
+        if self._conn is None:
+            return False
+        with self._db_lock:
+            row = self._conn.execute("SELECT status, body, expires_at FROM robots WHERE origin=?", (origin,)).fetchone()
+        if row is None or row[2] <= time.time():
+            return False
+        self._install(origin, row[0], row[1], row[2])
+        return True
+
+    def _install(self, origin: str, status: int, body: str, expires_at: float) -> None:
+        rp: Optional[robotparser.RobotFileParser] = robotparser.RobotFileParser(f"{origin}/robots.txt")
+        if status in (401, 403):
+            rp.disallow_all = True
+        elif status == 200:
+            rp.parse(body.splitlines())
+        else:
+            rp = None  # sin reglas: todo permitido
+        with self._lock:
+            self._rules[origin] = rp
+            self._expires[origin] = expires_at
+        delay = self._delay_of(rp)
+        host = urlparse(origin).netloc
+        for fn in self._listeners:
+            try:
+                fn(host, delay)
+            except Exception as e:
+                LOG.debug(f"[robots] listener falló para {host}: {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que terminen las descargas en curso (útil en tests/scripts). -> True si no queda ninguna."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._done:
+            while self._pending:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._done.wait(left)
+            return True
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._session.close()
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
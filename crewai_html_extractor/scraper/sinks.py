@@ -0,0 +1,213 @@
+# crewai_html_extractor/scraper/sinks.py
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Parquet es opcional (pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+# Orden de columnas estable para CSV/Parquet (mismo orden que _normalize_entity)
+ENTITY_COLUMNS: Tuple[str, ...] = (
+    "type", "segment", "subtype", "segment_source", "segment_score", "entity_type",
+    "name", "legal_name", "description", "tourism_license", "cif_nif", "url", "same_as",
+    "telephone", "email", "price_range", "rating", "rating_count",
+    "address_street", "address_locality", "address_region", "address_postal_code", "address_country",
+    "lat", "lon", "checkin", "checkout", "event_start", "event_end", "source", "confidence",
+)
+PAGE_COLUMNS: Tuple[str, ...] = ("url", "items", "not_modified", "ts")
+
+# Tipos Parquet fijos (el resto, string) para que todos los row groups compartan esquema
+_PARQUET_FLOATS = {"segment_score", "rating", "lat", "lon", "confidence"}
+_PARQUET_INTS = {"rating_count", "items"}
+_PARQUET_BOOLS = {"not_modified"}
+
+
+def entity_key(e: Dict[str, Any]) -> Tuple:
+    """Clave de de-dupe por (name, entity_type, telephone|email|url)."""
+    return (
+        (e.get("name") or "").strip().lower(),
+        e.get("entity_type"),
+        (e.get("telephone") or "").strip(),
+        (e.get("email") or "").strip(),
+        (e.get("url") or "").strip(),
+    )
+
+
+def entity_fingerprint(e: Dict[str, Any]) -> int:
+    """Huella de 8 bytes de entity_key: el índice de de-dupe no guarda las entidades."""
+    raw = json.dumps(entity_key(e), ensure_ascii=False, default=str).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big", signed=True)
+
+
+class EntityDeduper:
+    """Índice incremental de claves: add(e) -> huella si es nueva, None si ya se vio."""
+
+    def __init__(self, known: Optional[Iterable[int]] = None) -> None:
+        self._keys: Set[int] = set(known or ())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, e: Dict[str, Any]) -> Optional[int]:
+        fp = entity_fingerprint(e)
+        if fp in self._keys:
+            return None
+        self._keys.add(fp)
+        return fp
+
+
+def _flat(v: Any) -> Any:
+    """same_as (lista) -> 'a;b'; dicts/listas restantes -> JSON (CSV/Parquet no tienen anidados)."""
+    if isinstance(v, list):
+        return ";".join(map(str, v))
+    if isinstance(v, dict):
+        return json.dumps(v, ensure_ascii=False, default=str)
+    return v
+
+
+class Sink:
+    """
+    Escritor en streaming: write() acumula filas en un búfer pequeño y flush() las vuelca a disco.
+    Se escribe por trozos, así la memoria no crece con el crawl.
+    """
+
+    suffix = ""
+
+    def __init__(self, base_path: Path, columns: Sequence[str], append: bool = False, chunk_rows: int = 1000) -> None:
+        self.columns = list(columns)
+        self.append = append
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.path = Path(f"{base_path}{self.suffix}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rows_written = 0
+        self._buf: List[Dict[str, Any]] = []
+        if not append and self.path.exists():
+            self._discard()
+
+    def _discard(self) -> None:
+        """Borra la salida de un run anterior (sin append)."""
+        self.path.unlink()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._buf.append(row)
+        if len(self._buf) >= self.chunk_rows:
+            self.flush()
+
+    def write_many(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for r in rows:
+            self.write(r)
+
+    def flush(self) -> None:
+        if self._buf:
+            self._write_chunk(self._buf)
+            self.rows_written += len(self._buf)
+            self._buf = []
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JsonlSink(Sink):
+    suffix = ".jsonl"
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False, default=str))
+                f.write("\n")
+
+
+class CsvSink(Sink):
+    suffix = ".csv"
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=self.columns, extrasaction="ignore")
+            if new_file:
+                w.writeheader()
+            w.writerows({k: _flat(r.get(k)) for k in self.columns} for r in rows)
+
+
+class ParquetSink(Sink):
+    """
+    Dataset Parquet en el directorio <base>.parquet/: cada flush() escribe una parte completa
+    (part-NNNNN.parquet, vía tmp + rename), así lo ya volcado sobrevive a un crash o Ctrl-C.
+    pd.read_parquet / pyarrow leen el directorio entero. Al reanudar (append) se añaden partes.
+    """
+
+    suffix = ".parquet"
+
+    def __init__(self, base_path: Path, columns: Sequence[str], append: bool = False, chunk_rows: int = 1000) -> None:
+        if pa is None:
+            raise RuntimeError("El formato parquet requiere 'pyarrow' (pip install pyarrow)")
+        super().__init__(base_path, columns, append=append, chunk_rows=chunk_rows)
+        if self.path.is_file():
+            # Salida de versiones anteriores (un único fichero): pasa a ser la primera parte
+            tmp = self.path.with_name(f"{self.path.name}.old")
+            os.replace(self.path, tmp)
+            self.path.mkdir()
+            os.replace(tmp, self.path / "part-00000.parquet")
+        self.path.mkdir(exist_ok=True)
+        self._parts = len(list(self.path.glob("part-*.parquet")))
+        fields = []
+        for c in self.columns:
+            typ = pa.float64() if c in _PARQUET_FLOATS else pa.int64() if c in _PARQUET_INTS else pa.bool_() if c in _PARQUET_BOOLS else pa.string()
+            fields.append(pa.field(c, typ))
+        self.schema = pa.schema(fields)
+
+    def _discard(self) -> None:
+        if self.path.is_dir():
+            shutil.rmtree(self.path)
+        else:
+            self.path.unlink()
+
+    def _cell(self, col: str, v: Any) -> Any:
+        v = _flat(v)
+        if v is None:
+            return None
+        try:
+            if col in _PARQUET_FLOATS:
+                return float(v)
+            if col in _PARQUET_INTS:
+                return int(v)
+            if col in _PARQUET_BOOLS:
+                return bool(v)
+        except (TypeError, ValueError):
+            return None
+        return str(v)
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        data = {c: [self._cell(c, r.get(c)) for r in rows] for c in self.columns}
+        table = pa.Table.from_pydict(data, schema=self.schema)
+        name = f"part-{self._parts:05d}.parquet"
+        # Con punto delante pyarrow no la lee: una parte a medio escribir nunca forma parte del dataset
+        tmp = self.path / f".{name}.tmp"
+        pq.write_table(table, str(tmp))
+        os.replace(tmp, self.path / name)
+        self._parts += 1
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+def make_sink(fmt: str, base_path: Path, columns: Sequence[str], append: bool = False, chunk_rows: int = 1000) -> Sink:
+    try:
+        cls = SINKS[fmt]
+    except KeyError as e:
+        raise ValueError(f"Formato de salida no soportado: {fmt} (usa {', '.join(SINKS)})") from e
+    return cls(base_path, columns, append=append, chunk_rows=chunk_rows)
@@ -0,0 +1,113 @@
+# crewai_html_extractor/scraper/structured.py
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from .document import ParsedPage
+
+# Backends opcionales: se resuelven UNA vez al importar (no en cada página)
+try:
+    import orjson  # decodificador JSON rápido
+except Exception:
+    orjson = None
+
+try:
+    import json5  # JSON "laxo" (comas finales, comillas simples...) como último recurso
+except Exception:
+    json5 = None
+
+try:
+    import extruct  # microdatos / OpenGraph
+except Exception:
+    extruct = None
+
+try:
+    from w3lib.html import get_base_url
+except Exception:
+    get_base_url = None
+
+LOG = logging.getLogger("crewai.structured")
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+HAS_EXTRUCT = extruct is not None
+
+
+def loads_jsonld(s: str) -> Optional[Any]:
+    """
+    Decodifica el contenido de un <script type="application/ld+json">:
+    orjson (si está) -> json (NaN/Infinity, que orjson rechaza) -> json5 (si está) -> None.
+    """
+    s = (s or "").strip()
+    if not s:
+        return None
+    # Algunos CMS envuelven el JSON en comentarios/CDATA
+    if s.startswith(("<!--", "<![CDATA[")):
+        s = s.removeprefix("<!--").removeprefix("<![CDATA[").removesuffix("-->").removesuffix("]]>").strip()
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except Exception:
+            pass
+    try:
+        return json.loads(s)
+    except Exception:
+        pass
+    if json5 is not None:
+        try:
+            return json5.loads(s)
+        except Exception:
+            pass
+    return None
+
+
+def iter_jsonld_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Aplana listas y @graph (a cualquier profundidad, sin recursión) y devuelve los nodos dict
+    en orden de documento. Un nodo con @graph se sustituye por los nodos del grafo.
+    """
+    stack: List[Any] = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            graph = node.get("@graph")
+            if isinstance(graph, list):
+                stack.extend(reversed(graph))
+            elif isinstance(graph, dict):
+                stack.append(graph)
+            else:
+                yield node
+
+
+def page_jsonld_nodes(page: ParsedPage) -> List[Dict[str, Any]]:
+    """Todos los nodos JSON-LD de la página (decodificados y aplanados una vez por página)."""
+    def build() -> List[Dict[str, Any]]:
+        nodes: List[Dict[str, Any]] = []
+        for s in page.jsonld_scripts:
+            data = loads_jsonld(s.string or "")
+            if data:
+                nodes.extend(iter_jsonld_nodes(data))
+        return nodes
+    return page.memo("structured.jsonld", build)
+
+
+def page_microdata(page: ParsedPage) -> Dict[str, List[Any]]:
+    """
+    Microdatos y OpenGraph con extruct (si está instalado), una vez por página.
+    -> {"microdata": [...], "opengraph": [...]}; vacío sin extruct o si el HTML no se deja parsear.
+    """
+    def build() -> Dict[str, List[Any]]:
+        if extruct is None:
+            return {"microdata": [], "opengraph": []}
+        base = get_base_url(page.html, page.url) if get_base_url is not None else page.url
+        try:
+            ex = extruct.extract(page.html, base_url=base, syntaxes=["microdata", "opengraph"])
+        except Exception as e:
+            LOG.debug(f"[structured] extruct falló en {page.url}: {e}")
+            return {"microdata": [], "opengraph": []}
+        return {"microdata": ex.get("microdata") or [], "opengraph": ex.get("opengraph") or []}
+    return page.memo("structured.microdata", build)
+
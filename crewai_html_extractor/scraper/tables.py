@@ -0,0 +1,141 @@
+# crewai_html_extractor/scraper/tables.py
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_WS_RX = re.compile(r"\s+")
+
+# Filas directas de la tabla (no las de tablas anidadas)
+_ROWS_XPATH = "./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr"
+
+
+def _cell_text(el) -> str:
+    return _WS_RX.sub(" ", el.text_content()).strip()
+
+
+def _span(el, attr: str) -> int:
+    try:
+        return max(1, min(int(el.get(attr) or 1), 1000))
+    except ValueError:
+        return 1
+
+
+def _fill_pending(pending: Dict[int, List[Any]], out: List[Optional[str]], col: int) -> int:
+    """Copia a 'out' los rowspan abiertos desde la columna col; -> siguiente columna libre."""
+    while col in pending:
+        left, text = pending[col]
+        out.append(text)
+        if left <= 1:
+            del pending[col]
+        else:
+            pending[col][0] = left - 1
+        col += 1
+    return col
+
+
+def _grid_rows(rows: List[Any]) -> Iterator[Tuple[List[Optional[str]], bool, bool]]:
+    """
+    Expande rowspan/colspan a una rejilla rectangular en una pasada.
+    -> (celdas, es_cabecera_thead, todo_th) por fila; las celdas cubiertas por un span repiten el texto.
+    """
+    # columna -> [filas restantes, texto] de los rowspan que siguen abiertos
+    pending: Dict[int, List[Any]] = {}
+    for tr in rows:
+        cells = [c for c in tr if isinstance(c.tag, str) and c.tag in ("td", "th")]
+        if not cells and not pending:
+            continue
+        out: List[Optional[str]] = []
+        col = 0
+        for c in cells:
+            col = _fill_pending(pending, out, col)
+            text = _cell_text(c)
+            rowspan, colspan = _span(c, "rowspan"), _span(c, "colspan")
+            for _ in range(colspan):
+                out.append(text)
+                if rowspan > 1:
+                    pending[col] = [rowspan - 1, text]
+                col += 1
+        col = _fill_pending(pending, out, col)
+        # rowspan que queden más a la derecha (filas cortas)
+        for k in sorted(pending):
+            if k >= col:
+                out.extend([None] * (k - col))
+                col = _fill_pending(pending, out, k)
+        in_thead = tr.getparent() is not None and tr.getparent().tag == "thead"
+        all_th = bool(cells) and all(c.tag == "th" for c in cells)
+        yield out, in_thead, all_th
+
+
+def _join_header(parts: List[Optional[str]], sep: str) -> str:
+    # colspan/rowspan repiten el texto en varios niveles: se colapsan los repetidos consecutivos
+    out: List[str] = []
+    for p in parts:
+        if p and (not out or out[-1] != p):
+            out.append(p)
+    return sep.join(out)
+
+
+def parse_table(tbl, header_sep: str = " / ", n_header: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Recorre un <table> (elemento lxml) y devuelve su contenido por columnas en una sola pasada:
+
+    {"id", "caption", "header_rows": [[...]], "schema": [nombre por columna],
+     "columns": [[valores de la columna]], "n_rows"}
+
+    - Cabecera: filas de <thead>; sin thead, las primeras filas formadas solo por <th>
+      (mismo criterio que pandas.read_html). Varias filas de cabecera -> "Nivel1 / Nivel2".
+      n_header fuerza las n primeras filas como cabecera, sean th o td (read_html(header=[0..n-1])).
+    - rowspan/colspan se expanden (la celda se repite en las posiciones que cubre).
+    - Celdas vacías -> None. Sin cabecera, las columnas se llaman "0", "1", ...
+    """
+    grid = list(_grid_rows(tbl.xpath(_ROWS_XPATH)))
+    has_thead = any(in_thead for _, in_thead, _ in grid)
+    header_rows: List[List[Optional[str]]] = []
+    body: List[List[Optional[str]]] = []
+    for i, (cells, in_thead, all_th) in enumerate(grid):
+        if n_header is not None:
+            is_header = i < n_header
+        else:
+            is_header = in_thead if has_thead else (all_th and not body)
+        if is_header:
+            header_rows.append(cells)
+        else:
+            body.append(cells)
+
+    n_cols = max((len(r) for r in header_rows + body), default=0)
+    if header_rows:
+        schema = [
+            _join_header([r[j] if j < len(r) else None for r in header_rows], header_sep) or str(j)
+            for j in range(n_cols)
+        ]
+    else:
+        schema = [str(j) for j in range(n_cols)]
+
+    columns: List[List[Optional[str]]] = [[] for _ in range(n_cols)]
+    for r in body:
+        for j in range(n_cols):
+            v = r[j] if j < len(r) else None
+            columns[j].append(v if v else None)
+
+    caption_el = tbl.find("caption")
+    return {
+        "id": tbl.get("id"),
+        "caption": _cell_text(caption_el) if caption_el is not None else "",
+        "header_rows": header_rows,
+        "schema": schema,
+        "columns": columns,
+        "n_rows": len(body),
+    }
+
+
+def table_rows(table: Dict[str, Any]) -> List[List[Any]]:
+    """Columnas -> filas (formato 'data' de los items)."""
+    return [list(r) for r in zip(*table["columns"])] if table["columns"] else []
+
+
+def to_dataframe(table: Dict[str, Any]):
+    """DataFrame solo bajo demanda: pandas no interviene en la extracción."""
+    import pandas as pd
+
+    return pd.DataFrame(dict(zip(range(len(table["schema"])), table["columns"]))).set_axis(table["schema"], axis=1)
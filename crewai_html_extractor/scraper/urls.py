@@ -0,0 +1,34 @@
+# crewai_html_extractor/scraper/urls.py
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urljoin, urlparse, urldefrag
+
+
+# Los mismos href relativos se repiten en todas las páginas de un sitio (menús, pies):
+# canonicalizar es puro y se cachea por (base, href)
+@lru_cache(maxsize=65536)
+def normalize_url(base: str, href: str) -> Optional[str]:
+    if not href:
+        return None
+    href = href.strip()
+    if href.startswith("mailto:") or href.startswith("tel:") or href.startswith("javascript:"):
+        return None
+    full = urljoin(base, href)
+    # quita fragmentos
+    full, _ = urldefrag(full)
+    # solo http/https
+    parsed = urlparse(full)
+    if parsed.scheme not in ("http", "https"):
+        return None
+    return full
+
+
+@lru_cache(maxsize=65536)
+def url_host(u: str) -> str:
+    return urlparse(u).netloc
+
+
+def same_host(u: str, v: str) -> bool:
+    return url_host(u) == url_host(v)
@@ -0,0 +1,166 @@
+# crewai_html_extractor/scraper/validators.py
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+LOG = logging.getLogger("crewai.validators")
+
+# Precisión (s) de accessed_at: get() solo lo reescribe si el guardado es más viejo, así revalidar
+# no cuesta un commit por URL (sobra para un TTL de días y para el orden LRU)
+ACCESS_RESOLUTION_S = 60.0
+
+
+class ValidatorStore:
+    """
+    Validadores HTTP por URL (ETag, Last-Modified, hash del contenido) + último record
+    extraído, para revalidar con GET condicional y reutilizar el record si no hay cambios.
+
+    - get(url) -> {"etag", "last_modified", "content_hash", "updated_at"} | None
+    - save_validators(url, etag, last_modified, content_hash)
+    - save_record(url, payload, kind) / load_record(url, kind) / has_record(url, kind)
+      (kind separa consumidores: "record" del Orchestrator, "crawl" del crawler, ...)
+    - acotado como HttpCache: una URL sin usar en ttl_s se olvida (validadores y records) y, pasadas
+      max_entries URLs, se desaloja por LRU hasta el 90%; None desactiva cada límite. El último uso
+      se guarda con precisión de ACCESS_RESOLUTION_S
+    """
+
+    def __init__(
+        self,
+        path: str = ".http_validators.sqlite",
+        ttl_s: Optional[float] = 30 * 86400,
+        max_entries: Optional[int] = 200_000,
+    ) -> None:
+        self.path = str(path)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Los workers del crawl comparten el fichero: esperar el lock de escritura en vez de fallar
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS validators ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT, updated_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " url TEXT, kind TEXT, payload TEXT, updated_at REAL, PRIMARY KEY (url, kind))"
+        )
+        # Bases anteriores sin accessed_at: el último uso conocido es la última escritura
+        # (otro proceso que abra la misma base puede añadir la columna a la vez)
+        if "accessed_at" not in {r[1] for r in self._conn.execute("PRAGMA table_info(validators)")}:
+            try:
+                self._conn.execute("ALTER TABLE validators ADD COLUMN accessed_at REAL")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e):
+                    raise
+            self._conn.execute("UPDATE validators SET accessed_at = updated_at WHERE accessed_at IS NULL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS validators_accessed ON validators(accessed_at)")
+        self._conn.commit()
+        self.prune()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+
+    def _expired(self, accessed_at: Optional[float]) -> bool:
+        return self.ttl_s is not None and (accessed_at or 0) < time.time() - self.ttl_s
+
+    def _delete(self, urls: List[str]) -> None:
+        """Borra validadores y records de las URLs. Llamar con el lock tomado."""
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            self._conn.execute(f"DELETE FROM validators WHERE url IN ({marks})", chunk)
+            self._conn.execute(f"DELETE FROM records WHERE url IN ({marks})", chunk)
+        self._conn.commit()
+
+    def prune(self) -> int:
+        """Olvida las URLs sin usar en ttl_s (y los records sin validadores igual de viejos). -> nº borradas."""
+        if self.ttl_s is None:
+            return 0
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            urls = [r[0] for r in self._conn.execute("SELECT url FROM validators WHERE accessed_at < ?", (cutoff,))]
+            self._delete(urls)
+            self._conn.execute(
+                "DELETE FROM records WHERE updated_at < ? AND url NOT IN (SELECT url FROM validators)", (cutoff,))
+            self._conn.commit()
+        if urls:
+            LOG.info(f"[validators] Olvidadas {len(urls)} URLs sin uso en {self.ttl_s:.0f}s")
+        return len(urls)
+
+    def evict(self) -> int:
+        """Desaloja por LRU hasta quedar en el 90% de max_entries. -> nº de URLs borradas."""
+        if self.max_entries is None:
+            return 0
+        with self._lock:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+            n = self._count - int(self.max_entries * 0.9)
+            if n <= 0:
+                return 0
+            urls = [r[0] for r in self._conn.execute(
+                "SELECT url FROM validators ORDER BY accessed_at ASC LIMIT ?", (n,))]
+            self._delete(urls)
+            self._count -= len(urls)
+        LOG.info(f"[validators] Desalojadas {len(urls)} URLs (lru); quedan {self._count}")
+        return len(urls)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, updated_at, accessed_at FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+            if not row or self._expired(row[4]):
+                return None
+            now = time.time()
+            if now - (row[4] or 0) >= ACCESS_RESOLUTION_S:
+                self._conn.execute("UPDATE validators SET accessed_at = ? WHERE url = ?", (now, url))
+                self._conn.commit()
+        return {"etag": row[0], "last_modified": row[1], "content_hash": row[2], "updated_at": row[3]}
+
+    def save_validators(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: Optional[str]) -> None:
+        now = time.time()
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM validators WHERE url = ?", (url,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, content_hash, updated_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, now, now),
+            )
+            self._conn.commit()
+            self._count += 0 if known else 1
+            over = self.max_entries is not None and self._count > self.max_entries
+        if over:
+            self.evict()
+
+    def has_record(self, url: str, kind: str = "record") -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM records WHERE url = ? AND kind = ?", (url, kind)).fetchone()
+        return row is not None
+
+    def load_record(self, url: str, kind: str = "record") -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM records WHERE url = ? AND kind = ?", (url, kind)).fetchone()
+        if not row:
+            return None
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return None
+
+    def save_record(self, url: str, payload: Any, kind: str = "record") -> None:
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records (url, kind, payload, updated_at) VALUES (?, ?, ?, ?)",
+                (url, kind, data, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
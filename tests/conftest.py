@@ -0,0 +1,70 @@
+# tests/conftest.py
+from __future__ import annotations
+
+import http.server
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Respuesta de una ruta del servidor de pruebas: (status, cabeceras, cuerpo)
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+class LocalServer:
+    """
+    Servidor HTTP local para los tests de red: routes[path] = fn(handler) -> Reply.
+    hits[path] cuenta las peticiones recibidas (para comprobar qué llegó a la red).
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Callable[[http.server.BaseHTTPRequestHandler], Reply]] = {}
+        self.hits: Dict[str, int] = {}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.hits[self.path] = server.hits.get(self.path, 0) + 1
+                route = server.routes.get(self.path)
+                status, headers, body = route(self) if route else (404, {}, b"")
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def url(self, path: str) -> str:
+        return self.base + path
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch) -> None:
+    """Core() guarda su estado en ./.crewai_state: cada test en su directorio, sin cache compartida."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def server() -> Iterator[LocalServer]:
+    srv = LocalServer()
+    yield srv
+    srv.close()
+
+
+def html_page(body: str = "<p>hola</p>", **headers: str) -> Reply:
+    return 200, {"Content-Type": "text/html; charset=utf-8", **headers}, f"<html><body>{body}</body></html>".encode()
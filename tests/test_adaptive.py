@@ -0,0 +1,137 @@
+# tests/test_adaptive.py
+from __future__ import annotations
+
+from urllib.parse import urlparse
+
+import pytest
+
+from conftest import html_page
+from crewai_html_extractor.scraper.adaptive import _COOLDOWN, AdaptiveThrottle
+from crewai_html_extractor.scraper.core import Core
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+
+HOST = "turismo.example.es"
+
+
+def _throttle(path=None, **kwargs):
+    opts = dict(start_interval_s=1.0, start_concurrency=2, min_interval_s=1.0, max_interval_s=60.0, max_concurrency=4)
+    opts.update(kwargs)
+    return AdaptiveThrottle(path, **opts)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_slowdown_status_doubles_interval_and_halves_concurrency(status):
+    t = _throttle()
+    t.observe(HOST, status, 0.1)
+    assert t.interval(HOST) == 2.0
+    assert t.concurrency(HOST) == 1
+
+
+def test_cooldown_ignores_responses_already_in_flight():
+    t = _throttle()
+    t.observe(HOST, 429, 0.1)
+    t.observe(HOST, 503, 0.1)  # pedida antes del frenazo: no vuelve a frenar
+    assert t.interval(HOST) == 2.0
+    for _ in range(_COOLDOWN):
+        t.observe(HOST, 200, 0.1)
+    before = t.interval(HOST)
+    t.observe(HOST, 503, 0.1)  # pasado el cooldown, vuelve a frenar
+    assert t.interval(HOST) == pytest.approx(2 * before)
+
+
+def test_backoff_capped_at_max_interval():
+    t = _throttle(max_interval_s=5.0)
+    for _ in range(5):
+        t.observe(HOST, 429, 0.1)
+        for _ in range(_COOLDOWN):
+            t.observe(HOST, 200, 0.1)
+    assert t.interval(HOST) <= 5.0
+
+
+def test_healthy_responses_speed_up_but_never_below_floor():
+    t = _throttle(start_interval_s=4.0, min_interval_s=2.0, increase_rps=0.5)
+    for _ in range(20):  # +1 de concurrencia cada 10 x concurrencia respuestas sanas
+        t.observe(HOST, 200, 0.1)
+    assert t.concurrency(HOST) == 3
+    for _ in range(100):
+        t.observe(HOST, 200, 0.1)
+    assert t.interval(HOST) == 2.0
+    assert t.concurrency(HOST) == 4  # max_concurrency
+
+
+def test_core_speeds_healthy_host_up_below_min_delay():
+    policy = SchedulingPolicy(min_delay_s=3.0, max_delay_s=3.0, adaptive_min_delay_s=1.0, respect_robots=False)
+    core = Core(policy=policy)
+    start = core.adaptive.interval(HOST)
+    assert start == 3.0
+    for _ in range(50):
+        core.adaptive.observe(HOST, 200, 0.1)
+    assert core.adaptive.interval(HOST) < start
+    assert core.adaptive.interval(HOST) == 1.0  # adaptive_min_delay_s
+    # el rate limiter espacia el host con lo aprendido, no con min_delay_s
+    core._throttle_delay(f"https://{HOST}/")
+    assert core.limiter.interval_for(HOST) == 1.0
+    core.close()
+
+
+def test_explicit_min_delay_is_a_hard_floor():
+    core = Core(policy=SchedulingPolicy(min_delay_s=3.0, max_delay_s=3.0, respect_robots=False), state_dir=None)
+    for _ in range(50):
+        core.adaptive.observe(HOST, 200, 0.1)
+    assert core.adaptive.interval(HOST) == 3.0
+    core.close()
+    # también como kwarg de Core sobre una política por defecto
+    core = Core(policy=SchedulingPolicy(respect_robots=False), min_delay_s=2.0, state_dir=None)
+    assert core.policy.adaptive_floor_s == 2.0
+    core.close()
+
+
+def test_default_min_delay_adapts_down_to_adaptive_min_delay():
+    policy = SchedulingPolicy(respect_robots=False)
+    assert policy.adaptive_floor_s == policy.adaptive_min_delay_s == 1.0
+    core = Core(policy=policy, state_dir=None)
+    for _ in range(50):
+        core.adaptive.observe(HOST, 200, 0.1)
+    assert core.adaptive.interval(HOST) == 1.0
+    core.close()
+
+
+def test_core_passes_min_backoff_to_throttle():
+    policy = SchedulingPolicy(min_delay_s=0, max_delay_s=0, adaptive_min_backoff_s=5.0, respect_robots=False)
+    core = Core(policy=policy, state_dir=None)
+    assert core.adaptive.min_backoff_s == 5.0
+    core.adaptive.observe(HOST, 429, 0.1)
+    assert core.adaptive.interval(HOST) == 5.0
+    core.close()
+
+
+def test_other_4xx_are_neutral():
+    t = _throttle(start_interval_s=4.0, min_interval_s=1.0)
+    for _ in range(20):
+        t.observe(HOST, 404, 0.1)
+    assert t.interval(HOST) == 4.0
+    assert t.concurrency(HOST) == 2
+
+
+def test_learned_pace_persists(tmp_path):
+    path = str(tmp_path / "throttle.sqlite")
+    t = _throttle(path)
+    t.observe(HOST, 429, 0.1)
+    t.close()
+    assert _throttle(path).interval(HOST) == 2.0
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_core_backs_off_host_on_slowdown_status(server, status):
+    server.routes["/p"] = lambda h: (status, {"Retry-After": "0"}, b"")
+    server.routes["/ok"] = lambda h: html_page()
+    policy = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=0, respect_robots=False)
+    core = Core(policy=policy)
+    host = urlparse(server.base).netloc
+    core.fetch_page(server.url("/ok"))
+    assert core.adaptive.interval(host) == 0.0
+    with pytest.raises(RuntimeError):
+        core.fetch_page(server.url("/p"))
+    # sin retraso configurado, el host pasa a esperar al menos min_backoff_s entre peticiones
+    assert core.adaptive.interval(host) == core.adaptive.min_backoff_s
+    core.close()
@@ -0,0 +1,92 @@
+# tests/test_archive.py
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from crewai_html_extractor.scraper import archive as archive_mod
+from crewai_html_extractor.scraper.archive import PageArchive
+from crewai_html_extractor.scraper.core import Core, ReplayCore
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+
+POLICY = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=0, respect_robots=False, adaptive=False)
+
+
+def test_replay_serves_recorded_pages_without_network(server, tmp_path):
+    server.routes["/old"] = lambda h: (301, {"Location": "/new"}, b"")
+    server.routes["/new"] = lambda h: (200, {"Content-Type": "text/html; charset=iso-8859-1"},
+                                       "<html><body><p>Peñíscola</p></body></html>".encode("latin-1"))
+    path = str(tmp_path / "pages.warc.gz")
+    core = Core(policy=POLICY, archive_path=path)
+    live = core.fetch_page(server.url("/old"))
+    core.close()
+    hits = dict(server.hits)
+
+    replay = ReplayCore(path)
+    # la URL pedida y la final (tras la redirección) sirven el mismo registro
+    for url in (server.url("/old"), server.url("/new")):
+        res = replay.fetch_page(url)
+        assert res["url"] == live["url"] == server.url("/new")
+        assert res["html"] == live["html"] and "Peñíscola" in res["html"]
+    assert server.hits == hits
+    with pytest.raises(RuntimeError, match="no está en el archivo"):
+        replay.fetch_page(server.url("/otra"))
+    replay.close()
+
+
+def test_non_200_responses_are_not_archived(server, tmp_path):
+    server.routes["/p"] = lambda h: (500, {}, b"")
+    path = str(tmp_path / "pages.warc.gz")
+    core = Core(policy=POLICY, archive_path=path)
+    with pytest.raises(RuntimeError):
+        core.fetch_page(server.url("/p"))
+    assert server.url("/p") not in core.archive
+    core.close()
+
+
+def test_latest_version_wins_and_index_rebuilds(tmp_path):
+    path = str(tmp_path / "pages.warc.gz")
+    arch = PageArchive(path)
+    arch.append("https://a.es/", "https://a.es/", 200, {"Content-Type": "text/html"}, b"v1")
+    arch.append("https://a.es/b", "https://a.es/b", 200, {}, b"otra")
+    arch.append("https://a.es/", "https://a.es/", 200, {"Content-Type": "text/html"}, b"v2")
+    assert arch.get("https://a.es/")["body"] == b"v2"
+    arch.close()
+
+    # sin índice y con una cola a medio escribir (proceso interrumpido)
+    os.remove(f"{path}.idx")
+    with open(path, "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00basura")
+    arch = PageArchive(path)
+    assert os.path.exists(f"{path}.idx")
+    assert len(arch) == 2
+    assert arch.get("https://a.es/")["body"] == b"v2"
+    assert arch.get("https://a.es/b")["headers"] == {"Content-Length": "4"}
+    assert arch.rebuild_index() == 3
+    arch.close()
+
+
+def test_rebuild_streams_records_across_read_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_mod, "_READ_CHUNK", 64)  # registros más grandes que un trozo
+    path = str(tmp_path / "pages.warc.gz")
+    arch = PageArchive(path)
+    bodies = {f"https://a.es/{i}": os.urandom(300 + i) for i in range(5)}
+    for url, body in bodies.items():
+        arch.append(url, url, 200, {}, body)
+    arch.close()
+    os.remove(f"{path}.idx")
+    arch = PageArchive(path)
+    assert {u: arch.get(u)["body"] for u in arch.urls()} == bodies
+    arch.close()
+
+
+def test_core_close_closes_the_archive(server, tmp_path):
+    server.routes["/p"] = lambda h: (200, {"Content-Type": "text/html"}, b"<p>Hotel Sol</p>")
+    core = Core(policy=POLICY, archive_path=str(tmp_path / "pages.warc.gz"))
+    core.fetch_page(server.url("/p"))
+    fd = core.archive._fd
+    core.close()
+    with pytest.raises(OSError):
+        os.fstat(fd)
+    core.close()  # idempotente
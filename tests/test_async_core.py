@@ -0,0 +1,69 @@
+# tests/test_async_core.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from conftest import html_page
+from crewai_html_extractor.scraper.core import AsyncCore
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+
+POLICY = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=0, respect_robots=False, adaptive=False)
+
+
+def _slow_site(server, delay_s=0.2):
+    """/p<i> tarda delay_s; server.peak[host] = máximo de peticiones simultáneas vistas por Host."""
+    lock = threading.Lock()
+    inflight, server.peak = {}, {}
+
+    def page(h):
+        host = h.headers.get("Host")
+        with lock:
+            inflight[host] = inflight.get(host, 0) + 1
+            server.peak[host] = max(server.peak.get(host, 0), inflight[host])
+        time.sleep(delay_s)
+        with lock:
+            inflight[host] -= 1
+        return html_page(f"<p>{h.path}</p>")
+
+    for i in range(4):
+        server.routes[f"/p{i}"] = page
+    return server
+
+
+def test_fetch_many_returns_results_and_exceptions_in_order(server):
+    server.routes["/ok"] = lambda h: html_page("<p>Hotel Sol</p>")
+    server.routes["/old"] = lambda h: (301, {"Location": "/ok"}, b"")
+    core = AsyncCore(policy=POLICY)
+    urls = [server.url("/ok"), server.url("/falta"), server.url("/old")]
+    results = asyncio.run(core.fetch_many(urls))
+    core.close()
+    assert [u for u, _ in results] == urls
+    final_url, html = results[0][1]
+    assert final_url == server.url("/ok") and "Hotel Sol" in html
+    assert isinstance(results[1][1], RuntimeError)
+    assert results[2][1][0] == server.url("/ok")
+
+
+def test_fetch_many_caps_in_flight_requests_per_host(server):
+    _slow_site(server)
+    other = server.base.replace("127.0.0.1", "localhost")  # mismo servidor, otro host
+    urls = [server.url(f"/p{i}") for i in range(4)] + [f"{other}/p{i}" for i in range(4)]
+    core = AsyncCore(policy=POLICY, max_concurrency=8, per_host_concurrency=2)
+    t0 = time.monotonic()
+    results = asyncio.run(core.fetch_many(urls))
+    elapsed = time.monotonic() - t0
+    core.close()
+    assert all(not isinstance(r, Exception) for _, r in results)
+    assert set(server.peak.values()) == {2}
+    # 4 por host de 2 en 2 y los dos hosts a la vez: ~2 tandas, no 8 peticiones seguidas
+    assert elapsed < 4 * 0.2 + 0.5
+
+
+def test_fetch_many_caps_global_concurrency(server):
+    _slow_site(server)
+    core = AsyncCore(policy=POLICY, max_concurrency=1, per_host_concurrency=4)
+    asyncio.run(core.fetch_many([server.url(f"/p{i}") for i in range(4)]))
+    core.close()
+    assert list(server.peak.values()) == [1]
@@ -0,0 +1,147 @@
+# tests/test_crawl.py
+from __future__ import annotations
+
+import csv
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+from conftest import html_page
+from crewai_html_extractor.crawl_cli import _shard_of
+
+ROOT = Path(__file__).resolve().parent.parent
+N_HOTELS = 6
+
+# El crawl corre en un proceso aparte (como desde la línea de comandos). Ganchos por entorno:
+# - CRAWL_CRASH_ON_FLUSH: muere sin limpieza (kill -9, OOM) justo antes del primer volcado de los sinks
+# - CRAWL_TRACE=fichero: cada página apunta "pid url" (qué proceso la pidió)
+# - CRAWL_KILL_ONCE=sufijo: el worker que reciba esa URL muere, solo la primera vez
+RUNNER = """
+import os, sys
+from crewai_html_extractor import crawl_cli
+from crewai_html_extractor.scraper import sinks
+if os.environ.get("CRAWL_CRASH_ON_FLUSH"):
+    sinks.Sink.flush = lambda self: os._exit(1)
+_crawl_page = crawl_cli.crawl_page
+def crawl_page(core, url, *args, **kwargs):
+    kill, trace = os.environ.get("CRAWL_KILL_ONCE"), os.environ.get("CRAWL_TRACE")
+    if kill and url.endswith(kill) and not os.path.exists(trace + ".killed"):
+        open(trace + ".killed", "w").close()
+        os._exit(3)
+    if trace:
+        with open(trace, "a") as f:
+            f.write(f"{os.getpid()} {url}\\n")
+    return _crawl_page(core, url, *args, **kwargs)
+crawl_cli.crawl_page = crawl_page
+sys.argv = ["crawl"] + sys.argv[1:]
+crawl_cli.main()
+"""
+
+
+@pytest.fixture
+def hotels(server):
+    links = "".join(f'<a href="/hotel-{i}">Hotel {i}</a>' for i in range(N_HOTELS))
+    server.routes["/"] = lambda h: html_page(f"<h1>Hoteles</h1>{links}")
+    for i in range(N_HOTELS):
+        ld = json.dumps({"@type": "Hotel", "name": f"Hotel {i}", "telephone": f"+34 964 00{i} 000"})
+        server.routes[f"/hotel-{i}"] = lambda h, ld=ld: html_page(
+            f'<script type="application/ld+json">{ld}</script><h1>Hotel</h1>')
+    return server
+
+
+def _crawl(server, outdir: Path, *args: str, crash: bool = False, seeds=None, **hooks: str) -> subprocess.CompletedProcess:
+    policy = outdir.parent / "policy.json"
+    policy.write_text(json.dumps({"min_delay_s": 0, "max_delay_s": 0, "respect_robots": False, "adaptive": False}))
+    env = {**os.environ, "PYTHONPATH": str(ROOT), **{f"CRAWL_{k.upper()}": v for k, v in hooks.items()}}
+    if crash:
+        env["CRAWL_CRASH_ON_FLUSH"] = "1"
+    seed_args = [a for seed in (seeds or [server.url("/")]) for a in ("--seed", seed)]
+    return subprocess.run(
+        [sys.executable, "-c", RUNNER, *seed_args, "--outdir", str(outdir), "--policy", str(policy),
+         "--state-dir", "", "--log-level", "WARNING", *args],
+        env=env, capture_output=True, text=True, timeout=120,
+    )
+
+
+def _entity_names(outdir: Path):
+    with open(outdir / "entities.csv", encoding="utf-8", newline="") as f:
+        return sorted(r["name"] for r in csv.DictReader(f))
+
+
+def test_resume_after_crash_before_sink_flush_keeps_entities(hotels, tmp_path):
+    out = tmp_path / "out"
+    crashed = _crawl(hotels, out, "--flush-every", "3", "--commit-every", "1", crash=True)
+    assert crashed.returncode == 1
+    # lo ya commiteado no puede dar por hechas páginas cuyas entidades no llegaron al sink
+    done = _crawl(hotels, out, "--resume")
+    assert done.returncode == 0, done.stderr
+    assert _entity_names(out) == [f"Hotel {i}" for i in range(N_HOTELS)]
+
+
+@pytest.fixture
+def two_hosts(server):
+    """Mismo servidor con dos nombres (127.0.0.1 y localhost): hoteles distintos según el Host pedido."""
+    links = "".join(f'<a href="/hotel-{i}">Hotel {i}</a>' for i in range(N_HOTELS))
+    server.routes["/"] = lambda h: html_page(f"<h1>Hoteles</h1>{links}")
+
+    def hotel(h):
+        host = h.headers["Host"].split(":")[0]
+        ld = json.dumps({"@type": "Hotel", "name": f"{h.path} {host}", "telephone": "+34 964 000 000"})
+        return html_page(f'<script type="application/ld+json">{ld}</script><h1>Hotel</h1>')
+
+    for i in range(N_HOTELS):
+        server.routes[f"/hotel-{i}"] = hotel
+    server.seeds = [server.url("/"), server.url("/").replace("127.0.0.1", "localhost")]
+    return server
+
+
+def _trace(path: Path):
+    return [line.split() for line in path.read_text().splitlines()]
+
+
+def test_sharded_crawl_matches_single_process(two_hosts, tmp_path):
+    single = _crawl(two_hosts, tmp_path / "single", seeds=two_hosts.seeds)
+    assert single.returncode == 0, single.stderr
+    trace = tmp_path / "trace.txt"
+    sharded = _crawl(two_hosts, tmp_path / "sharded", "--workers", "2", seeds=two_hosts.seeds, trace=str(trace))
+    assert sharded.returncode == 0, sharded.stderr
+
+    fetched = _trace(trace)
+    urls = [url for _, url in fetched]
+    assert len(urls) == len(set(urls)) == 2 * (N_HOTELS + 1)  # cada página una sola vez
+    # cada host en un único worker: el de crawl_cli._shard_of
+    pid_of = {}
+    for pid, url in fetched:
+        pid_of.setdefault(urlparse(url).netloc, set()).add(pid)
+    assert all(len(pids) == 1 for pids in pid_of.values())
+    hosts = sorted(pid_of)
+    same_shard = _shard_of(f"http://{hosts[0]}/", 2) == _shard_of(f"http://{hosts[1]}/", 2)
+    assert (pid_of[hosts[0]] == pid_of[hosts[1]]) is same_shard
+
+    names = _entity_names(tmp_path / "sharded")
+    assert names == _entity_names(tmp_path / "single")
+    assert len(names) == 2 * N_HOTELS
+    with open(tmp_path / "sharded" / "pages.csv", encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 2 * (N_HOTELS + 1)
+
+
+def test_dead_worker_is_restarted_and_its_url_retried_on_resume(two_hosts, tmp_path):
+    out, trace = tmp_path / "out", tmp_path / "trace.txt"
+    run = _crawl(two_hosts, out, "--workers", "2", seeds=two_hosts.seeds, trace=str(trace), kill_once="/hotel-0")
+    assert run.returncode == 0, run.stderr
+    assert "terminó inesperadamente" in run.stderr
+    # solo se pierde lo que el worker muerto tenía en vuelo (la URL que lo mató y, como mucho, otra
+    # del prefetch); el relanzado sigue con el resto de su host
+    expected = {f"/hotel-{i} {host}" for i in range(N_HOTELS) for host in ("127.0.0.1", "localhost")}
+    missing = expected - set(_entity_names(out))
+    assert 1 <= len(missing) <= 2
+    assert any(name.startswith("/hotel-0 ") for name in missing)
+    assert len({name.split()[1] for name in missing}) == 1
+    resumed = _crawl(two_hosts, out, "--workers", "2", "--resume", seeds=two_hosts.seeds, trace=str(trace))
+    assert resumed.returncode == 0, resumed.stderr
+    assert set(_entity_names(out)) == expected
@@ -0,0 +1,57 @@
+# tests/test_document.py
+from __future__ import annotations
+
+from crewai_html_extractor.scraper.document import ParsedPage, as_page
+from crewai_html_extractor.scraper.metrics import StageTimer
+
+HTML = """<html><head><title>Hoteles</title><base href="/es/"></head>
+<body><main><table><tr><td>1</td></tr></table><a href="hotel-sol">Sol</a></main></body></html>"""
+URL = "https://turismo.example.es/listado"
+
+
+def test_trees_are_built_lazily_on_first_access():
+    page = ParsedPage(HTML, URL)
+    assert "soup" not in page.__dict__ and "lxml_root" not in page.__dict__
+    assert page.base_url == "https://turismo.example.es/es/"
+    assert len(page.lxml_tables) == 1
+    # lo de lxml no construye el árbol BeautifulSoup
+    assert "lxml_root" in page.__dict__ and "soup" not in page.__dict__
+    assert page.title == "Hoteles"
+    assert "soup" in page.__dict__
+
+
+def test_each_tree_is_parsed_once_and_timed_as_parse():
+    timer = StageTimer()
+    page = ParsedPage(HTML, URL, timer=timer)
+    assert "parse" not in timer.timing
+    soup = page.soup
+    assert page.soup is soup and page.main is page.soup.find("main")
+    wall = timer.timing["parse"]["wall_s"]
+    assert page.tables and page.text
+    assert timer.timing["parse"]["wall_s"] == wall  # vistas sobre el árbol ya hecho: sin re-parse
+    root = page.lxml_root
+    assert page.lxml_root is root
+    assert timer.timing["parse"]["wall_s"] >= wall
+
+
+def test_given_soup_is_reused():
+    page = ParsedPage(HTML, URL)
+    other = ParsedPage("<html><title>Otro</title></html>", URL, soup=page.soup)
+    assert other.soup is page.soup and other.title == "Hoteles"
+    assert as_page(other, URL) is other
+
+
+def test_memo_computes_once_per_key():
+    page = ParsedPage(HTML, URL)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    first = page.memo("facts", factory)
+    assert page.memo("facts", factory) is first
+    assert calls == [1]
+    assert page.memo("otra", factory) == {"n": 2}
+    # por página: otro ParsedPage no comparte el memo
+    assert ParsedPage(HTML, URL).memo("facts", factory) == {"n": 3}
@@ -0,0 +1,38 @@
+# tests/test_encoding.py
+from __future__ import annotations
+
+import codecs
+
+from crewai_html_extractor.scraper.encoding import SNIFF_BYTES, decode_html
+
+TEXT = "<p>Peñíscola – Castelló</p>"
+
+
+def test_bom_beats_header_and_meta():
+    raw = codecs.BOM_UTF8 + f'<meta charset="iso-8859-1">{TEXT}'.encode("utf-8")
+    assert decode_html(raw, "text/html; charset=windows-1252").endswith(TEXT)
+
+
+def test_header_charset_beats_meta():
+    raw = f'<meta charset="utf-8">{TEXT}'.encode("cp1252")
+    assert decode_html(raw, "text/html; charset=windows-1252").endswith(TEXT)
+
+
+def test_meta_charset_when_header_has_none():
+    raw = f'<meta http-equiv="Content-Type" content="text/html; charset=cp1252">{TEXT}'.encode("cp1252")
+    assert decode_html(raw, "text/html").endswith(TEXT)
+
+
+def test_latin1_is_read_as_windows_1252():
+    # "–" (0x96) no existe en latin-1 pero sí en windows-1252, como hacen los navegadores
+    assert decode_html(TEXT.encode("cp1252"), "text/html; charset=ISO-8859-1") == TEXT
+
+
+def test_meta_only_sniffed_in_first_kb():
+    raw = b" " * SNIFF_BYTES + f'<meta charset="cp1252">{TEXT}'.encode("utf-8")
+    assert decode_html(raw).endswith(TEXT)  # meta fuera del prescan: UTF-8 estricto
+
+
+def test_undeclared_non_utf8_does_not_fail():
+    text = decode_html(("<p>" + "Peñíscola, Castelló de la Plana. " * 20 + "</p>").encode("cp1252"))
+    assert text.startswith("<p>Pe") and len(text) > 600
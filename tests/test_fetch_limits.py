@@ -0,0 +1,49 @@
+# tests/test_fetch_limits.py
+from __future__ import annotations
+
+import pytest
+
+from conftest import html_page
+from crewai_html_extractor.scraper.core import Core, ResponseRejected
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+
+POLICY = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=2, respect_robots=False, adaptive=False)
+
+
+def test_oversized_page_is_truncated_and_not_stored(server, tmp_path):
+    server.routes["/big"] = lambda h: html_page("<p>" + "x" * 5000 + "</p>")
+    core = Core(policy=POLICY, max_bytes=1000, cache_name=str(tmp_path / "cache"),
+                archive_path=str(tmp_path / "pages.warc.gz"))
+    res = core.fetch_page(server.url("/big"))
+    assert res["stats"]["truncated"] is True
+    assert res["stats"]["bytes"] == 1000
+    assert server.url("/big") not in core.archive
+    # ni en la cache HTTP: la segunda vez vuelve a la red
+    assert core.fetch_page(server.url("/big"))["stats"]["from_cache"] is False
+    assert server.hits["/big"] == 2
+    core.close()
+
+
+def test_page_within_limit_is_not_truncated(server):
+    server.routes["/p"] = lambda h: html_page("<p>Hotel Sol</p>")
+    core = Core(policy=POLICY, max_bytes=1000)
+    res = core.fetch_page(server.url("/p"))
+    assert res["stats"]["truncated"] is False and "Hotel Sol" in res["html"]
+    core.close()
+
+
+@pytest.mark.parametrize("ctype", ["application/pdf", "image/jpeg; charset=binary"])
+def test_non_html_is_rejected_without_retries(server, ctype):
+    server.routes["/doc"] = lambda h: (200, {"Content-Type": ctype}, b"%PDF-1.4" * 100)
+    core = Core(policy=POLICY)
+    with pytest.raises(ResponseRejected, match="no es HTML"):
+        core.fetch_page(server.url("/doc"))
+    assert server.hits["/doc"] == 1
+    core.close()
+
+
+def test_html_types_are_configurable(server):
+    server.routes["/feed"] = lambda h: (200, {"Content-Type": "application/xml"}, b"<rss></rss>")
+    core = Core(policy=POLICY, html_types=("text/html", "application/xml"))
+    assert core.fetch_page(server.url("/feed"))["html"] == "<rss></rss>"
+    core.close()
@@ -0,0 +1,111 @@
+# tests/test_frontier.py
+from __future__ import annotations
+
+from crewai_html_extractor.scraper.frontier import PriorityFrontier, SqliteFrontier
+
+
+def test_push_dedupes_urls():
+    f = PriorityFrontier()
+    assert f.push("https://a.es/1")
+    assert not f.push("https://a.es/1")
+    assert "https://a.es/1" in f
+    assert f.pop() == ("https://a.es/1", 0)
+    assert f.pop() is None
+    # ya visto aunque haya salido de la cola
+    assert not f.push("https://a.es/1")
+
+
+def test_pop_order_by_keyword_score_then_fifo():
+    f = PriorityFrontier()
+    f.push("https://a.es/plain", keyword_score=1)
+    f.push("https://b.es/hotel", keyword_score=3)
+    f.push("https://c.es/plain", keyword_score=1)
+    assert [f.pop()[0] for _ in range(3)] == ["https://b.es/hotel", "https://a.es/plain", "https://c.es/plain"]
+
+
+def test_resume_requeues_in_progress_and_keeps_seen(tmp_path):
+    path = tmp_path / "state.sqlite"
+    store = SqliteFrontier(str(path))
+    f = PriorityFrontier(store)
+    for i in range(3):
+        f.push(f"https://a.es/{i}", depth=1)
+    done, _ = f.pop()
+    store.mark_done(done)
+    interrupted, _ = f.pop()  # en vuelo cuando se corta el run
+    store.close()
+
+    store = SqliteFrontier(str(path))
+    store.resume()
+    assert store.counts() == {"done": 1, "queued": 2}
+    f = PriorityFrontier(store)
+    # el seen-set se reconstruye desde disco: nada se vuelve a encolar
+    assert not f.push(done)
+    assert not f.push(interrupted)
+    popped = {f.pop()[0], f.pop()[0]}
+    assert interrupted in popped and done not in popped
+    assert f.pop() is None
+    store.close()
+
+
+def test_resume_retries_failed_up_to_max_attempts(tmp_path):
+    store = SqliteFrontier(str(tmp_path / "state.sqlite"))
+    store.add("https://a.es/x")
+    for _ in range(2):
+        url, _ = store.pop()
+        store.mark_failed(url)
+        store.resume(max_attempts=2)
+    assert store.counts() == {"failed": 1}
+    store.close()
+
+
+def test_done_and_entity_keys_wait_for_flush(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    store = SqliteFrontier(path, batch_size=1)
+    store.add("https://a.es/1")
+    store.pop()
+    store.mark_done("https://a.es/1", items=2, entity_keys=[11, 12])
+    store.add("https://a.es/2")  # commit por lote: cola sí, el done todavía no
+    other = SqliteFrontier(path)
+    assert other.counts() == {"in_progress": 1, "queued": 1}
+    assert list(other.iter_entity_keys()) == []
+    store.flush()  # el llamador ya volcó sus sinks
+    assert other.counts() == {"done": 1, "queued": 1}
+    assert sorted(other.iter_entity_keys()) == [11, 12]
+    other.close()
+    store.close()
+
+
+def test_memory_stays_bounded_when_spilling_to_disk(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    store = SqliteFrontier(path, batch_size=500)
+    f = PriorityFrontier(store, max_in_memory=16)
+    for i in range(3000):
+        assert f.push(f"https://h{i % 30}.es/{i}", keyword_score=i % 7)
+        assert len(f) <= 16
+    # seen-set y cuentas por host viven en el store, no en memoria
+    assert not f._seen and not f._seen_old and not f._host_counts
+    assert not f.push("https://h0.es/0")
+    assert store.host_count("h0.es") == 100
+    # la penalización por host sale del disco: un host nuevo puntúa más que uno ya muy visto
+    assert f.score("https://nuevo.es/", 1, 0) > f.score("https://h0.es/x", 1, 0)
+    popped = [f.pop()[0] for _ in range(3000)]
+    assert len(set(popped)) == 3000 and f.pop() is None
+    store.close()
+
+    # estados sin tabla hosts (o recién abiertos) cuentan igual
+    store = SqliteFrontier(path)
+    store._conn.execute("DELETE FROM hosts")
+    store._backfill_hosts()
+    assert store.host_count("h29.es") == 100
+    store.close()
+
+
+def test_in_memory_seen_and_host_counts_are_capped():
+    f = PriorityFrontier(max_in_memory=16, max_seen=100, max_hosts=10)
+    for i in range(1000):
+        f.push(f"https://h{i}.es/{i}")
+    assert len(f._seen) + len(f._seen_old) <= 100
+    assert len(f._host_counts) <= 10
+    assert len(f) <= 16 and f.dropped > 0
+    # lo reciente sigue deduplicado
+    assert not f.push("https://h999.es/999")
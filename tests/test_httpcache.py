@@ -0,0 +1,119 @@
+# tests/test_httpcache.py
+from __future__ import annotations
+
+import time
+from urllib.parse import urlparse
+
+from conftest import html_page
+from crewai_html_extractor.scraper.core import Core
+from crewai_html_extractor.scraper.httpcache import ACCESS_RESOLUTION_S, CachedSession, HttpCache
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+
+ETAG = '"v1"'
+
+
+def _etag_route(handler):
+    if handler.headers.get("If-None-Match") == ETAG:
+        return 304, {"ETag": ETAG}, b""
+    return html_page(ETag=ETAG)
+
+
+def _session(tmp_path, **kwargs):
+    cache = HttpCache(str(tmp_path / "cache"), **kwargs)
+    return cache, CachedSession(cache)
+
+
+def test_fresh_entry_is_served_without_network(server, tmp_path):
+    server.routes["/p"] = _etag_route
+    cache, s = _session(tmp_path, ttl_s=60)
+    first = s.get(server.url("/p"))
+    second = s.get(server.url("/p"))
+    assert not getattr(first, "from_cache", False)
+    assert second.from_cache and second.text == first.text
+    assert server.hits["/p"] == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_expired_entry_goes_back_to_network(server, tmp_path):
+    server.routes["/p"] = _etag_route
+    cache, s = _session(tmp_path, ttl_s=0.2)
+    s.get(server.url("/p"))
+    time.sleep(0.3)
+    assert not cache.lookup(server.url("/p"))["fresh"]
+    r = s.get(server.url("/p"))
+    assert not getattr(r, "from_cache", False)
+    assert server.hits["/p"] == 2
+
+
+def test_304_refreshes_ttl_of_stored_entry(server, tmp_path):
+    server.routes["/p"] = _etag_route
+    cache, s = _session(tmp_path, ttl_s=0.2)
+    s.get(server.url("/p"))
+    time.sleep(0.3)
+    r = s.get(server.url("/p"), headers={"If-None-Match": ETAG})
+    assert r.status_code == 304
+    entry = cache.lookup(server.url("/p"))
+    assert entry["fresh"]
+    # el cuerpo guardado sigue valiendo: la siguiente lectura no toca la red
+    assert s.get(server.url("/p")).from_cache
+    assert server.hits["/p"] == 2
+
+
+def test_ttl_rules_per_host_and_zero_disables(server, tmp_path):
+    server.routes["/p"] = _etag_route
+    cache, s = _session(tmp_path, ttl_s=60, ttl_rules={"127.0.0.1:*": 0})
+    s.get(server.url("/p"))
+    s.get(server.url("/p"))
+    assert server.hits["/p"] == 2
+    assert cache.lookup(server.url("/p")) is None
+
+
+def test_stale_entry_served_on_server_error(server, tmp_path):
+    calls = {"n": 0}
+
+    def flaky(handler):
+        calls["n"] += 1
+        return html_page("v1") if calls["n"] == 1 else (503, {}, b"")
+
+    server.routes["/p"] = flaky
+    cache, s = _session(tmp_path, ttl_s=0.1)
+    s.get(server.url("/p"))
+    time.sleep(0.2)
+    r = s.get(server.url("/p"))
+    assert r.status_code == 200 and r.is_stale
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_stale_copy_still_reports_the_server_error_to_the_throttle(server, tmp_path):
+    calls = {"n": 0}
+
+    def flaky(handler):
+        calls["n"] += 1
+        return html_page("v1") if calls["n"] == 1 else (503, {}, b"")
+
+    server.routes["/p"] = flaky
+    policy = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=0, respect_robots=False)
+    core = Core(policy=policy, cache_name=str(tmp_path / "cache"), cache_expire_s=0.1)
+    host = urlparse(server.base).netloc
+    core.fetch_page(server.url("/p"))
+    time.sleep(0.2)
+    res = core.fetch_page(server.url("/p"))
+    assert res["status"] == 200 and res["stats"]["from_cache"]
+    # el 503 tapado por la copia caducada frena igualmente el host
+    assert core.adaptive.interval(host) == core.adaptive.min_backoff_s
+    core.close()
+
+
+def test_sqlite_hits_only_write_when_last_access_is_old(server, tmp_path):
+    server.routes["/p"] = _etag_route
+    cache, s = _session(tmp_path, ttl_s=60)
+    s.get(server.url("/p"))
+    conn = cache.backend._conn
+    writes = conn.total_changes
+    for _ in range(5):
+        assert s.get(server.url("/p")).from_cache
+    assert conn.total_changes == writes  # aciertos recientes: solo lecturas
+    conn.execute("UPDATE entries SET accessed_at = accessed_at - ?", (ACCESS_RESOLUTION_S + 1,))
+    before = conn.execute("SELECT accessed_at FROM entries").fetchone()[0]
+    s.get(server.url("/p"))
+    assert conn.execute("SELECT accessed_at FROM entries").fetchone()[0] > before
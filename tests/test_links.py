@@ -0,0 +1,32 @@
+# tests/test_links.py
+from __future__ import annotations
+
+import re
+
+from crewai_html_extractor.crawl_cli import LINK_MAX_SCORE, LINK_SCORE, extract_links
+
+PAGE = """<html><head><base href="https://ayto.es/es/"></head><body>
+<a href="playas/">Ver</a><a href="/contacto">Contacto</a><a href="../agenda#hoy">Hoy</a>
+<a href="playas/" title="Playas">Otra vez</a><a href="https://otro.com/x">Fuera</a>
+<a href="mailto:info@ayto.es">Email</a><a href="javascript:void(0)">JS</a><a href="docs/bando.pdf">Bando</a>
+</body></html>"""
+
+
+def test_links_resolve_against_base_href():
+    links = dict(extract_links(PAGE, "https://ayto.es/es/noticias/index.html"))
+    assert set(links) == {"https://ayto.es/es/playas/", "https://ayto.es/contacto", "https://ayto.es/agenda",
+                          "https://otro.com/x", "https://ayto.es/es/docs/bando.pdf"}
+    # repetido: una vez, con el mejor score (aquí por el title)
+    assert links["https://ayto.es/es/playas/"] == LINK_MAX_SCORE
+    assert links["https://ayto.es/contacto"] == LINK_SCORE
+
+
+def test_relative_base_href_and_page_without_base():
+    links = extract_links("<base href='/v2/'><a href='a'>a</a>", "https://ayto.es/x/y")
+    assert links == [("https://ayto.es/v2/a", LINK_SCORE)]
+    assert extract_links("<a href='a'>a</a>", "https://ayto.es/x/y") == [("https://ayto.es/x/a", LINK_SCORE)]
+
+
+def test_host_and_deny_filters():
+    links = extract_links(PAGE, "https://ayto.es/", allowed_hosts={"ayto.es"}, deny_rx=re.compile(r"\.pdf$"))
+    assert {u for u, _ in links} == {"https://ayto.es/es/playas/", "https://ayto.es/contacto", "https://ayto.es/agenda"}
@@ -0,0 +1,99 @@
+# tests/test_metrics.py
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from crewai_html_extractor.scraper.metrics import RunStats, StageTimer
+
+
+def _busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stage_accumulates_wall_and_cpu():
+    timer = StageTimer()
+    for _ in range(3):
+        with timer.stage("parse"):
+            _busy(0.01)
+    t = timer.timing["parse"]
+    assert t["wall_s"] >= 0.03
+    assert 0 < t["cpu_s"] <= t["wall_s"] + 0.01
+    timer.count("tourism-jsonld", 2)
+    timer.count("tourism-jsonld", 3)
+    assert timer.as_dict() == {"timing": {"parse": t}, "items_by_extractor": {"tourism-jsonld": 5}}
+
+
+def test_nested_stages_both_count_the_inner_time():
+    timer = StageTimer()
+    with timer.stage("extract"):
+        with timer.stage("parse"):
+            _busy(0.02)
+        time.sleep(0.01)
+    outer, inner = timer.timing["extract"], timer.timing["parse"]
+    assert inner["wall_s"] >= 0.02
+    assert outer["wall_s"] >= inner["wall_s"] + 0.01
+    # sleep no gasta CPU del hilo
+    assert outer["cpu_s"] < outer["wall_s"]
+
+
+def test_stage_is_recorded_when_the_body_raises():
+    timer = StageTimer()
+    with pytest.raises(ValueError):
+        with timer.stage("tourism-listings"):
+            _busy(0.01)
+            raise ValueError("html roto")
+    assert timer.timing["tourism-listings"]["wall_s"] >= 0.01
+    assert "tourism-listings" not in timer.items
+
+
+def test_merge_sums_another_timer():
+    a, b = StageTimer(), StageTimer()
+    with a.stage("parse"):
+        pass
+    b.timing["parse"] = {"wall_s": 1.0, "cpu_s": 0.5}
+    b.timing["links"] = {"wall_s": 0.25, "cpu_s": 0.25}
+    b.count("ine", 4)
+    wall = a.timing["parse"]["wall_s"]
+    a.merge(b.as_dict())
+    assert a.timing["parse"]["wall_s"] == pytest.approx(wall + 1.0)
+    assert a.timing["links"] == {"wall_s": 0.25, "cpu_s": 0.25}
+    assert a.items == {"ine": 4}
+
+
+def test_run_summary_totals_and_stage_shares(tmp_path):
+    stats = RunStats()
+    stats.add_page(
+        timing={"fetch": {"wall_s": 0.3, "cpu_s": 0.01}, "parse": {"wall_s": 0.1, "cpu_s": 0.1}},
+        fetch={"bytes": 1000, "retries": 1, "sleep_s": 0.5, "from_cache": False},
+        items_by_extractor={"tourism-jsonld": 2},
+    )
+    stats.add_page(
+        timing={"parse": {"wall_s": 0.1, "cpu_s": 0.1}},
+        fetch={"bytes": 0, "from_cache": True},
+        items_by_extractor={"tourism-jsonld": 1, "ine": 3},
+        not_modified=True,
+    )
+    stats.add_failure()
+    s = stats.summary()
+    assert (s["pages"], s["failed"], s["not_modified"]) == (2, 1, 1)
+    assert s["fetch"] == {"bytes": 1000, "retries": 1, "sleep_s": 0.5, "cache_hits": 1, "cache_misses": 1}
+    assert s["items_by_extractor"] == {"tourism-jsonld": 3, "ine": 3}
+    # etapas de más a menos tiempo, con media por página y reparto del total
+    assert list(s["stages"]) == ["fetch", "parse"]
+    assert s["stages"]["fetch"] == {"wall_s": 0.3, "cpu_s": 0.01, "wall_per_page_ms": 150.0, "share": 0.6}
+    assert s["stages"]["parse"]["share"] == pytest.approx(0.4)
+    assert s["pages_per_s"] > 0
+
+    path = stats.write(tmp_path / "out" / "run_summary.json")
+    assert json.loads(path.read_text(encoding="utf-8"))["pages"] == 2
+
+
+def test_empty_run_summary():
+    s = RunStats().summary()
+    assert s["pages"] == 0 and s["stages"] == {} and s["items_by_extractor"] == {}
+    assert s["fetch"]["cache_hits"] == s["fetch"]["cache_misses"] == 0
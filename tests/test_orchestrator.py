@@ -0,0 +1,54 @@
+# tests/test_orchestrator.py
+from __future__ import annotations
+
+import pytest
+
+from conftest import html_page
+from crewai_html_extractor.scraper.orchestrator import Orchestrator
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+
+POLICY = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=0, respect_robots=False, adaptive=False)
+TABLE = "<table><tr><th>Municipio</th><th>Plazas</th></tr><tr><td>Peñíscola</td><td>{n}</td></tr></table>"
+
+
+@pytest.fixture
+def site(server):
+    for i in range(6):
+        server.routes[f"/p{i}"] = lambda h, i=i: html_page(f"<h1>Página {i}</h1>" + TABLE.format(n=i))
+    return server
+
+
+def _strip(record):
+    # Lo que depende de la ejecución (tiempos, stats de red) no entra en la comparación
+    return record["data_items"], record["meta"]["method_chain"], record["meta"].get("error")
+
+
+@pytest.mark.parametrize("extract_workers", [2, 0])
+def test_run_many_matches_run_once(site, extract_workers):
+    urls = [site.url(f"/p{i}") for i in range(6)] + [site.url("/falta")]
+    orch = Orchestrator(policy=POLICY, revalidate=False)
+    expected = {u: _strip(orch.run_once(u)) for u in urls}
+    got = {}
+    for rec in orch.run_many(urls, fetch_concurrency=3, extract_workers=extract_workers):
+        got[rec["meta"]["source_url"]] = _strip(rec)
+    orch.core.close()
+    assert got == expected
+    assert got[site.url("/p3")][0]  # la tabla llega extraída desde el pool de procesos
+    assert got[site.url("/falta")][2].startswith("fetch_failed")
+
+
+def test_run_many_consumes_urls_lazily(site):
+    pulled = []
+
+    def urls():
+        for i in range(6):
+            pulled.append(i)
+            yield site.url(f"/p{i}")
+
+    orch = Orchestrator(policy=POLICY, revalidate=False)
+    it = orch.run_many(urls(), fetch_concurrency=1, extract_workers=0)
+    next(it)
+    # un hilo de fetch y páginas en vuelo acotadas: no se ha leído todo el generador
+    assert len(pulled) < 6
+    assert len(list(it)) == 5
+    orch.core.close()
@@ -0,0 +1,102 @@
+# tests/test_policy.py
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+
+from crewai_html_extractor.scraper import policy as policy_mod
+from crewai_html_extractor.scraper.policy import POLICY_ENV, SchedulingPolicy
+
+TOML = """
+[scheduling]
+min_delay_s = 1.5
+max_delay_s = 2.5
+respect_robots = false
+
+[scheduling.rate_limits]
+"*.ine.es" = [5.0, 2]
+"""
+
+needs_toml = pytest.mark.skipif(policy_mod.tomllib is None, reason="TOML requiere Python 3.11+")
+
+
+@pytest.fixture(autouse=True)
+def _no_policy_env(monkeypatch):
+    monkeypatch.delenv(POLICY_ENV, raising=False)
+
+
+def test_defaults():
+    p = SchedulingPolicy()
+    assert p.as_dict() == SchedulingPolicy.FIELDS
+    assert p.explicit == frozenset()
+    assert p.backoff_s == p.min_delay_s == 3.0
+    assert SchedulingPolicy.load().as_dict() == p.as_dict()
+
+
+def test_from_json_file(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"min_delay_s": 0.5, "max_delay_s": 1, "rate_limits": {"*.es": [2, 3], "x.org": 4}}))
+    p = SchedulingPolicy.from_file(str(path))
+    assert (p.min_delay_s, p.max_delay_s) == (0.5, 1.0)
+    # las listas de JSON pasan a (intervalo, burst)
+    assert p.rate_limits == {"*.es": (2, 3), "x.org": 4}
+    assert p.max_retries == SchedulingPolicy.FIELDS["max_retries"]
+    assert p.explicit == {"min_delay_s", "max_delay_s", "rate_limits"}
+
+
+@needs_toml
+def test_from_toml_file_with_scheduling_table(tmp_path):
+    path = tmp_path / "policy.toml"
+    path.write_text(TOML)
+    p = SchedulingPolicy.from_file(str(path))
+    assert (p.min_delay_s, p.max_delay_s, p.respect_robots) == (1.5, 2.5, False)
+    assert p.rate_limits == {"*.ine.es": (5.0, 2)}
+    assert p.make_limiter().interval_for("www.ine.es") == 5.0
+
+
+@needs_toml
+def test_from_toml_file_without_table(tmp_path):
+    path = tmp_path / "policy.toml"
+    path.write_text("max_retries = 1\n")
+    assert SchedulingPolicy.from_file(str(path)).max_retries == 1
+
+
+def test_toml_without_tomllib_is_a_clear_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(policy_mod, "tomllib", None)
+    path = tmp_path / "policy.toml"
+    path.write_text(TOML)
+    with pytest.raises(RuntimeError, match="TOML"):
+        SchedulingPolicy.from_file(str(path))
+
+
+def test_load_from_env_and_explicit_path_wins(tmp_path, monkeypatch):
+    env_file = tmp_path / "env.json"
+    env_file.write_text(json.dumps({"max_retries": 7}))
+    cli_file = tmp_path / "cli.json"
+    cli_file.write_text(json.dumps({"max_retries": 2}))
+    monkeypatch.setenv(POLICY_ENV, str(env_file))
+    assert SchedulingPolicy.load().max_retries == 7
+    assert SchedulingPolicy.load(str(cli_file)).max_retries == 2
+
+
+def test_unknown_keys_are_ignored_with_a_warning(caplog):
+    with caplog.at_level(logging.WARNING, logger="crewai.policy"):
+        p = SchedulingPolicy(min_delay_s=1, min_dealy_s=9, foo=1)
+    assert "foo, min_dealy_s" in caplog.text
+    assert not hasattr(p, "foo") and p.min_delay_s == 1.0
+
+
+def test_delays_are_normalised():
+    p = SchedulingPolicy(min_delay_s=-1, max_delay_s=0)
+    assert (p.min_delay_s, p.max_delay_s) == (0.0, 0.0)
+    assert SchedulingPolicy(min_delay_s=5, max_delay_s=1).max_delay_s == 5.0
+
+
+def test_replace_keeps_fields_and_ignores_none():
+    p = SchedulingPolicy(max_retries=1)
+    q = p.replace(min_delay_s=0.5, max_delay_s=None)
+    assert (q.min_delay_s, q.max_delay_s, q.max_retries) == (0.5, 8.0, 1)
+    assert q.explicit == {"max_retries", "min_delay_s"}
+    assert p.min_delay_s == 3.0  # el original no cambia
@@ -0,0 +1,134 @@
+# tests/test_ratelimit.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from crewai_html_extractor.scraper.ratelimit import HostRateLimiter, TokenBucket
+from crewai_html_extractor.scraper.robots import RobotsStore
+
+ROBOTS = b"User-agent: *\nCrawl-delay: 7\n"
+
+
+def test_bucket_wait_time_arithmetic():
+    b = TokenBucket(2.0, burst=2, now=0.0)
+    assert b.reserve(0.0) == 0.0
+    assert b.reserve(0.0) == 0.0  # burst de 2
+    assert b.wait_time(0.0) == pytest.approx(2.0)
+    assert b.wait_time(1.5) == pytest.approx(0.5)  # medio token recargado
+    assert b.reserve(1.5) == pytest.approx(0.5)  # reserva el hueco aunque aún no esté libre
+    assert b.wait_time(1.5) == pytest.approx(2.5)  # tokens en negativo: el siguiente, un intervalo después
+    assert b.wait_time(100.0) == 0.0
+    assert b.tokens == 2.0  # la recarga no pasa de burst
+
+
+def test_bucket_cost_delays_next_slot_not_current():
+    b = TokenBucket(1.0, now=0.0)
+    assert b.reserve(0.0, cost=1.5) == 0.0
+    assert b.wait_time(0.0) == pytest.approx(1.5)
+
+
+def test_bucket_without_interval_never_waits():
+    b = TokenBucket(0, now=0.0)
+    for _ in range(5):
+        assert b.reserve(0.0) == 0.0
+
+
+def test_per_host_rules_first_match_wins():
+    limiter = HostRateLimiter(
+        default_interval_s=3.0,
+        rules={"*.ine.es": (5.0, 2), "*.es": 0.5},
+    )
+    assert limiter.interval_for("www.ine.es") == 5.0
+    assert limiter.interval_for("turismo.example.es") == 0.5
+    assert limiter.interval_for("example.org") == 3.0
+    # burst de la regla: dos huecos seguidos y el tercero espera
+    assert limiter.try_acquire("www.ine.es")
+    assert limiter.try_acquire("www.ine.es")
+    assert not limiter.try_acquire("www.ine.es")
+    assert limiter.wait_time("www.ine.es") == pytest.approx(5.0, abs=0.1)
+    # cada host tiene su propio bucket
+    assert limiter.try_acquire("example.org")
+    assert limiter.wait_time("otro.example.org") == 0.0
+
+
+def test_crawl_delay_raises_interval_but_never_lowers_it():
+    limiter = HostRateLimiter(default_interval_s=3.0)
+    limiter.set_crawl_delay("a.es", 10)
+    limiter.set_crawl_delay("b.es", 1)
+    limiter.set_crawl_delay("c.es", None)
+    assert limiter.interval_for("a.es") == 10.0
+    assert limiter.interval_for("b.es") == 3.0
+    assert limiter.interval_for("c.es") == 3.0
+    # también sobre un bucket ya creado
+    limiter.set_crawl_delay("c.es", 6)
+    assert limiter.interval_for("c.es") == 6.0
+
+
+def test_learned_interval_respects_rule_and_crawl_delay():
+    limiter = HostRateLimiter(default_interval_s=3.0, rules={"lento.es": 4.0})
+    limiter.set_interval("rapido.es", 0.5)
+    assert limiter.interval_for("rapido.es") == 0.5
+    limiter.set_interval("lento.es", 0.5)
+    assert limiter.interval_for("lento.es") == 4.0
+    limiter.set_crawl_delay("rapido.es", 2)
+    assert limiter.interval_for("rapido.es") == 2.0
+
+
+def test_jitter_adds_to_spacing():
+    for _ in range(20):
+        limiter = HostRateLimiter(default_interval_s=2.0, jitter_s=1.0)
+        limiter.reserve("a.es")
+        assert 2.0 - 0.05 <= limiter.wait_time("a.es") <= 3.0
+
+
+def test_crawl_delay_seeded_from_robots(server):
+    server.routes["/robots.txt"] = lambda h: (200, {"Content-Type": "text/plain"}, ROBOTS)
+    limiter = HostRateLimiter(default_interval_s=1.0)
+    robots = RobotsStore(None)
+    robots.on_rules(limiter.set_crawl_delay)
+    robots.prefetch(server.url("/"))
+    assert robots.wait(5)
+    host = urlparse(server.base).netloc
+    assert limiter.interval_for(host) == 7.0
+    robots.close()
+
+
+def test_concurrent_reserve_from_threads_gets_distinct_slots():
+    limiter = HostRateLimiter(default_interval_s=10.0)
+    waits = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        w = limiter.reserve("a.es")
+        with lock:
+            waits.append(w)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # un hueco por petición, uno detrás de otro: 0, 10, 20, ... (sin dos en el mismo)
+    assert sorted(waits) == pytest.approx([10.0 * i for i in range(8)], abs=0.5)
+
+
+def test_concurrent_acquire_async_is_spaced():
+    limiter = HostRateLimiter(default_interval_s=0.05)
+
+    async def run():
+        t0 = time.monotonic()
+        waits = await asyncio.gather(*(limiter.acquire_async("a.es") for _ in range(5)))
+        return waits, time.monotonic() - t0
+
+    waits, elapsed = asyncio.run(run())
+    assert sorted(waits) == pytest.approx([0.05 * i for i in range(5)], abs=0.02)
+    assert elapsed >= 0.2 - 0.02
+    # otro host no espera por el primero
+    assert limiter.wait_time("b.es") == 0.0
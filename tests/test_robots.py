@@ -0,0 +1,151 @@
+# tests/test_robots.py
+from __future__ import annotations
+
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from conftest import html_page
+from crewai_html_extractor.scraper.core import Core, RobotsPending
+from crewai_html_extractor.scraper.orchestrator import Orchestrator
+from crewai_html_extractor.scraper.robots import RobotsStore
+
+ROBOTS = b"User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"
+
+
+@pytest.fixture
+def site(server):
+    server.routes["/robots.txt"] = lambda h: (200, {"Content-Type": "text/plain"}, ROBOTS)
+    server.routes["/ok"] = lambda h: html_page()
+    server.routes["/private/a"] = lambda h: html_page("secreto")
+    return server
+
+
+def test_disallowed_path_is_blocked(site):
+    rs = RobotsStore(None)
+    rs.prefetch(site.url("/"))
+    assert rs.wait(5)
+    assert rs.can_fetch(site.url("/private/a")) is False
+    assert rs.can_fetch(site.url("/ok")) is True
+    assert rs.crawl_delay(site.url("/ok")) == 2.0
+    assert site.hits["/robots.txt"] == 1
+    rs.close()
+
+
+def test_can_fetch_is_unknown_until_rules_arrive(site):
+    rs = RobotsStore(None)
+    assert rs.can_fetch(site.url("/private/a")) is None
+    assert rs.wait(5)
+    assert rs.can_fetch(site.url("/private/a")) is False
+    rs.close()
+
+
+def test_rules_reused_from_disk(site, tmp_path):
+    path = str(tmp_path / "robots.sqlite")
+    rs = RobotsStore(path)
+    rs.prefetch(site.url("/ok"))
+    assert rs.wait(5)
+    rs.close()
+    rs = RobotsStore(path)
+    assert rs.can_fetch(site.url("/private/a")) is False
+    assert site.hits["/robots.txt"] == 1
+    rs.close()
+
+
+@pytest.mark.parametrize("status, allowed", [(404, True), (401, False), (403, False)])
+def test_robots_status_semantics(server, status, allowed):
+    server.routes["/robots.txt"] = lambda h: (status, {}, b"")
+    rs = RobotsStore(None)
+    rs.prefetch(server.url("/x"))
+    assert rs.wait(5)
+    assert rs.can_fetch(server.url("/x")) is allowed
+    rs.close()
+
+
+def test_deferred_urls_released_when_rules_arrive(server):
+    def slow_robots(h):
+        time.sleep(0.5)
+        return 200, {"Content-Type": "text/plain"}, ROBOTS
+    server.routes["/robots.txt"] = slow_robots
+    rs = RobotsStore(None)
+    t0 = time.monotonic()
+    assert rs.can_fetch(server.url("/ok")) is None
+    rs.defer(server.url("/ok"), ("/ok", 1))
+    rs.defer(server.url("/private/a"), ("/private/a", 2))
+    assert time.monotonic() - t0 < 0.3  # ni consultar ni aparcar esperan a la descarga
+    assert rs.take_ready() == []
+    assert rs.waiting() == 2
+    assert rs.wait_ready(5)
+    assert sorted(rs.take_ready()) == [("/ok", 1), ("/private/a", 2)]
+    assert rs.waiting() == 0
+    # ya con reglas: aparcar libera en el acto
+    rs.defer(server.url("/ok"), "again")
+    assert rs.take_ready() == ["again"]
+    assert server.hits["/robots.txt"] == 1
+    rs.close()
+
+
+def test_core_never_requests_disallowed_url(site):
+    core = Core(min_delay_s=0, max_delay_s=0)
+    # lote (defer_robots): host nuevo -> ni espera a su robots.txt ni pide la URL antes de tenerlo
+    with pytest.raises(RobotsPending):
+        core.fetch_page(site.url("/private/a"), defer_robots=True)
+    assert core.robots.wait(5)
+    with pytest.raises(RuntimeError, match="prohibida por robots.txt"):
+        core.fetch_page(site.url("/private/a"))
+    assert "/private/a" not in site.hits
+    assert core.fetch_page(site.url("/ok"))["status"] == 200
+    # crawl-delay de robots.txt llega al rate limiter del host
+    assert core.limiter.interval_for(urlparse(site.base).netloc) >= 2.0
+    core.close()
+
+
+def test_cold_fetch_waits_for_robots_of_a_new_host(server):
+    def slow_robots(h):
+        time.sleep(0.3)
+        return 200, {"Content-Type": "text/plain"}, b"User-agent: *\nDisallow: /private\n"
+    server.routes["/robots.txt"] = slow_robots
+    server.routes["/ok"] = lambda h: html_page("<p>Hotel Sol</p>")
+    server.routes["/private/a"] = lambda h: html_page("secreto")
+    core = Core(min_delay_s=0, max_delay_s=0)
+    final_url, html = core.fetch(server.url("/ok"))
+    assert final_url == server.url("/ok") and "Hotel Sol" in html
+    core.close()
+    core = Core(min_delay_s=0, max_delay_s=0)
+    with pytest.raises(RuntimeError, match="prohibida por robots.txt"):
+        core.fetch(server.url("/private/a"))
+    assert "/private/a" not in server.hits
+    core.close()
+
+
+def test_cold_fetch_wait_is_capped_by_robots_timeout(server):
+    release = threading.Event()
+    server.routes["/robots.txt"] = lambda h: (release.wait(5), (200, {}, b"User-agent: *\nDisallow: /\n"))[1]
+    server.routes["/ok"] = lambda h: html_page()
+    core = Core(min_delay_s=0, max_delay_s=0)
+    core.robots.timeout = 0.2
+    t0 = time.monotonic()
+    # robots.txt que no responde: tras robots.timeout se permite, como en AsyncCore
+    assert core.fetch_page(server.url("/ok"))["status"] == 200
+    assert time.monotonic() - t0 < 3
+    release.set()
+    core.close()
+
+
+def test_run_many_defers_urls_until_robots_arrive(site):
+    orch = Orchestrator(core=Core(min_delay_s=0, max_delay_s=0), revalidate=False)
+    records = {r["meta"]["source_url"]: r for r in orch.run_many([site.url("/ok"), site.url("/private/a")],
+                                                                 extract_workers=0)}
+    assert "error" not in records[site.url("/ok")]["meta"]
+    assert "prohibida por robots.txt" in records[site.url("/private/a")]["meta"]["error"]
+    assert "/private/a" not in site.hits
+    orch.core.close()
+
+
+def test_run_once_waits_for_robots_of_a_new_host(site):
+    orch = Orchestrator(core=Core(min_delay_s=0, max_delay_s=0), revalidate=False)
+    assert "error" not in orch.run_once(site.url("/ok"))["meta"]
+    assert "prohibida" in orch.run_once(site.url("/private/a"))["meta"]["error"]
+    orch.core.close()
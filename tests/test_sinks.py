@@ -0,0 +1,102 @@
+# tests/test_sinks.py
+from __future__ import annotations
+
+import csv
+import json
+
+import pandas as pd
+import pytest
+
+from crewai_html_extractor.scraper.sinks import ENTITY_COLUMNS, PAGE_COLUMNS, EntityDeduper, make_sink
+
+HOTEL = {"type": "entity", "entity_type": "Hotel", "name": "Hotel Sol", "telephone": "+34 964 000 000",
+         "same_as": ["https://a.es/sol", "https://b.es/sol"], "rating": 4.5}
+
+
+def test_deduper_by_name_type_and_contact():
+    d = EntityDeduper()
+    assert d.add(HOTEL) is not None
+    assert d.add({**HOTEL, "name": "  HOTEL SOL ", "description": "otra"}) is None  # misma clave
+    assert d.add({**HOTEL, "telephone": "+34 964 111 111"}) is not None
+    assert len(d) == 2
+
+
+def test_deduper_resumes_from_known_fingerprints():
+    fp = EntityDeduper().add(HOTEL)
+    d = EntityDeduper([fp])
+    assert d.add(HOTEL) is None
+    assert len(d) == 1
+
+
+def test_csv_sink_streams_flat_rows_with_one_header(tmp_path):
+    sink = make_sink("csv", tmp_path / "entities", ENTITY_COLUMNS, chunk_rows=1)
+    sink.write(HOTEL)
+    assert sink.path.exists()  # volcado al llenar el trozo, antes de close()
+    sink.close()
+    sink = make_sink("csv", tmp_path / "entities", ENTITY_COLUMNS, append=True)
+    sink.write({**HOTEL, "name": "Hotel Luna"})
+    sink.close()
+    with open(sink.path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["name"] for r in rows] == ["Hotel Sol", "Hotel Luna"]
+    assert rows[0]["same_as"] == "https://a.es/sol;https://b.es/sol"
+    assert list(rows[0]) == list(ENTITY_COLUMNS)
+
+
+def test_jsonl_sink_keeps_nested_values_and_restart_truncates(tmp_path):
+    sink = make_sink("jsonl", tmp_path / "entities", ENTITY_COLUMNS)
+    sink.write_many([HOTEL, HOTEL])
+    sink.close()
+    sink = make_sink("jsonl", tmp_path / "entities", ENTITY_COLUMNS)  # sin append: empieza de cero
+    sink.write(HOTEL)
+    sink.close()
+    lines = sink.path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["same_as"] == HOTEL["same_as"]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="no soportado") as exc:
+        make_sink("xlsx", tmp_path / "entities", ENTITY_COLUMNS)
+    assert isinstance(exc.value.__cause__, KeyError)
+
+
+def _pages(n, start=0):
+    return [{"url": f"https://a.es/{i}", "items": i, "not_modified": False, "ts": "t"} for i in range(start, start + n)]
+
+
+def test_parquet_flushed_rows_survive_without_close(tmp_path):
+    pytest.importorskip("pyarrow")
+    sink = make_sink("parquet", tmp_path / "pages", PAGE_COLUMNS, chunk_rows=2)
+    sink.write_many(_pages(5))
+    # sin close() (crash / Ctrl-C): lo ya volcado se lee, lo del búfer se pierde
+    assert pd.read_parquet(sink.path)["url"].tolist() == [f"https://a.es/{i}" for i in range(4)]
+    sink.close()
+    assert len(pd.read_parquet(sink.path)) == 5
+
+
+def test_parquet_resume_appends_parts_and_restart_discards(tmp_path):
+    pytest.importorskip("pyarrow")
+    sink = make_sink("parquet", tmp_path / "pages", PAGE_COLUMNS)
+    sink.write_many(_pages(2))
+    sink.close()
+    sink = make_sink("parquet", tmp_path / "pages", PAGE_COLUMNS, append=True)
+    sink.write_many(_pages(3, start=2))
+    sink.close()
+    df = pd.read_parquet(sink.path)
+    assert sorted(df["items"]) == [0, 1, 2, 3, 4]
+    sink = make_sink("parquet", tmp_path / "pages", PAGE_COLUMNS)
+    sink.write_many(_pages(1))
+    sink.close()
+    assert len(pd.read_parquet(sink.path)) == 1
+
+
+def test_parquet_resume_adopts_single_file_output(tmp_path):
+    pytest.importorskip("pyarrow")
+    legacy = tmp_path / "pages.parquet"
+    pd.DataFrame(_pages(2)).to_parquet(legacy, index=False)
+    sink = make_sink("parquet", tmp_path / "pages", PAGE_COLUMNS, append=True)
+    sink.write_many(_pages(1, start=2))
+    sink.close()
+    assert sink.path.is_dir()
+    assert sorted(pd.read_parquet(sink.path)["items"]) == [0, 1, 2]
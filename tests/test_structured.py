@@ -0,0 +1,67 @@
+# tests/test_structured.py
+from __future__ import annotations
+
+import pytest
+
+from crewai_html_extractor.scraper import structured
+from crewai_html_extractor.scraper.document import ParsedPage
+from crewai_html_extractor.scraper.structured import iter_jsonld_nodes, loads_jsonld, page_jsonld_nodes, page_microdata
+
+HOTEL = '{"@type": "Hotel", "name": "Hotel Sol"}'
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Los mismos casos con orjson (si está instalado) y con el json de la stdlib."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(structured, "orjson", None)
+    return request.param
+
+
+def test_loads_plain_and_wrapped(backend):
+    assert loads_jsonld(HOTEL)["name"] == "Hotel Sol"
+    assert loads_jsonld(f"<!-- {HOTEL} -->")["name"] == "Hotel Sol"
+    assert loads_jsonld(f"<![CDATA[{HOTEL}]]>")["name"] == "Hotel Sol"
+    assert loads_jsonld("   ") is None
+
+
+def test_nan_falls_back_to_stdlib_json(backend):
+    # orjson rechaza NaN; json lo acepta
+    assert loads_jsonld('{"@type": "Place", "latitude": NaN}')["@type"] == "Place"
+
+
+def test_lax_json_needs_json5(backend, monkeypatch):
+    lax = "{'@type': 'Hotel', name: 'Hotel Sol',}"
+    monkeypatch.setattr(structured, "json5", None)
+    assert loads_jsonld(lax) is None
+    json5 = pytest.importorskip("json5")
+    monkeypatch.setattr(structured, "json5", json5)
+    assert loads_jsonld(lax)["name"] == "Hotel Sol"
+
+
+def test_graph_and_lists_flattened_in_document_order():
+    data = [{"@graph": [{"@type": "A"}, {"@graph": {"@type": "B"}}]}, {"@type": "C"}, "x"]
+    assert [n["@type"] for n in iter_jsonld_nodes(data)] == ["A", "B", "C"]
+
+
+def test_page_nodes_skip_broken_scripts():
+    html = (f'<script type="application/ld+json">{HOTEL}</script>'
+            '<script type="application/ld+json">{roto</script>'
+            '<script type="application/ld+json">{"@graph": [{"@type": "Event"}]}</script>')
+    page = ParsedPage(html, "https://a.es/")
+    assert [n["@type"] for n in page_jsonld_nodes(page)] == ["Hotel", "Event"]
+
+
+def test_microdata_empty_without_extruct(monkeypatch):
+    monkeypatch.setattr(structured, "extruct", None)
+    page = ParsedPage('<div itemscope itemtype="https://schema.org/Hotel"></div>', "https://a.es/")
+    assert page_microdata(page) == {"microdata": [], "opengraph": []}
+
+
+def test_microdata_with_extruct():
+    pytest.importorskip("extruct")
+    page = ParsedPage('<div itemscope itemtype="https://schema.org/Hotel">'
+                      '<span itemprop="name">Hotel Sol</span></div>', "https://a.es/")
+    assert page_microdata(page)["microdata"][0]["properties"]["name"] == "Hotel Sol"
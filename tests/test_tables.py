@@ -0,0 +1,102 @@
+# tests/test_tables.py
+from __future__ import annotations
+
+import lxml.html
+
+from crewai_html_extractor.scraper.extractors.html_tables import extract_html_tables
+from crewai_html_extractor.scraper.extractors.ine import extract_ine_tables
+from crewai_html_extractor.scraper.numeric import coerce_column, coerce_table
+from crewai_html_extractor.scraper.tables import parse_table
+
+SPANS = """
+<table id="ocupacion">
+  <caption>Viajeros 2023</caption>
+  <thead>
+    <tr><th rowspan="2">Provincia</th><th colspan="2">2023</th></tr>
+    <tr><th>Enero</th><th>Febrero</th></tr>
+  </thead>
+  <tbody>
+    <tr><td rowspan="2">Castellón</td><td>1.234</td><td>..</td></tr>
+    <tr><td>5,5</td><td>2.000</td></tr>
+    <tr><td>Valencia</td><td colspan="2">..</td></tr>
+  </tbody>
+</table>
+"""
+
+
+def _table(html: str):
+    return lxml.html.fromstring(html).xpath("//table")[0]
+
+
+def test_multilevel_header_with_spans():
+    t = parse_table(_table(SPANS))
+    assert t["schema"] == ["Provincia", "2023 / Enero", "2023 / Febrero"]
+    assert t["caption"] == "Viajeros 2023"
+    assert t["n_rows"] == 3
+
+
+def test_body_rowspan_and_colspan_repeat_the_cell():
+    t = parse_table(_table(SPANS))
+    assert t["columns"][0] == ["Castellón", "Castellón", "Valencia"]
+    assert t["columns"][2] == ["..", "2.000", ".."]
+
+
+def test_headers_from_leading_th_rows_without_thead():
+    t = parse_table(_table("<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>x</td></tr></table>"))
+    assert t["schema"] == ["A", "B"]
+    assert t["columns"] == [["1"], ["x"]]
+
+
+def test_coerce_spanish_thousands_decimals_and_missing():
+    values, report = coerce_column(["1.234", "..", "5,5"], "viajeros")
+    assert values == [1234.0, None, 5.5]
+    assert report["format"] == "es"
+    assert report["type"] == "float"
+    assert report["missing"] == 1
+
+
+def test_coerce_int_column_and_text_left_alone():
+    assert coerce_column(["1.234", "2.000"])[0] == [1234, 2000]
+    assert coerce_column(["Castellón", "1.234"])[0] == ["Castellón", "1.234"]
+
+
+def test_coerce_table_in_place():
+    t = parse_table(_table(SPANS))
+    reports = coerce_table(t)
+    assert [r["type"] for r in reports] == ["text", "float", "int"]
+    assert t["columns"][1] == [1234.0, 5.5, None]
+    assert t["columns"][2] == [None, 2000, None]
+
+
+def test_html_tables_extractor_keeps_numbers_and_header_only_tables():
+    html = SPANS + "<table><thead><tr><th>A</th><th>B</th></tr></thead></table><table></table>"
+    items = extract_html_tables(html, "https://example.es/")
+    assert [it["label"] for it in items] == ["ocupacion", "table_1"]
+    assert items[0]["data"][1] == ["Castellón", 5.5, 2000]
+    assert items[1]["schema"] == ["A", "B"]
+    assert items[1]["data"] == []
+
+
+# Tabla tal como la sirve el INE: dos filas de cabecera (variable / periodo) con un <td> vacío en la esquina
+INE_PAGE = """<html><head><title>INE - Coyuntura Turística Hotelera. 2023</title></head><body>
+<table id="tablaDatos"><caption>Viajeros y pernoctaciones por comunidades autónomas</caption>
+<tr><td></td><th colspan="2">Viajeros</th><th colspan="2">Pernoctaciones</th></tr>
+<tr><td></td><th>2023M12</th><th>2023M11</th><th>2023M12</th><th>2023M11</th></tr>
+<tr><th>Total Nacional</th><td>5.123.456</td><td>6.001.234</td><td>14.567.890</td><td>17.345.678</td></tr>
+<tr><th>Andalucía</th><td>1.012.345</td><td>..</td><td>2.987.654</td><td>3.456.789</td></tr>
+</table></body></html>"""
+
+
+def test_ine_tables_keep_two_row_header():
+    (item,) = extract_ine_tables(INE_PAGE, "https://www.ine.es/jaxiT3/Tabla.htm?t=2074")
+    assert item["schema"] == ["0", "Viajeros / 2023M12", "Viajeros / 2023M11",
+                              "Pernoctaciones / 2023M12", "Pernoctaciones / 2023M11"]
+    assert item["data"] == [["Total Nacional", 5123456, 6001234, 14567890, 17345678],
+                            ["Andalucía", 1012345, None, 2987654, 3456789]]
+    assert item["period"] == "2023"
+
+
+def test_forced_header_rows_take_td_rows_too():
+    t = parse_table(_table("<table><tr><td>a</td><td>b</td></tr><tr><td>1</td><td>2</td></tr></table>"), n_header=1)
+    assert t["schema"] == ["a", "b"]
+    assert t["columns"] == [["1"], ["2"]]
@@ -0,0 +1,83 @@
+# tests/test_tourism_listings.py
+from __future__ import annotations
+
+from crewai_html_extractor.scraper.document import ParsedPage
+from crewai_html_extractor.scraper.extractors import tourism
+from crewai_html_extractor.scraper.extractors.tourism import extract_portal_listings_generic
+
+BASE = "https://turismo.es/alojamientos"
+LISTING = """<html><body>
+<header><a href="tel:+34900000000">Oficina de turismo</a></header>
+<main><div class="view-content">
+  <div class="views-row"><article><h3>Hotel Sol</h3><ul><li>Calle Mayor 1</li><li>Tel. 964 111 111</li></ul>
+    <a href="/hotel-sol">Ver</a></article></div>
+  <div class="views-row"><article><h3>Hotel Luna</h3><a href="tel:+34964222222">Llamar</a>
+    <a href="mailto:luna@hotel.es">Email</a></article></div>
+  <div class="views-row"><article><h3>Hostal Mar</h3><p>Sin contacto</p><a href="/hostal-mar">Ver</a></article></div>
+</div></main>
+<footer><p>info@ayuntamiento.es 964 999 999</p></footer>
+</body></html>"""
+
+
+def _by_name(html):
+    return {it["name"]: it for it in extract_portal_listings_generic(html, BASE)}
+
+
+def test_contacts_come_from_each_card():
+    items = _by_name(LISTING)
+    assert (items["Hotel Sol"]["telephone"], items["Hotel Sol"]["email"]) == ("964 111 111", None)
+    assert (items["Hotel Luna"]["telephone"], items["Hotel Luna"]["email"]) == ("+34964222222", "luna@hotel.es")
+    # ni el teléfono de la cabecera ni el email del pie se atribuyen a una ficha sin contacto
+    assert (items["Hostal Mar"]["telephone"], items["Hostal Mar"]["email"]) == (None, None)
+
+
+def test_menus_and_link_lists_are_not_cards():
+    html = LISTING.replace("<main>", """<main>
+<nav><ul><li><strong>Menú</strong> <a href="/rutas">Rutas</a></li></ul></nav>
+<ul class="main-menu"><li><span>Playas</span> <a href="https://www.tripadvisor.es/">Opiniones</a></li></ul>
+<div role="navigation"><article><h3>Agenda</h3></article></div>""").replace("</main>", """
+<ul class="links"><li><a href="/a">Enlace A</a></li><li><a href="/b">Enlace B</a></li></ul></main>""")
+    items = extract_portal_listings_generic(html, BASE)
+    # una ficha por tarjeta: la .views-row más externa, no también su <article> ni sus <li>
+    assert [it["name"] for it in items] == ["Hotel Sol", "Hotel Luna", "Hostal Mar"]
+    assert all(it["segment"] == "accommodation" for it in items)
+
+
+def test_lone_wrapper_is_not_a_card():
+    html = """<main><article class="listado">
+      <div class="card"><h3>Camping Playa</h3><p>Tel. 964 333 333</p></div>
+      <div class="card"><h3>Camping Río</h3><p>Tel. 964 444 444</p></div>
+    </article></main>"""
+    items = extract_portal_listings_generic(html, "https://turismo.es/campings")
+    assert [(it["name"], it["telephone"]) for it in items] == [("Camping Playa", "964 333 333"),
+                                                               ("Camping Río", "964 444 444")]
+
+
+FACTS_PAGE = """<html><head>
+<script type="application/ld+json">{"@graph": [
+  {"@type": "Hotel", "name": "Hotel Sol"},
+  {"@type": "Hotel", "name": "Hotel Luna", "telephone": "964 222 222"},
+  {"@type": "Restaurant", "name": "Casa Pepe"}
+]}</script></head>
+<body><p>Licencia HUTB-012345 · CIF B12345678 · reservas@sol.es · 964 111 111</p></body></html>"""
+
+
+def test_page_facts_computed_once_per_page_and_match_unmemoized(monkeypatch):
+    scans = []
+    scan = tourism._scan
+    monkeypatch.setattr(tourism, "_scan", lambda rx, text: scans.append(rx) or scan(rx, text))
+    page = ParsedPage(FACTS_PAGE, BASE)
+    memoized = tourism.extract_tourism_entities_from_page(page)
+    assert len(memoized) == 3
+    # una pasada por regex (licencias, CIF, NIE, DNI, teléfonos, emails) para las tres entidades
+    assert len(scans) == 6
+    assert tourism._page_facts(page) is tourism._page_facts(page)
+    assert len(scans) == 6
+
+    # Sin memo (cada entidad recalcula los hechos de página): mismo resultado
+    monkeypatch.setattr(ParsedPage, "memo", lambda self, key, factory: factory())
+    plain = tourism.extract_tourism_entities_from_page(ParsedPage(FACTS_PAGE, BASE))
+    assert len(scans) > 12
+    assert plain == memoized
+    sol = next(it for it in memoized if it["name"] == "Hotel Sol")
+    assert (sol["tourism_license"], sol["cif_nif"], sol["email"]) == ("HUTB-012345", "B12345678", "reservas@sol.es")
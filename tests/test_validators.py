@@ -0,0 +1,194 @@
+# tests/test_validators.py
+from __future__ import annotations
+
+import itertools
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import html_page
+from crewai_html_extractor.crawl_cli import CRAWL_RECORD_KIND, crawl_page
+from crewai_html_extractor.scraper import validators as validators_mod
+from crewai_html_extractor.scraper.core import Core
+from crewai_html_extractor.scraper.orchestrator import Orchestrator
+from crewai_html_extractor.scraper.policy import SchedulingPolicy
+from crewai_html_extractor.scraper.validators import ValidatorStore
+
+POLICY = SchedulingPolicy(min_delay_s=0, max_delay_s=0, max_retries=0, respect_robots=False, adaptive=False)
+PAGE = '<h1>Hotel Sol</h1><a href="/hotel-luna">Hotel Luna</a>'
+
+
+@pytest.fixture
+def etag_site(server):
+    """/p con ETag "v1": un If-None-Match que coincide recibe 304. seen guarda las cabeceras condicionales."""
+    server.seen = []
+
+    def page(h):
+        server.seen.append(h.headers.get("If-None-Match"))
+        if h.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return html_page(PAGE, ETag='"v1"')
+
+    server.routes["/p"] = page
+    return server
+
+
+def _core(tmp_path, **kwargs):
+    return Core(policy=POLICY, state_dir=None, validators_path=str(tmp_path / "validators.sqlite"), **kwargs)
+
+
+def test_orchestrator_reuses_record_on_304(etag_site, tmp_path):
+    orch = Orchestrator(core=_core(tmp_path))
+    first = orch.run_once(etag_site.url("/p"))
+    second = orch.run_once(etag_site.url("/p"))
+    assert etag_site.seen == [None, '"v1"']
+    assert second["meta"]["not_modified"] is True
+    assert second["meta"]["fetch"]["status"] == 304
+    assert second["data_items"] == first["data_items"]
+    orch.core.close()
+
+
+def test_crawl_page_reuses_items_and_links_on_304(etag_site, tmp_path):
+    core = _core(tmp_path)
+    first = crawl_page(core, etag_site.url("/p"))
+    assert core.validators.has_record(etag_site.url("/p"), CRAWL_RECORD_KIND)
+    second = crawl_page(core, etag_site.url("/p"))
+    assert etag_site.seen == [None, '"v1"']
+    assert second["not_modified"] is True
+    assert second["links"] == first["links"] and second["links"]
+    assert second["items"] == first["items"]
+    core.close()
+
+
+def test_same_content_hash_counts_as_not_modified(server, tmp_path):
+    server.routes["/p"] = lambda h: html_page(PAGE)  # sin validadores en el servidor
+    core = _core(tmp_path)
+    crawl_page(core, server.url("/p"))
+    assert crawl_page(core, server.url("/p"))["not_modified"] is True
+    core.close()
+
+
+def test_conditional_headers_only_with_a_reusable_record(etag_site, tmp_path):
+    core = _core(tmp_path)
+    core.fetch_page(etag_site.url("/p"), record_kind="other")
+    # validadores guardados, pero sin record de ese kind: GET completo, no un 304 inservible
+    assert core.fetch_page(etag_site.url("/p"), record_kind="other")["status"] == 200
+    assert etag_site.seen == [None, None]
+    core.close()
+
+
+def test_failed_refetch_after_304_becomes_fetch_failed_record(etag_site, tmp_path):
+    orch = Orchestrator(core=_core(tmp_path))
+    orch.run_once(etag_site.url("/p"))
+    # record perdido entre la revalidación y su lectura; el GET completo de después falla (404)
+    orch.core.validators.load_record = lambda url, kind="record": None
+    etag_site.routes["/p"] = lambda h: (304, {}, b"") if h.headers.get("If-None-Match") else (404, {}, b"")
+    rec = orch.run_once(etag_site.url("/p"))
+    assert rec["meta"]["error"].startswith("fetch_failed")
+    assert rec["data_items"] == []
+    orch.core.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj de validators controlable: clock.now avanza 1 s por lectura salvo que se fije."""
+    ticks = itertools.count(1_000_000)
+    fake = SimpleNamespace(now=None)
+    fake.time = lambda: fake.now if fake.now is not None else float(next(ticks))
+    monkeypatch.setattr(validators_mod, "time", fake)
+    return fake
+
+
+def test_unused_urls_forgotten_after_ttl(tmp_path, clock):
+    store = ValidatorStore(str(tmp_path / "v.sqlite"), ttl_s=100)
+    store.save_validators("https://a.es/1", '"e"', None, "h")
+    store.save_record("https://a.es/1", {"items": [1]})
+    assert store.get("https://a.es/1")["etag"] == '"e"'
+    clock.now = 2_000_000.0
+    assert store.get("https://a.es/1") is None
+    assert store.prune() == 1
+    assert not store.has_record("https://a.es/1")
+    store.close()
+
+
+def test_lru_eviction_keeps_recently_used_urls(tmp_path, clock):
+    store = ValidatorStore(str(tmp_path / "v.sqlite"), ttl_s=None, max_entries=10)
+    for i in range(10):
+        store.save_validators(f"https://a.es/{i}", None, None, str(i))
+    clock.now = 1_000_100 + validators_mod.ACCESS_RESOLUTION_S
+    store.get("https://a.es/0")  # usada: pasa a ser la más reciente
+    store.save_validators("https://a.es/10", None, None, "10")  # 11 > 10 -> baja al 90%
+    kept = {f"https://a.es/{i}" for i in range(11) if store.get(f"https://a.es/{i}")}
+    assert len(kept) == 9
+    assert "https://a.es/0" in kept and "https://a.es/10" in kept
+    assert "https://a.es/1" not in kept and "https://a.es/2" not in kept
+    store.close()
+
+
+def test_lookups_within_access_resolution_do_not_write(tmp_path, clock):
+    store = ValidatorStore(str(tmp_path / "v.sqlite"), ttl_s=None)
+    store.save_validators("https://a.es/1", '"e"', None, "h")
+    changes = store._conn.total_changes
+    for _ in range(20):
+        assert store.get("https://a.es/1")["etag"] == '"e"'
+    assert store._conn.total_changes == changes
+    clock.now = 1_000_100 + validators_mod.ACCESS_RESOLUTION_S
+    store.get("https://a.es/1")
+    assert store._conn.total_changes == changes + 1
+    store.close()
+
+
+def test_core_keeps_state_on_disk_by_default(server):
+    server.routes["/p"] = lambda h: html_page(PAGE)
+    core = Core(policy=POLICY)
+    assert core.cache is not None and core.validators is not None
+    core.fetch_page(server.url("/p"))
+    core.close()
+    core = Core(policy=POLICY)  # otra ejecución: la respuesta sale de la cache en disco
+    assert core.fetch_page(server.url("/p"))["stats"]["from_cache"] is True
+    assert server.hits["/p"] == 1
+    core.close()
+    memory_only = Core(policy=POLICY, state_dir=None)
+    assert memory_only.cache is None and memory_only.validators is None
+    memory_only.close()
+
+
+@pytest.mark.parametrize("legacy", [True, False])
+def test_concurrent_open_creates_or_migrates_schema(tmp_path, legacy):
+    """Workers del crawler abren la misma base a la vez: nueva, o de antes de accessed_at."""
+    path = str(tmp_path / "v.sqlite")
+    if legacy:
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE validators (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+                     " content_hash TEXT, updated_at REAL)")
+        conn.execute("INSERT INTO validators VALUES ('https://a.es/', '\"e\"', NULL, 'h', 123.0)")
+        conn.commit()
+        conn.close()
+
+    n = 8
+    barrier, errors, stores = threading.Barrier(n), [], []
+
+    def open_store():
+        barrier.wait()
+        try:
+            stores.append(ValidatorStore(path, ttl_s=None))
+        except Exception as e:  # p. ej. "duplicate column name: accessed_at"
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_store) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(stores) == n
+    if legacy:
+        row = stores[0]._conn.execute("SELECT updated_at, accessed_at FROM validators").fetchone()
+        assert row == (123.0, 123.0)
+    else:
+        stores[0].save_validators("https://a.es/", None, None, "h")
+        assert stores[1].get("https://a.es/")["content_hash"] == "h"
+    for s in stores:
+        s.close()